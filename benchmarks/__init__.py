@@ -0,0 +1,6 @@
+"""
+uv-lens 的 CPU 侧微基准：解析、版本评估、写回与各输出格式。
+
+只使用合成数据、不访问网络，用于在不受网络波动影响的情况下发现热点路径的性能回退。
+运行方式：python -m benchmarks（在仓库根目录，需能导入 uv_lens）。
+"""
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.suite import (
+    BASELINE_PATH,
+    all_cases,
+    compare,
+    format_results,
+    load_baseline,
+    select_cases,
+    time_case,
+    updated_baseline,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    构造基准命令行参数解析器。
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="uv-lens CPU 侧微基准")
+    parser.add_argument("-k", "--filter", default=None, help="只运行名称包含该子串的用例")
+    parser.add_argument("--max-size", type=int, default=None, help="只运行规模不超过该值的用例")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的测量轮数（取最小值）")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--threshold", type=float, default=None, help="覆盖基线中的允许变慢比例（如 0.25）")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线文件")
+    parser.add_argument("--json", type=Path, default=None, help="把本次结果写入 JSON 文件")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    运行基准并与基线对比；存在回退时返回 1。
+    """
+    args = build_parser().parse_args(argv)
+    cases = select_cases(all_cases(), pattern=args.filter, max_size=args.max_size)
+    if not cases:
+        print("没有匹配的用例", file=sys.stderr)
+        return 2
+
+    timings: dict[str, float] = {}
+    for case in cases:
+        timings[case.key] = time_case(case, repeat=args.repeat)
+        print(f"{case.key} ...", file=sys.stderr)
+
+    baseline = load_baseline(args.baseline)
+    results = compare(timings, baseline, threshold=args.threshold)
+    for line in format_results(results):
+        print(line)
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(timings, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(
+            json.dumps(updated_baseline(timings, baseline), indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"基线已更新：{args.baseline}", file=sys.stderr)
+        return 0
+
+    regressed = [r.key for r in results if r.regressed]
+    if regressed:
+        print(f"性能回退：{', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import atexit
+import io
+import json
+import platform
+import shutil
+import tempfile
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from packaging.requirements import Requirement
+
+from benchmarks import synthetic
+from uv_lens.formatters import print_table, render_json, render_markdown, write_ndjson
+from uv_lens.index_client import (
+    _candidate_versions_from_pypi_json,
+    pick_latest_version,
+    release_times_from_pypi_json,
+)
+from uv_lens.models import DependencyKind
+from uv_lens.names import normalize_project_name
+from uv_lens.pyproject import extract_dependencies, flatten_dependencies
+from uv_lens.updater import apply_updates_to_pyproject
+from uv_lens.versions import evaluate_requirement_against_latest
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# 默认允许的变慢比例：当前耗时超过基线 (1 + threshold) 倍视为回退。
+DEFAULT_THRESHOLD = 0.25
+# 单次调用不足 100 微秒的用例受计时噪声影响大，默认放宽阈值。
+NOISY_THRESHOLD = 0.5
+NOISY_BELOW_S = 1e-4
+
+# 依赖数量与版本数量的规模档位。
+DEP_SIZES = (10, 100, 1000, 5000)
+RELEASE_SIZES = (10, 500, 5000)
+# 表格输出经 rich 排版，同样单独控制规模。
+TABLE_SIZES = (10, 100, 1000)
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkCase:
+    """
+    一个基准用例：setup 构造输入（不计时），返回被计时的无参函数。
+    """
+
+    name: str
+    size: int
+    setup: Callable[[int], Callable[[], Any]]
+
+    @property
+    def key(self) -> str:
+        """
+        基线文件中的键，如 extract_dependencies[1000]。
+        """
+        return f"{self.name}[{self.size}]"
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkResult:
+    """
+    单个用例的结果：每次调用的最短耗时（秒）及与基线的对比。
+    """
+
+    key: str
+    seconds: float
+    baseline_s: float | None = None
+    threshold: float = DEFAULT_THRESHOLD
+
+    @property
+    def ratio(self) -> float | None:
+        """
+        当前耗时与基线之比；没有基线时为 None。
+        """
+        if not self.baseline_s:
+            return None
+        return self.seconds / self.baseline_s
+
+    @property
+    def regressed(self) -> bool:
+        """
+        是否超过基线允许的变慢比例。
+        """
+        ratio = self.ratio
+        return ratio is not None and ratio > 1 + self.threshold
+
+
+def _setup_extract(n: int) -> Callable[[], Any]:
+    data = synthetic.pyproject_data(n)
+    return lambda: flatten_dependencies(extract_dependencies(data))
+
+
+def _setup_candidates(n: int) -> Callable[[], Any]:
+    payload = synthetic.pypi_payload(n)
+    return lambda: _candidate_versions_from_pypi_json(payload)
+
+
+def _setup_pick_latest(n: int) -> Callable[[], Any]:
+    payload = synthetic.pypi_payload(n)
+    return lambda: pick_latest_version(payload, include_prereleases=False)
+
+
+def _setup_release_times(n: int) -> Callable[[], Any]:
+    payload = synthetic.pypi_payload(n)
+    return lambda: release_times_from_pypi_json(payload, include_prereleases=False)
+
+
+def _setup_evaluate(n: int) -> Callable[[], Any]:
+    data = synthetic.pyproject_data(n)
+    lookups = synthetic.lookups_for(data)
+    pairs: list[tuple[Requirement, Any]] = []
+    for item in flatten_dependencies(extract_dependencies(data)):
+        if item.requirement is not None and item.kind != DependencyKind.LOCKED:
+            pairs.append((item.requirement, lookups[normalize_project_name(item.requirement.name)].latest))
+
+    def run() -> None:
+        for req, latest in pairs:
+            evaluate_requirement_against_latest(req, latest=latest, pin="compatible")
+
+    return run
+
+
+def _setup_apply_updates(n: int) -> Callable[[], Any]:
+    directory = Path(tempfile.mkdtemp(prefix="uv-lens-bench-"))
+    atexit.register(shutil.rmtree, directory, True)
+    path = directory / "pyproject.toml"
+    path.write_text(synthetic.pyproject_text(n), encoding="utf-8")
+    report = synthetic.report_for(n, path=path)
+    return lambda: apply_updates_to_pyproject(path, report=report, pin="compatible", write=False)
+
+
+def _setup_render_json(n: int) -> Callable[[], Any]:
+    report = synthetic.report_for(n)
+    return lambda: render_json(report)
+
+
+def _setup_render_ndjson(n: int) -> Callable[[], Any]:
+    report = synthetic.report_for(n)
+    return lambda: write_ndjson(report.items, io.StringIO(), pyproject_path=report.pyproject_path)
+
+
+def _setup_render_markdown(n: int) -> Callable[[], Any]:
+    report = synthetic.report_for(n)
+    return lambda: render_markdown(report)
+
+
+def _setup_render_table(n: int) -> Callable[[], Any]:
+    report = synthetic.report_for(n)
+    return lambda: print_table(report, file=io.StringIO())
+
+
+def all_cases() -> list[BenchmarkCase]:
+    """
+    全部基准用例（按热点路径与规模展开）。
+    """
+    groups: list[tuple[str, tuple[int, ...], Callable[[int], Callable[[], Any]]]] = [
+        ("extract_dependencies", DEP_SIZES, _setup_extract),
+        ("candidate_versions", RELEASE_SIZES, _setup_candidates),
+        ("pick_latest_version", RELEASE_SIZES, _setup_pick_latest),
+        ("release_times", RELEASE_SIZES, _setup_release_times),
+        ("evaluate_requirement", DEP_SIZES, _setup_evaluate),
+        ("apply_updates", DEP_SIZES, _setup_apply_updates),
+        ("render_json", DEP_SIZES, _setup_render_json),
+        ("render_ndjson", DEP_SIZES, _setup_render_ndjson),
+        ("render_markdown", DEP_SIZES, _setup_render_markdown),
+        ("render_table", TABLE_SIZES, _setup_render_table),
+    ]
+    return [BenchmarkCase(name, size, setup) for name, sizes, setup in groups for size in sizes]
+
+
+def select_cases(
+    cases: list[BenchmarkCase],
+    *,
+    pattern: str | None = None,
+    max_size: int | None = None,
+) -> list[BenchmarkCase]:
+    """
+    按名称子串与规模上限筛选用例。
+    """
+    return [
+        case
+        for case in cases
+        if (pattern is None or pattern in case.key) and (max_size is None or case.size <= max_size)
+    ]
+
+
+def time_case(case: BenchmarkCase, *, repeat: int = 5, min_time_s: float = 0.2) -> float:
+    """
+    测量用例每次调用的耗时（秒）：先试跑一次、按 min_time_s 确定每轮调用次数，再取 repeat 轮中的最小值，减少噪声影响。
+    """
+    func = case.setup(case.size)
+    timer = timeit.Timer(func)
+    elapsed = timer.timeit(number=1)
+    number = max(1, int(min_time_s / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict[str, Any]:
+    """
+    读取基线文件；不存在时返回空基线。
+    """
+    if not path.exists():
+        return {"cases": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(
+    timings: dict[str, float],
+    baseline: dict[str, Any],
+    *,
+    threshold: float | None = None,
+) -> list[BenchmarkResult]:
+    """
+    与基线对比；threshold 覆盖基线中各用例记录的允许变慢比例。
+    """
+    cases = baseline.get("cases") or {}
+    results: list[BenchmarkResult] = []
+    for key, seconds in timings.items():
+        entry = cases.get(key) or {}
+        results.append(
+            BenchmarkResult(
+                key=key,
+                seconds=seconds,
+                baseline_s=entry.get("seconds"),
+                threshold=threshold if threshold is not None else entry.get("threshold", DEFAULT_THRESHOLD),
+            )
+        )
+    return results
+
+
+def updated_baseline(timings: dict[str, float], baseline: dict[str, Any]) -> dict[str, Any]:
+    """
+    用本次结果更新基线（保留各用例已有的阈值与未运行用例的记录）。
+    """
+    cases = dict(baseline.get("cases") or {})
+    for key, seconds in timings.items():
+        entry = dict(cases.get(key) or {})
+        entry["seconds"] = seconds
+        entry.setdefault("threshold", NOISY_THRESHOLD if seconds < NOISY_BELOW_S else DEFAULT_THRESHOLD)
+        cases[key] = entry
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": cases,
+    }
+
+
+def format_results(results: list[BenchmarkResult]) -> Iterator[str]:
+    """
+    逐行渲染结果表：每次调用耗时、基线耗时、比值与是否回退。
+    """
+    width = max((len(r.key) for r in results), default=10)
+    yield f"{'case':<{width}} {'time':>12} {'baseline':>12} {'ratio':>7}"
+    for r in results:
+        baseline = _format_seconds(r.baseline_s) if r.baseline_s else "-"
+        ratio = f"{r.ratio:.2f}" if r.ratio is not None else "-"
+        flag = "  REGRESSED" if r.regressed else ""
+        yield f"{r.key:<{width}} {_format_seconds(r.seconds):>12} {baseline:>12} {ratio:>7}{flag}"
+
+
+def _format_seconds(seconds: float) -> str:
+    """
+    以合适的单位显示耗时。
+    """
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.3f} s"
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from packaging.version import Version
+
+from uv_lens.app import build_report
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.names import normalize_project_name
+from uv_lens.pyproject import extract_dependencies, flatten_dependencies
+from uv_lens.report import Report
+
+_INDEX_URL = "https://pypi.test/pypi"
+
+# 依赖写法轮换使用，覆盖下限、兼容范围、上下限、精确 pin、无约束、extras 与 marker。
+_SPEC_TEMPLATES = (
+    "{name}>=1.{minor}",
+    "{name}~=2.{minor}",
+    "{name}>=1,<{major}",
+    "{name}=={major}.{minor}.0",
+    "{name}",
+    "{name}[socks,http2]>=0.{minor}",
+    "{name}>=3.{minor}; python_version < '3.13' and sys_platform == 'linux'",
+    "{name}[all]<{major},>=1.0; extra == 'full' or platform_machine == 'x86_64'",
+)
+
+
+def _requirement(i: int) -> str:
+    """
+    第 i 个合成依赖的 requirement 字符串。
+    """
+    template = _SPEC_TEMPLATES[i % len(_SPEC_TEMPLATES)]
+    return template.format(name=f"pkg-{i:05d}", major=2 + i % 7, minor=i % 10)
+
+
+def _toml_array(values: list[str]) -> str:
+    """
+    渲染为多行 TOML 字符串数组。
+    """
+    body = "".join(f'    "{value}",\n' for value in values)
+    return "[\n" + body + "]"
+
+
+def pyproject_text(n_deps: int, *, groups: int = 8, extras: int = 8) -> str:
+    """
+    生成含 n_deps 条依赖的 pyproject.toml 文本：约一半为项目依赖，其余平均分到可选依赖与开发组。
+    """
+    requirements = [_requirement(i) for i in range(n_deps)]
+    n_project = max(1, n_deps // 2)
+    rest = requirements[n_project:]
+    buckets = groups + extras
+    chunks = [rest[k::buckets] for k in range(buckets)]
+
+    lines = ["[project]", 'name = "synthetic"', 'version = "0.1.0"']
+    lines.append(f"dependencies = {_toml_array(requirements[:n_project])}")
+    lines.append("")
+    lines.append("[project.optional-dependencies]")
+    for k in range(extras):
+        lines.append(f"extra-{k} = {_toml_array(chunks[k])}")
+    lines.append("")
+    lines.append("[dependency-groups]")
+    for k in range(groups):
+        lines.append(f"group-{k} = {_toml_array(chunks[extras + k])}")
+    lines.append("")
+    lines.append("[build-system]")
+    lines.append('requires = ["uv_build>=0.9.15,<0.10.0", "setuptools>=68"]')
+    return "\n".join(lines) + "\n"
+
+
+def pyproject_data(n_deps: int) -> dict[str, Any]:
+    """
+    pyproject_text 对应的 TOML 数据（已解析为字典）。
+    """
+    import tomllib
+
+    return tomllib.loads(pyproject_text(n_deps))
+
+
+def pypi_payload(n_releases: int) -> dict[str, Any]:
+    """
+    生成含 n_releases 个版本的 PyPI JSON API 响应：混有预发布、开发版、post 版本与无法解析的版本号，每个版本两个文件。
+    """
+    releases: dict[str, list[dict[str, Any]]] = {}
+    for i in range(n_releases):
+        major, minor, patch = i // 400, (i // 20) % 20, i % 20
+        match i % 10:
+            case 7:
+                raw = f"{major}.{minor}.{patch}rc1"
+            case 8:
+                raw = f"{major}.{minor}.{patch}.dev{i}"
+            case 9:
+                raw = f"{major}.{minor}.{patch}.post1" if i % 20 else f"{major}.{minor}-custom_{i}"
+            case _:
+                raw = f"{major}.{minor}.{patch}"
+        day = 1 + i % 28
+        uploaded = f"20{10 + i // 336 % 15:02d}-{1 + i // 28 % 12:02d}-{day:02d}T12:00:00.000000Z"
+        releases[raw] = [
+            {"filename": f"pkg-{raw}.tar.gz", "upload_time_iso_8601": uploaded},
+            {"filename": f"pkg-{raw}-py3-none-any.whl", "upload_time_iso_8601": uploaded},
+        ]
+    latest = max((v for v in releases if v.replace(".", "").isdigit()), key=Version, default="0")
+    return {"info": {"name": "pkg", "version": latest}, "releases": releases}
+
+
+def lookups_for(data: dict[str, Any]) -> dict[str, PackageLookupResult]:
+    """
+    为 pyproject 中的每个依赖构造查询结果；最新版本随包名变化，使各种状态都会出现。
+    """
+    items = flatten_dependencies(extract_dependencies(data))
+    lookups: dict[str, PackageLookupResult] = {}
+    for i, item in enumerate(items):
+        if item.requirement is None:
+            continue
+        name = normalize_project_name(item.requirement.name)
+        lookups[name] = PackageLookupResult(
+            normalized_name=name,
+            index_url=_INDEX_URL,
+            latest=Version(f"{2 + i % 9}.{i % 10}.{i % 3}"),
+            not_found=False,
+            error=None,
+        )
+    return lookups
+
+
+def report_for(n_deps: int, *, path: Path = Path("pyproject.toml")) -> Report:
+    """
+    生成含 n_deps 条依赖的完整检查报告，用于写回与输出格式的基准。
+    """
+    data = pyproject_data(n_deps)
+    items = flatten_dependencies(extract_dependencies(data))
+    return build_report(
+        path,
+        items,
+        lookups=lookups_for(data),
+        config=AppConfig(index=IndexSettings(index_url=_INDEX_URL), use_cache=False),
+        exclude=set(),
+        cache_hits=0,
+        fetched=len(items),
+    )
@@ -1,162 +1,553 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, TypeVar
 
 from packaging.version import Version
-from rich.console import Console
-from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 
-from uv_lens.cache import CacheDB, default_cache_path
+from uv_lens.cache import CacheBackend, CacheDB, CachePolicy, MemoryCache, default_cache_path
 from uv_lens.config import AppConfig
-from uv_lens.models import CheckStatus, DependencyItem
+from uv_lens.index_client import PackageLookupResult, SharedAsyncClient
+from uv_lens.lockfile import locked_dependency_items, merge_locked_items
+from uv_lens.metrics import current_metrics, phase_clock, timed_phase
+from uv_lens.models import CheckStatus, DependencyItem, DependencyKind
 from uv_lens.names import normalize_project_name
-from uv_lens.pyproject import extract_dependencies, load_pyproject_data
-from uv_lens.report import Report, ReportItem
-from uv_lens.resolver import resolve_latest_versions
-from uv_lens.versions import evaluate_requirement_against_latest
+from uv_lens.parse_cache import load_dependency_items_cached
+from uv_lens.report import Report, ReportItem, WorkspaceReport
+from uv_lens.resolver import ResolveStats, iter_latest_versions, resolve_latest_versions
+from uv_lens.tracing import span
+from uv_lens.versions import evaluate_locked_against_latest, evaluate_requirement_cached, version_lag
+from uv_lens.workspace import ParsedProject, iter_workspace_projects, project_sort_key
 
+if TYPE_CHECKING:
+    import httpx
 
-def _collect_dependency_items(dep_sets: list[list[DependencyItem]]) -> list[DependencyItem]:
+T = TypeVar("T")
+
+
+def open_cache_backend(config: AppConfig, *, cache_path: Path | None = None) -> CacheBackend | None:
     """
-    将多个依赖列表拼接为单个列表。
+    按配置打开缓存后端：全局 SQLite（cache_path 缺省为 default_cache_path()），配置了 cache_url 时在其前面加共享缓存服务。
     """
-    items: list[DependencyItem] = []
-    for deps in dep_sets:
-        items.extend(deps)
-    return items
+    if not config.use_cache:
+        return None
+    local = CacheDB(cache_path or default_cache_path())
+    if config.cache_url:
+        from uv_lens.remote_cache import RemoteCache
+
+        return RemoteCache(config.cache_url, fallback=local, token=config.cache_token)
+    return local
 
 
-def _all_items_from_pyproject(pyproject_path: Path) -> list[DependencyItem]:
+def cache_policy_from_config(config: AppConfig) -> CachePolicy:
     """
-    读取 pyproject.toml 并抽取所有依赖项列表。
+    由 AppConfig 构造缓存过期策略。
     """
-    data = load_pyproject_data(pyproject_path)
-    deps = extract_dependencies(data)
-    dev_items = _collect_dependency_items(list(deps.dev_groups.values()))
-    opt_items = _collect_dependency_items(list(deps.optional.values()))
-    return _collect_dependency_items([deps.project, dev_items, opt_items, deps.build_system])
+    return CachePolicy(
+        ttl_s=config.cache_ttl_s,
+        adaptive=config.adaptive_ttl,
+        min_ttl_s=config.cache_ttl_min_s,
+        max_ttl_s=config.cache_ttl_max_s,
+        invalidation=config.invalidation,
+        changelog_index_url=config.changelog_url,
+        not_found_ttl_s=config.cache_not_found_ttl_s,
+        error_ttl_s=config.cache_error_ttl_s,
+        error_max_ttl_s=config.cache_error_max_ttl_s,
+        cache_errors=config.cache_errors,
+    )
 
 
-async def check_pyproject(
+async def prepare_cache_policy(
+    config: AppConfig,
+    cache: CacheBackend | None,
+    *,
+    deadline: float | None = None,
+) -> CachePolicy:
+    """
+    构造缓存策略；变更源模式下先同步变更并标记过期条目，失败时回退到 TTL。
+
+    传入 deadline（time.monotonic() 下的截止时刻）时，同步最多等到截止时刻，超时同样回退到 TTL。
+    """
+    policy = cache_policy_from_config(config)
+    if cache is None or config.refresh or config.invalidation != "changelog":
+        return policy
+
+    from uv_lens.changelog import sync_changelog
+
+    sync = sync_changelog(cache, feed_url=config.changelog_url, timeout_s=config.index.timeout_s)
+    try:
+        since = await asyncio.wait_for(sync, None if deadline is None else max(0.0, deadline - time.monotonic()))
+    except TimeoutError:
+        return policy
+    return replace(policy, changelog_since=since)
+
+
+def create_memory_cache(config: AppConfig, *, cache_path: Path | None = None) -> MemoryCache | None:
+    """
+    为长驻进程（TUI/嵌入调用）创建内存缓存，后端为全局 SQLite 缓存（见 open_cache_backend）。
+    """
+    backend = open_cache_backend(config, cache_path=cache_path)
+    if backend is None:
+        return None
+    return MemoryCache(
+        backend,
+        max_entries=config.memory_cache_size,
+        ttl_s=config.memory_cache_ttl_s,
+    )
+
+
+def requested_names(items: list[DependencyItem], exclude: set[str]) -> list[str]:
+    """
+    返回依赖项中需要查询的规范化包名（去重、排序，跳过无效与排除的依赖）。
+    """
+    names: set[str] = set()
+    for item in items:
+        if item.requirement is None:
+            continue
+        normalized = normalize_project_name(item.requirement.name)
+        if normalized not in exclude:
+            names.add(normalized)
+    return sorted(names)
+
+
+# 超过截止时间、改用过期缓存评估的依赖项附带的说明。
+_STALE_RESULT = "deadline exceeded; using stale cached result"
+
+
+def evaluate_item(
+    item: DependencyItem,
+    *,
+    lookups: dict[str, PackageLookupResult],
+    config: AppConfig,
+    exclude: set[str],
+) -> ReportItem | None:
+    """
+    用已解析的最新版本评估单个依赖项；被 exclude 排除时返回 None。
+    """
+    if item.requirement is None:
+        return ReportItem(
+            kind=item.kind,
+            group=item.group,
+            name="",
+            raw=item.raw,
+            latest=None,
+            status=CheckStatus.INVALID_REQUIREMENT,
+            suggestion=None,
+            index_url=None,
+            error=item.error,
+        )
+
+    normalized = normalize_project_name(item.requirement.name)
+    if normalized in exclude:
+        return None
+
+    lookup = lookups.get(normalized)
+    latest: Version | None = lookup.latest if lookup else None
+    if lookup is not None and lookup.timed_out and latest is None:
+        return ReportItem(
+            kind=item.kind,
+            group=item.group,
+            name=item.requirement.name,
+            raw=item.raw,
+            latest=None,
+            status=CheckStatus.TIMED_OUT,
+            suggestion=None,
+            index_url=None,
+            error=lookup.error,
+        )
+
+    not_found = bool(lookup.not_found) if lookup else False
+    network_error = lookup.error if lookup and not lookup.not_found else None
+    locked = item.locked
+    lag: str | None = None
+    if item.kind == DependencyKind.LOCKED and locked is not None:
+        evaluation = evaluate_locked_against_latest(
+            locked,
+            latest=latest,
+            not_found=not_found,
+            network_error=network_error,
+        )
+        if evaluation.status == CheckStatus.UPGRADE_AVAILABLE:
+            lag = evaluation.reason
+    else:
+        evaluation = evaluate_requirement_cached(
+            item.raw,
+            item.requirement,
+            latest=latest,
+            not_found=not_found,
+            network_error=network_error,
+            pin=config.pin,
+        )
+        if locked is not None and evaluation.latest is not None:
+            lag = version_lag(locked, evaluation.latest)
+    error = lookup.error if lookup else None
+    if lookup is not None and lookup.timed_out:
+        error = _STALE_RESULT
+    return ReportItem(
+        kind=item.kind,
+        group=item.group,
+        name=item.requirement.name,
+        raw=item.raw,
+        latest=evaluation.latest,
+        status=evaluation.status,
+        suggestion=evaluation.suggestion,
+        index_url=lookup.index_url if lookup else None,
+        error=item.error or error,
+        locked=locked,
+        lag=lag,
+        requirement=item.requirement,
+    )
+
+
+def build_report(
     pyproject_path: Path,
+    items: list[DependencyItem],
     *,
+    lookups: dict[str, PackageLookupResult],
     config: AppConfig,
-    on_fetch_start: Callable[[int], Any] | None = None,
-    on_fetch_complete: Callable[[], Any] | None = None,
+    exclude: set[str],
+    cache_hits: int,
+    fetched: int,
+    adaptive_saved: int = 0,
 ) -> Report:
     """
-    检查 pyproject.toml 中的依赖版本并生成报告。
+    用已解析的最新版本逐条评估依赖项，生成单个项目的报告。
     """
-    items = _all_items_from_pyproject(pyproject_path)
-    exclude = {normalize_project_name(n) for n in config.exclude}
+    report_items: list[ReportItem] = []
+    for item in items:
+        report_item = evaluate_item(item, lookups=lookups, config=config, exclude=exclude)
+        if report_item is not None:
+            report_items.append(report_item)
 
-    normalized_names: list[str] = []
+    return Report(
+        pyproject_path=str(pyproject_path),
+        items=report_items,
+        cache_hits=cache_hits,
+        fetched=fetched,
+        adaptive_saved=adaptive_saved,
+    )
+
+
+def _deadline(config: AppConfig) -> float | None:
+    """
+    按 config.deadline_s 计算本次检查的截止时刻（time.monotonic()）；未设置时返回 None。
+    """
+    if config.deadline_s is None or config.deadline_s <= 0:
+        return None
+    return time.monotonic() + config.deadline_s
+
+
+def _lookup_priority(items: list[DependencyItem], exclude: set[str], config: AppConfig) -> dict[str, int] | None:
+    """
+    设置了截止时间且开启 prioritize_project 时的查询优先级：[project] 依赖为 0，其余为 1；否则返回 None。
+    """
+    if _deadline(config) is None or not config.prioritize_project:
+        return None
+    priority: dict[str, int] = {}
     for item in items:
         if item.requirement is None:
             continue
         normalized = normalize_project_name(item.requirement.name)
         if normalized in exclude:
             continue
-        normalized_names.append(normalized)
+        rank = 0 if item.kind == DependencyKind.PROJECT else 1
+        priority[normalized] = min(rank, priority.get(normalized, rank))
+    return priority
+
 
-    unique_names = sorted(set(normalized_names))
+async def _iter_check_indexed(
+    pyproject_path: Path,
+    *,
+    config: AppConfig,
+    cache: CacheBackend | None,
+    lock_path: Path | None,
+    client: httpx.AsyncClient | None,
+    on_fetch_start: Callable[[int], Any] | None,
+    on_fetch_complete: Callable[[], Any] | None,
+    on_stats: Callable[[ResolveStats], Any] | None,
+) -> AsyncIterator[tuple[int, ReportItem]]:
+    """
+    iter_check 的实现：产出 (依赖项在文件中的位置, 评估结果)，供收集方恢复原始顺序。
+    """
+    exclude = {normalize_project_name(n) for n in config.exclude}
+    deadline = _deadline(config)
 
-    cache_db: CacheDB | None = None
-    if config.use_cache:
-        cache_db = CacheDB(default_cache_path())
+    owns_cache = cache is None
+    cache_db: CacheBackend | None = cache
+    if owns_cache:
+        cache_db = open_cache_backend(config)
 
+    metrics = current_metrics()
     try:
-        lookups, stats = await resolve_latest_versions(
-            unique_names,
+        with timed_phase("parse"), span("parse", "app", pyproject=str(pyproject_path)) as parse_span:
+            _, items = load_dependency_items_cached(pyproject_path, store=cache_db)
+            if lock_path is not None:
+                items = merge_locked_items(items, locked_dependency_items(lock_path))
+            parse_span.set(items=len(items))
+
+        by_name: dict[str, list[tuple[int, DependencyItem]]] = {}
+        for position, item in enumerate(items):
+            if item.requirement is None:
+                invalid = evaluate_item(item, lookups={}, config=config, exclude=exclude)
+                if invalid is not None:
+                    yield position, invalid
+                continue
+            normalized = normalize_project_name(item.requirement.name)
+            if normalized not in exclude:
+                by_name.setdefault(normalized, []).append((position, item))
+
+        policy = await prepare_cache_policy(config, cache_db, deadline=deadline)
+        async for name, lookup in iter_latest_versions(
+            sorted(by_name),
             settings=config.index,
             max_concurrency=config.max_concurrency,
             cache=cache_db,
             cache_ttl_s=config.cache_ttl_s,
             refresh=config.refresh,
+            policy=policy,
             on_fetch_start=on_fetch_start,
             on_fetch_complete=on_fetch_complete,
-        )
+            client=client,
+            on_stats=on_stats,
+            deadline=deadline,
+            priority=_lookup_priority(items, exclude, config),
+        ):
+            for position, item in by_name.get(name, []):
+                started = phase_clock()
+                report_item = evaluate_item(item, lookups={name: lookup}, config=config, exclude=exclude)
+                if metrics is not None:
+                    metrics.add_phase_since("evaluation", started)
+                if report_item is not None:
+                    yield position, report_item
+    finally:
+        if owns_cache and cache_db is not None:
+            cache_db.close()
 
-        report_items: list[ReportItem] = []
-        for item in items:
-            if item.requirement is None:
-                report_items.append(
-                    ReportItem(
-                        kind=item.kind,
-                        group=item.group,
-                        name="",
-                        raw=item.raw,
-                        latest=None,
-                        status=CheckStatus.INVALID_REQUIREMENT,
-                        suggestion=None,
-                        index_url=None,
-                        error=item.error,
+
+async def iter_check(
+    pyproject_path: Path,
+    *,
+    config: AppConfig,
+    cache: CacheBackend | None = None,
+    lock_path: Path | None = None,
+    client: httpx.AsyncClient | None = None,
+    on_fetch_start: Callable[[int], Any] | None = None,
+    on_fetch_complete: Callable[[], Any] | None = None,
+    on_stats: Callable[[ResolveStats], Any] | None = None,
+) -> AsyncIterator[ReportItem]:
+    """
+    检查 pyproject.toml 中的依赖版本，逐条产出评估结果。
+
+    无效依赖与缓存命中的包先产出，需要联网查询的包在各自查询完成时产出，因此顺序与文件中不同。
+    传入 cache / client 时复用调用方持有的缓存与连接池（不会关闭）；否则按配置临时打开 SQLite 缓存。
+    传入 lock_path 时同时检查 uv.lock 中的全部锁定包（直接与传递依赖），与 pyproject 依赖合并去重后一次解析。
+    评估经 evaluate_requirement_cached 按 (依赖写法, 最新版本, pin) 在进程内有界 LRU 中复用；全部产出后以统计信息调用 on_stats。
+    """
+    async for _, report_item in _iter_check_indexed(
+        pyproject_path,
+        config=config,
+        cache=cache,
+        lock_path=lock_path,
+        client=client,
+        on_fetch_start=on_fetch_start,
+        on_fetch_complete=on_fetch_complete,
+        on_stats=on_stats,
+    ):
+        yield report_item
+
+
+async def check_pyproject(
+    pyproject_path: Path,
+    *,
+    config: AppConfig,
+    cache: CacheBackend | None = None,
+    on_fetch_start: Callable[[int], Any] | None = None,
+    on_fetch_complete: Callable[[], Any] | None = None,
+    lock_path: Path | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> Report:
+    """
+    检查 pyproject.toml 中的依赖版本并生成报告（收集 iter_check 的结果并按文件中的顺序排列）。
+    """
+    collected: list[tuple[int, ReportItem]] = []
+    stats: list[ResolveStats] = []
+    with span("check_pyproject", "app", pyproject=str(pyproject_path)) as check_span:
+        async for position, report_item in _iter_check_indexed(
+            pyproject_path,
+            config=config,
+            cache=cache,
+            lock_path=lock_path,
+            client=client,
+            on_fetch_start=on_fetch_start,
+            on_fetch_complete=on_fetch_complete,
+            on_stats=stats.append,
+        ):
+            collected.append((position, report_item))
+        check_span.set(items=len(collected))
+
+    collected.sort(key=lambda pair: pair[0])
+    resolve_stats = stats[0] if stats else ResolveStats(total=0, cache_hits=0, fetched=0)
+    return Report(
+        pyproject_path=str(pyproject_path),
+        items=[report_item for _, report_item in collected],
+        cache_hits=resolve_stats.cache_hits,
+        fetched=resolve_stats.fetched,
+        adaptive_saved=resolve_stats.adaptive_saved,
+    )
+
+
+async def check_workspace(
+    root: Path,
+    *,
+    config: AppConfig,
+    projects: list[Path] | None = None,
+    jobs: int = 1,
+    cache: CacheBackend | None = None,
+    on_fetch_start: Callable[[int], Any] | None = None,
+    on_fetch_complete: Callable[[], Any] | None = None,
+) -> WorkspaceReport:
+    """
+    检查工作区内的多个项目：所有项目的包名去重，每个包只解析一次，再分别生成各项目报告与汇总。
+
+    projects 为 None 时按 [tool.uv.workspace] 或目录扫描发现项目；jobs > 1 时用进程池并行发现与解析，
+    每批解析结果中新出现的包名立即交给 resolver，网络查询与剩余的解析同时进行。
+    """
+    exclude = {normalize_project_name(n) for n in config.exclude}
+    deadline = _deadline(config)
+
+    owns_cache = cache is None
+    cache_db: CacheBackend | None = cache
+    if owns_cache:
+        cache_db = open_cache_backend(config)
+
+    parsed: list[ParsedProject] = []
+    project_names: dict[Path, list[str]] = {}
+    seen: set[str] = set()
+    try:
+        policy = await prepare_cache_policy(config, cache_db, deadline=deadline)
+        semaphore = asyncio.Semaphore(max(1, config.max_concurrency))
+        tasks: list[asyncio.Task[tuple[dict[str, PackageLookupResult], ResolveStats]]] = []
+        parse_started = phase_clock()
+        async with SharedAsyncClient(config.index) as client:
+            async for batch in iter_workspace_projects(
+                root, jobs=jobs, projects=projects, skip_dirs=config.workspace_skip_dirs
+            ):
+                new_names: set[str] = set()
+                for project in batch:
+                    parsed.append(project)
+                    names = requested_names(project.items, exclude)
+                    project_names[project.path] = names
+                    new_names.update(n for n in names if n not in seen)
+                if not new_names:
+                    continue
+                seen.update(new_names)
+                tasks.append(
+                    asyncio.create_task(
+                        resolve_latest_versions(
+                            sorted(new_names),
+                            settings=config.index,
+                            max_concurrency=config.max_concurrency,
+                            cache=cache_db,
+                            cache_ttl_s=config.cache_ttl_s,
+                            refresh=config.refresh,
+                            policy=policy,
+                            on_fetch_start=on_fetch_start,
+                            on_fetch_complete=on_fetch_complete,
+                            client=client,
+                            semaphore=semaphore,
+                            deadline=deadline,
+                            priority=_lookup_priority(
+                                [item for project in batch for item in project.items], exclude, config
+                            ),
+                        )
                     )
                 )
-                continue
+            metrics = current_metrics()
+            if metrics is not None:
+                # 解析与联网查询交错进行：这里记录的是发现与解析全部项目所用的时间。
+                metrics.add_phase_since("parse", parse_started)
+            outcomes = await asyncio.gather(*tasks)
+    finally:
+        if owns_cache and cache_db is not None:
+            cache_db.close()
 
-            normalized = normalize_project_name(item.requirement.name)
-            if normalized in exclude:
-                continue
+    lookups: dict[str, PackageLookupResult] = {}
+    fetched_names: set[str] = set()
+    cache_hits = fetched = adaptive_saved = 0
+    for batch_lookups, stats in outcomes:
+        lookups.update(batch_lookups)
+        fetched_names.update(stats.fetched_names)
+        cache_hits += stats.cache_hits
+        fetched += stats.fetched
+        adaptive_saved += stats.adaptive_saved
 
-            lookup = lookups.get(normalized)
-            latest: Version | None = lookup.latest if lookup else None
-            evaluation = evaluate_requirement_against_latest(
-                item.requirement,
-                latest=latest,
-                not_found=bool(lookup.not_found) if lookup else False,
-                network_error=lookup.error if lookup and not lookup.not_found else None,
-                pin=config.pin,
-            )
-            report_items.append(
-                ReportItem(
-                    kind=item.kind,
-                    group=item.group,
-                    name=item.requirement.name,
-                    raw=item.raw,
-                    latest=evaluation.latest,
-                    status=evaluation.status,
-                    suggestion=evaluation.suggestion,
-                    index_url=lookup.index_url if lookup else None,
-                    error=item.error or (lookup.error if lookup else None),
+    reports: list[Report] = []
+    failed: list[tuple[str, str]] = []
+    for project in sorted(parsed, key=lambda p: project_sort_key(p.path)):
+        if project.error is not None:
+            failed.append((str(project.path), project.error))
+            continue
+        names = project_names[project.path]
+        project_fetched = sum(1 for n in names if n in fetched_names)
+        with timed_phase("evaluation"):
+            reports.append(
+                build_report(
+                    project.path,
+                    project.items,
+                    lookups=lookups,
+                    config=config,
+                    exclude=exclude,
+                    cache_hits=len(names) - project_fetched,
+                    fetched=project_fetched,
                 )
             )
 
-        return Report(
-            pyproject_path=str(pyproject_path),
-            items=report_items,
-            cache_hits=stats.cache_hits,
-            fetched=stats.fetched,
-        )
-    finally:
-        if cache_db is not None:
-            cache_db.close()
+    return WorkspaceReport(
+        root=str(root),
+        reports=reports,
+        unique_packages=len(seen),
+        cache_hits=cache_hits,
+        fetched=fetched,
+        adaptive_saved=adaptive_saved,
+        failed=failed,
+    )
 
 
-def run_check(pyproject_path: Path, *, config: AppConfig) -> Report:
+def _run_with_progress(run: Callable[[Callable[[int], Any], Callable[[], Any]], Awaitable[T]]) -> T:
     """
-    同步入口：运行依赖检查（内部使用 asyncio）。
+    在控制台进度条下运行异步检查（仅在需要联网查询时显示进度条）。
+
+    rich 的进度条在第一次需要联网时才导入，全部命中缓存的检查不加载它。
     """
-    console = Console(stderr=True)
     state = {"progress": None, "task_id": None}
 
     def on_start(total: int) -> None:
-        if total > 0:
-            progress = Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                "({task.completed}/{task.total})",
-                console=console,
-                transient=True,
-            )
-            progress.start()
-            task_id = progress.add_task("查询 PyPI...", total=total)
-            state["progress"] = progress
-            state["task_id"] = task_id
+        if total <= 0:
+            return
+        progress = state["progress"]
+        if progress is not None:
+            # 工作区模式下会分批多次调用：累加总数，复用同一个进度条。
+            progress.update(state["task_id"], total=progress.tasks[0].total + total)
+            return
+        from rich.console import Console
+        from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
+
+        progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            "({task.completed}/{task.total})",
+            console=Console(stderr=True),
+            transient=True,
+        )
+        progress.start()
+        task_id = progress.add_task("查询 PyPI...", total=total)
+        state["progress"] = progress
+        state["task_id"] = task_id
 
     def on_complete() -> None:
         progress = state["progress"]
@@ -165,14 +556,61 @@ def run_check(pyproject_path: Path, *, config: AppConfig) -> Report:
             progress.advance(task_id)
 
     try:
-        return asyncio.run(
-            check_pyproject(
-                pyproject_path,
-                config=config,
-                on_fetch_start=on_start,
-                on_fetch_complete=on_complete,
-            )
-        )
+        return asyncio.run(run(on_start, on_complete))
     finally:
         if state["progress"]:
             state["progress"].stop()
+
+
+def run_check(pyproject_path: Path, *, config: AppConfig, lock_path: Path | None = None) -> Report:
+    """
+    同步入口：运行依赖检查（内部使用 asyncio）。
+    """
+    return _run_with_progress(
+        lambda on_start, on_complete: check_pyproject(
+            pyproject_path,
+            config=config,
+            on_fetch_start=on_start,
+            on_fetch_complete=on_complete,
+            lock_path=lock_path,
+        )
+    )
+
+
+def run_check_streaming(
+    pyproject_path: Path,
+    *,
+    config: AppConfig,
+    on_item: Callable[[ReportItem], Any],
+    lock_path: Path | None = None,
+) -> None:
+    """
+    同步入口：逐条检查依赖，每得到一条结果就回调 on_item（用于流式输出）。
+    """
+
+    async def consume(on_start: Callable[[int], Any], on_complete: Callable[[], Any]) -> None:
+        async for report_item in iter_check(
+            pyproject_path,
+            config=config,
+            lock_path=lock_path,
+            on_fetch_start=on_start,
+            on_fetch_complete=on_complete,
+        ):
+            on_item(report_item)
+
+    _run_with_progress(consume)
+
+
+def run_check_workspace(root: Path, *, config: AppConfig, jobs: int = 1) -> WorkspaceReport:
+    """
+    同步入口：检查整个工作区。
+    """
+    return _run_with_progress(
+        lambda on_start, on_complete: check_workspace(
+            root,
+            config=config,
+            jobs=jobs,
+            on_fetch_start=on_start,
+            on_fetch_complete=on_complete,
+        )
+    )
@@ -1,16 +1,137 @@
 from __future__ import annotations
 
+import json
 import os
 import sqlite3
 import sys
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Iterator, Literal, Protocol
 
 from packaging.version import InvalidVersion, Version
 
 
-_SCHEMA_VERSION = 1
+_BATCH_SIZE = 500
+
+
+_BASE_SCHEMA = """
+CREATE TABLE package_cache (
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    latest TEXT,
+    resolved_index_url TEXT,
+    not_found INTEGER NOT NULL,
+    error TEXT,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (scope, name)
+)
+"""
+
+
+def _migrate_add_release_times(cur: sqlite3.Cursor) -> None:
+    """
+    v2：记录最近的发布时间（旧记录为空，下次查询时再回填）。
+    """
+    cur.execute("ALTER TABLE package_cache ADD COLUMN release_times TEXT")
+
+
+def _migrate_add_stale(cur: sqlite3.Cursor) -> None:
+    """
+    v3：变更源失效标记。
+    """
+    cur.execute("ALTER TABLE package_cache ADD COLUMN stale INTEGER NOT NULL DEFAULT 0")
+
+
+def _migrate_add_error_count(cur: sqlite3.Cursor) -> None:
+    """
+    v4：连续失败次数（用于错误缓存的指数退避）；已有错误记录按失败一次回填。
+    """
+    cur.execute("ALTER TABLE package_cache ADD COLUMN error_count INTEGER NOT NULL DEFAULT 0")
+    cur.execute("UPDATE package_cache SET error_count = 1 WHERE error IS NOT NULL AND not_found = 0")
+
+
+def _migrate_split_index_scopes(cur: sqlite3.Cursor) -> None:
+    """
+    v5：缓存键由整条索引链改为单个索引。
+
+    旧的链式记录（scope 含 "|"）按可推断的部分复制到单索引 scope：成功记录归属命中的索引，
+    未找到记录归属链上的每个索引；出错记录无法判断是哪个索引出错，直接丢弃。
+    """
+    rows = cur.execute(
+        """
+        SELECT scope, name, latest, resolved_index_url, not_found, error, fetched_at, release_times, error_count
+        FROM package_cache
+        WHERE scope LIKE '%|%' AND stale = 0
+        """
+    ).fetchall()
+    for scope, name, latest, resolved_index_url, not_found, error, fetched_at, release_times, error_count in rows:
+        if not_found:
+            targets = [u for u in str(scope).split("|") if u]
+        elif error is None and resolved_index_url:
+            targets = [normalize_index_url(str(resolved_index_url))]
+        else:
+            continue
+        for target in targets:
+            cur.execute(
+                """
+                INSERT INTO package_cache(
+                    scope, name, latest, resolved_index_url, not_found, error, fetched_at, release_times, error_count
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope, name) DO UPDATE SET
+                    latest = excluded.latest,
+                    resolved_index_url = excluded.resolved_index_url,
+                    not_found = excluded.not_found,
+                    error = excluded.error,
+                    fetched_at = excluded.fetched_at,
+                    release_times = excluded.release_times,
+                    error_count = excluded.error_count,
+                    stale = 0
+                WHERE excluded.fetched_at > package_cache.fetched_at
+                """,
+                (target, name, latest, resolved_index_url, not_found, error, fetched_at, release_times, error_count),
+            )
+    cur.execute("DELETE FROM package_cache WHERE scope LIKE '%|%'")
+
+
+def _migrate_add_parse_cache(cur: sqlite3.Cursor) -> None:
+    """
+    v6：pyproject 解析结果缓存（按文件内容哈希）。
+    """
+    cur.execute(
+        """
+        CREATE TABLE parse_cache (
+            digest TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            stored_at INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def _migrate_add_latency(cur: sqlite3.Cursor) -> None:
+    """
+    v7：查询耗时（毫秒，平滑后的值，用于调度时先发起慢查询；0 表示未知）。
+    """
+    cur.execute("ALTER TABLE package_cache ADD COLUMN latency_ms INTEGER NOT NULL DEFAULT 0")
+
+
+# 按目标版本排序的迁移步骤：新库从 _BASE_SCHEMA（v1）开始依次执行，旧库只执行缺失的部分。
+# 只能追加新步骤，不要修改已发布的步骤；需要改主键等无法 ALTER 的变更时，新建表并复制数据。
+_MIGRATIONS: list[tuple[int, Callable[[sqlite3.Cursor], None]]] = [
+    (2, _migrate_add_release_times),
+    (3, _migrate_add_stale),
+    (4, _migrate_add_error_count),
+    (5, _migrate_split_index_scopes),
+    (6, _migrate_add_parse_cache),
+    (7, _migrate_add_latency),
+]
+
+# 解析结果缓存的保留时间：超过该时间未写入的记录在下次写入时清理。
+_PARSE_CACHE_RETENTION_S = 30 * 24 * 60 * 60
+_SCHEMA_VERSION = _MIGRATIONS[-1][0]
 
 
 def default_cache_path() -> Path:
@@ -34,12 +155,22 @@ def default_cache_path() -> Path:
     return Path.home() / ".cache" / "uv-lens" / "cache.sqlite3"
 
 
-def index_scope_key(index_url: str, extra_index_urls: tuple[str, ...]) -> str:
+def normalize_index_url(index_url: str) -> str:
+    """
+    归一化索引 URL（去掉空白与尾部斜杠）。
+    """
+    return index_url.strip().rstrip("/")
+
+
+def index_scope_key(index_url: str, extra_index_urls: tuple[str, ...] = ()) -> str:
     """
     将索引配置归一化为缓存的 scope key。
+
+    缓存按单个索引记录（只传 index_url），不同索引组合的项目可共享同一索引上的结果；
+    带 extra_index_urls 的链式 key 仅用于识别旧版本写入的记录。
     """
-    parts = [index_url.strip().rstrip("/")]
-    parts.extend(u.strip().rstrip("/") for u in extra_index_urls)
+    parts = [normalize_index_url(index_url)]
+    parts.extend(normalize_index_url(u) for u in extra_index_urls)
     return "|".join(parts)
 
 
@@ -54,6 +185,278 @@ class CacheEntry:
     not_found: bool
     error: str | None
     fetched_at: int
+    release_times: tuple[int, ...] = ()
+    error_count: int = 0
+    latency_ms: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    """
+    缓存过期策略：全局 TTL，或按发布节奏为每个包推导 TTL（限制在 min/max 之间）。
+
+    invalidation="changelog" 且已建立基线（changelog_since）时，来自 changelog_index_url
+    且在基线之后写入的成功条目不再按时间过期，只由变更源标记失效。
+
+    未找到与出错的记录使用各自更短的 TTL（不超过成功记录的 TTL）；出错记录按连续失败次数
+    指数退避，cache_errors=False 时不缓存错误。
+    """
+
+    ttl_s: int = 24 * 60 * 60
+    adaptive: bool = False
+    min_ttl_s: int = 60 * 60
+    max_ttl_s: int = 7 * 24 * 60 * 60
+    invalidation: Literal["ttl", "changelog"] = "ttl"
+    changelog_index_url: str | None = None
+    changelog_since: int | None = None
+    not_found_ttl_s: int = 6 * 60 * 60
+    error_ttl_s: int = 5 * 60
+    error_max_ttl_s: int = 60 * 60
+    cache_errors: bool = True
+
+    def _cap(self, ttl_s: int) -> int:
+        """
+        将负缓存/错误缓存的 TTL 限制在成功记录的 TTL 以内（0 表示不过期）。
+        """
+        if self.ttl_s <= 0:
+            return ttl_s
+        if ttl_s <= 0:
+            return self.ttl_s
+        return min(ttl_s, self.ttl_s)
+
+    def error_ttl_for(self, entry: CacheEntry) -> int:
+        """
+        出错记录的 TTL：error_ttl_s 起步，每多失败一次翻倍，最多 error_max_ttl_s。
+        """
+        base = max(1, self.error_ttl_s)
+        ttl = base * 2 ** min(max(0, entry.error_count - 1), 32)
+        ttl = min(ttl, max(base, self.error_max_ttl_s))
+        return max(1, self._cap(ttl))
+
+    def _changelog_active(self) -> bool:
+        """
+        变更源失效模式是否生效。
+        """
+        return self.invalidation == "changelog" and self.changelog_since is not None
+
+    def covered_by_changelog(self, entry: CacheEntry) -> bool:
+        """
+        判断条目是否由变更源负责失效（无需按 TTL 过期）。
+        """
+        if not self._changelog_active() or not self.changelog_index_url:
+            return False
+        if entry.error or entry.not_found or entry.resolved_index_url is None:
+            return False
+        if entry.fetched_at < int(self.changelog_since or 0):
+            return False
+        return normalize_index_url(entry.resolved_index_url) == normalize_index_url(self.changelog_index_url)
+
+    def lookup_ttl_s(self) -> int:
+        """
+        从后端读取时使用的 TTL 上界（自适应/变更源模式下放宽，再逐条细筛）。
+        """
+        if self.ttl_s <= 0 or self._changelog_active():
+            return 0
+        if self.adaptive:
+            return max(self.ttl_s, self.max_ttl_s)
+        return self.ttl_s
+
+    def ttl_for(self, entry: CacheEntry, *, now: float) -> int:
+        """
+        计算某条缓存记录的有效 TTL（0 表示不过期）。
+        """
+        if entry.error and not entry.not_found:
+            return self.error_ttl_for(entry)
+        if entry.not_found:
+            return self._cap(self.not_found_ttl_s)
+        if self.covered_by_changelog(entry):
+            return 0
+        if not self.adaptive or self.ttl_s <= 0:
+            return self.ttl_s
+        return adaptive_ttl_s(
+            entry.release_times,
+            now=now,
+            default_ttl_s=self.ttl_s,
+            min_ttl_s=self.min_ttl_s,
+            max_ttl_s=self.max_ttl_s,
+        )
+
+
+_ADAPTIVE_TTL_FRACTION = 0.25
+
+
+def adaptive_ttl_s(
+    release_times: tuple[int, ...],
+    *,
+    now: float,
+    default_ttl_s: int,
+    min_ttl_s: int,
+    max_ttl_s: int,
+) -> int:
+    """
+    根据最近的发布间隔（含距上次发布至今的时长）取中位数的一部分作为 TTL。
+
+    发布越频繁 TTL 越短；没有发布历史时退回 default_ttl_s。
+    """
+    if not release_times:
+        return default_ttl_s
+    times = sorted(release_times)
+    intervals = [b - a for a, b in zip(times, times[1:])]
+    intervals.append(max(0, int(now) - times[-1]))
+    intervals.sort()
+    median = intervals[len(intervals) // 2]
+    ttl = int(median * _ADAPTIVE_TTL_FRACTION)
+    return max(min_ttl_s, min(max_ttl_s, ttl))
+
+
+def _parse_latest(raw: Any) -> Version | None:
+    """
+    解析缓存中保存的版本字符串，无法解析时返回 None。
+    """
+    if not raw:
+        return None
+    try:
+        return Version(str(raw))
+    except InvalidVersion:
+        return None
+
+
+def _is_fresh(fetched_at: int, ttl_s: int) -> bool:
+    """
+    判断记录是否仍在 TTL 内（ttl_s <= 0 表示永不过期）。
+    """
+    return ttl_s <= 0 or (time.time() - fetched_at) <= ttl_s
+
+
+def _parse_release_times(raw: Any) -> tuple[int, ...]:
+    """
+    解析发布时间列表（JSON 文本或列表），非法内容返回空元组。
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return ()
+    if not isinstance(raw, list):
+        return ()
+    return tuple(int(t) for t in raw if isinstance(t, int | float))
+
+
+def _dump_release_times(release_times: tuple[int, ...]) -> str | None:
+    """
+    将发布时间列表序列化为紧凑 JSON 文本。
+    """
+    return json.dumps(list(release_times), separators=(",", ":")) if release_times else None
+
+
+_UPSERT_SQL = """
+INSERT INTO package_cache(
+    scope, name, latest, resolved_index_url, not_found, error, fetched_at, release_times, error_count, latency_ms
+)
+VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(scope, name) DO UPDATE SET
+    latest = excluded.latest,
+    resolved_index_url = excluded.resolved_index_url,
+    not_found = excluded.not_found,
+    error = excluded.error,
+    fetched_at = excluded.fetched_at,
+    release_times = excluded.release_times,
+    error_count = excluded.error_count,
+    latency_ms = excluded.latency_ms,
+    stale = 0
+"""
+
+
+def _row_params(scope: str, name: str, entry: CacheEntry) -> tuple[Any, ...]:
+    """
+    将缓存条目转换为 _UPSERT_SQL 的参数。
+    """
+    return (
+        scope,
+        name,
+        str(entry.latest) if entry.latest else None,
+        entry.resolved_index_url,
+        1 if entry.not_found else 0,
+        entry.error,
+        int(entry.fetched_at),
+        _dump_release_times(entry.release_times),
+        entry.error_count,
+        entry.latency_ms,
+    )
+
+
+def entry_to_json(entry: CacheEntry) -> dict[str, Any]:
+    """
+    将缓存条目转换为可 JSON 序列化的字典（用于远程缓存协议）。
+    """
+    return {
+        "latest": str(entry.latest) if entry.latest else None,
+        "resolved_index_url": entry.resolved_index_url,
+        "not_found": entry.not_found,
+        "error": entry.error,
+        "fetched_at": entry.fetched_at,
+        "release_times": list(entry.release_times),
+        "error_count": entry.error_count,
+        "latency_ms": entry.latency_ms,
+    }
+
+
+def entry_from_json(data: dict[str, Any]) -> CacheEntry:
+    """
+    从 JSON 字典还原缓存条目。
+    """
+    return CacheEntry(
+        latest=_parse_latest(data.get("latest")),
+        resolved_index_url=data.get("resolved_index_url"),
+        not_found=bool(data.get("not_found")),
+        error=data.get("error"),
+        fetched_at=int(data.get("fetched_at") or 0),
+        release_times=_parse_release_times(data.get("release_times")),
+        error_count=int(data.get("error_count") or 0),
+        latency_ms=int(data.get("latency_ms") or 0),
+    )
+
+
+class CacheBackend(Protocol):
+    """
+    resolver 使用的缓存接口（CacheDB / MemoryCache / RemoteCache 均实现）。
+    """
+
+    def get(self, *, scope: str, normalized_name: str, ttl_s: int) -> CacheEntry | None: ...
+
+    def get_many(
+        self, *, scope: str, normalized_names: list[str], ttl_s: int, include_stale: bool = False
+    ) -> dict[str, CacheEntry]: ...
+
+    def set(
+        self,
+        *,
+        scope: str,
+        normalized_name: str,
+        latest: Version | None,
+        resolved_index_url: str | None,
+        not_found: bool,
+        error: str | None,
+        release_times: tuple[int, ...] = (),
+        error_count: int = 0,
+        latency_ms: int = 0,
+    ) -> None: ...
+
+    def invalidate(self, normalized_names: list[str]) -> None: ...
+
+    def get_meta(self, key: str) -> str | None: ...
+
+    def set_meta(self, key: str, value: str) -> None: ...
+
+    def get_parsed(self, digest: str) -> bytes | None: ...
+
+    def set_parsed(self, digest: str, data: bytes) -> None: ...
+
+    async def prefetch(self, names_by_scope: dict[str, list[str]]) -> None: ...
+
+    async def flush(self) -> None: ...
+
+    def close(self) -> None: ...
 
 
 class CacheDB:
@@ -61,13 +464,13 @@ class CacheDB:
     SQLite 缓存数据库（全局共用）。
     """
 
-    def __init__(self, path: Path) -> None:
+    def __init__(self, path: Path, *, check_same_thread: bool = True) -> None:
         """
         初始化缓存数据库连接（必要时创建表结构）。
         """
         self._path = path
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(self._path)
+        self._conn = sqlite3.connect(self._path, check_same_thread=check_same_thread)
         self._conn.row_factory = sqlite3.Row
         self._ensure_schema()
 
@@ -77,44 +480,64 @@ class CacheDB:
         """
         self._conn.close()
 
+    async def prefetch(self, names_by_scope: dict[str, list[str]]) -> None:
+        """
+        本地数据库直接读取，无需预取。
+        """
+        return None
+
+    async def flush(self) -> None:
+        """
+        每次写入都已提交，无需额外刷新。
+        """
+        return None
+
     def _ensure_schema(self) -> None:
         """
-        创建或升级缓存数据库表结构。
+        创建或升级缓存数据库表结构（按顺序执行迁移，保留已有缓存数据）。
         """
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS meta (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """
             )
-            """
-        )
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS package_cache (
-                scope TEXT NOT NULL,
-                name TEXT NOT NULL,
-                latest TEXT,
-                resolved_index_url TEXT,
-                not_found INTEGER NOT NULL,
-                error TEXT,
-                fetched_at INTEGER NOT NULL,
-                PRIMARY KEY (scope, name)
-            )
-            """
-        )
-        cur.execute("SELECT value FROM meta WHERE key = 'schema_version'")
-        row = cur.fetchone()
-        if row is None:
-            cur.execute("INSERT INTO meta(key, value) VALUES('schema_version', ?)", (str(_SCHEMA_VERSION),))
-            self._conn.commit()
+        if self._schema_version() == _SCHEMA_VERSION:
             return
 
-        if int(row["value"]) != _SCHEMA_VERSION:
-            cur.execute("DELETE FROM package_cache")
-            cur.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (str(_SCHEMA_VERSION),))
-            self._conn.commit()
+        cur = self._conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._schema_version()
+            if version is None or version > _SCHEMA_VERSION:
+                cur.execute("DROP TABLE IF EXISTS package_cache")
+                cur.execute("DROP TABLE IF EXISTS parse_cache")
+                cur.execute(_BASE_SCHEMA)
+                version = 1
+            for target, step in _MIGRATIONS:
+                if target > version:
+                    step(cur)
+            cur.execute(
+                """
+                INSERT INTO meta(key, value) VALUES('schema_version', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """,
+                (str(_SCHEMA_VERSION),),
+            )
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def _schema_version(self) -> int | None:
+        """
+        读取当前数据库记录的 schema 版本（未初始化时返回 None）。
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        return None if row is None else int(row["value"])
 
     def get(self, *, scope: str, normalized_name: str, ttl_s: int) -> CacheEntry | None:
         """
@@ -123,9 +546,10 @@ class CacheDB:
         cur = self._conn.cursor()
         cur.execute(
             """
-            SELECT latest, resolved_index_url, not_found, error, fetched_at
+            SELECT latest, resolved_index_url, not_found, error,
+                   fetched_at, release_times, error_count, latency_ms
             FROM package_cache
-            WHERE scope = ? AND name = ?
+            WHERE scope = ? AND name = ? AND stale = 0
             """,
             (scope, normalized_name),
         )
@@ -133,24 +557,103 @@ class CacheDB:
         if row is None:
             return None
 
-        fetched_at = int(row["fetched_at"])
-        if ttl_s > 0 and (time.time() - fetched_at) > ttl_s:
-            return None
+        entry = self._entry_from_row(row)
+        return entry if _is_fresh(entry.fetched_at, ttl_s) else None
+
+    def get_many(
+        self, *, scope: str, normalized_names: list[str], ttl_s: int, include_stale: bool = False
+    ) -> dict[str, CacheEntry]:
+        """
+        批量获取缓存记录，仅返回未过期的条目。
+
+        include_stale 为 True 时也返回被标记过期（invalidate）的记录，供截止时间兜底与历史耗时读取使用。
+        """
+        entries: dict[str, CacheEntry] = {}
+        names = list(dict.fromkeys(normalized_names))
+        stale_filter = "" if include_stale else "AND stale = 0 "
+        cur = self._conn.cursor()
+        for start in range(0, len(names), _BATCH_SIZE):
+            chunk = names[start : start + _BATCH_SIZE]
+            placeholders = ",".join("?" for _ in chunk)
+            cur.execute(
+                f"""
+                SELECT name, latest, resolved_index_url, not_found, error,
+                       fetched_at, release_times, error_count, latency_ms
+                FROM package_cache
+                WHERE scope = ? {stale_filter}AND name IN ({placeholders})
+                """,
+                (scope, *chunk),
+            )
+            for row in cur.fetchall():
+                entry = self._entry_from_row(row)
+                if _is_fresh(entry.fetched_at, ttl_s):
+                    entries[str(row["name"])] = entry
+        return entries
+
+    def invalidate(self, normalized_names: list[str]) -> None:
+        """
+        将指定包在所有 scope 下的记录标记为过期（保留数据，下次读取视为未命中）。
+        """
+        names = list(dict.fromkeys(normalized_names))
+        with self._conn:
+            for start in range(0, len(names), _BATCH_SIZE):
+                chunk = names[start : start + _BATCH_SIZE]
+                placeholders = ",".join("?" for _ in chunk)
+                self._conn.execute(f"UPDATE package_cache SET stale = 1 WHERE name IN ({placeholders})", chunk)
+
+    def get_meta(self, key: str) -> str | None:
+        """
+        读取 meta 表中的值。
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else str(row["value"])
 
-        latest_raw = row["latest"]
-        latest: Version | None = None
-        if latest_raw:
-            try:
-                latest = Version(str(latest_raw))
-            except InvalidVersion:
-                latest = None
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        写入 meta 表中的值。
+        """
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
 
+    def get_parsed(self, digest: str) -> bytes | None:
+        """
+        读取按内容哈希缓存的 pyproject 解析结果。
+        """
+        row = self._conn.execute("SELECT data FROM parse_cache WHERE digest = ?", (digest,)).fetchone()
+        return bytes(row["data"]) if row is not None else None
+
+    def set_parsed(self, digest: str, data: bytes) -> None:
+        """
+        写入 pyproject 解析结果，并清理长期未更新的旧记录。
+        """
+        now = int(time.time())
+        with self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO parse_cache(digest, data, stored_at) VALUES(?, ?, ?)
+                ON CONFLICT(digest) DO UPDATE SET data = excluded.data, stored_at = excluded.stored_at
+                """,
+                (digest, data, now),
+            )
+            self._conn.execute("DELETE FROM parse_cache WHERE stored_at < ?", (now - _PARSE_CACHE_RETENTION_S,))
+
+    @staticmethod
+    def _entry_from_row(row: sqlite3.Row) -> CacheEntry:
+        """
+        将查询行转换为 CacheEntry。
+        """
         return CacheEntry(
-            latest=latest,
+            latest=_parse_latest(row["latest"]),
             resolved_index_url=row["resolved_index_url"],
             not_found=bool(row["not_found"]),
             error=row["error"],
-            fetched_at=fetched_at,
+            fetched_at=int(row["fetched_at"]),
+            release_times=_parse_release_times(row["release_times"]),
+            error_count=int(row["error_count"]),
+            latency_ms=int(row["latency_ms"]),
         )
 
     def set(
@@ -162,30 +665,250 @@ class CacheDB:
         resolved_index_url: str | None,
         not_found: bool,
         error: str | None,
+        release_times: tuple[int, ...] = (),
+        error_count: int = 0,
+        latency_ms: int = 0,
     ) -> None:
         """
         写入缓存记录。
         """
+        entry = CacheEntry(
+            latest=latest,
+            resolved_index_url=resolved_index_url,
+            not_found=not_found,
+            error=error,
+            fetched_at=int(time.time()),
+            release_times=release_times,
+            error_count=error_count,
+            latency_ms=latency_ms,
+        )
+        with self._conn:
+            self._conn.execute(_UPSERT_SQL, _row_params(scope, normalized_name, entry))
+
+    def put_entries(self, *, scope: str, entries: dict[str, CacheEntry]) -> None:
+        """
+        在单个事务中批量写入缓存记录；冲突时保留 fetched_at 较新的一方。
+        """
+        self.merge_scopes({scope: entries})
+
+    def merge_scopes(self, scopes: dict[str, dict[str, CacheEntry]]) -> int:
+        """
+        在单个事务中合并多个 scope 的记录（冲突时保留较新的一方），返回处理的记录数。
+        """
+        rows = [_row_params(scope, name, entry) for scope, entries in scopes.items() for name, entry in entries.items()]
+        with self._conn:
+            self._conn.executemany(
+                _UPSERT_SQL + " WHERE excluded.fetched_at >= package_cache.fetched_at",
+                rows,
+            )
+        return len(rows)
+
+    def iter_entries(
+        self,
+        *,
+        scopes: list[str] | None = None,
+        normalized_names: list[str] | None = None,
+    ) -> Iterator[tuple[str, str, CacheEntry]]:
+        """
+        遍历有效的缓存记录 (scope, name, entry)；可按 scope 与包名过滤。
+        """
+        clauses = ["stale = 0"]
+        params: list[str] = []
+        if scopes is not None:
+            clauses.append(f"scope IN ({','.join('?' for _ in scopes)})")
+            params.extend(scopes)
+        if normalized_names is not None:
+            clauses.append(f"name IN ({','.join('?' for _ in normalized_names)})")
+            params.extend(normalized_names)
         cur = self._conn.cursor()
         cur.execute(
-            """
-            INSERT INTO package_cache(scope, name, latest, resolved_index_url, not_found, error, fetched_at)
-            VALUES(?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(scope, name) DO UPDATE SET
-                latest = excluded.latest,
-                resolved_index_url = excluded.resolved_index_url,
-                not_found = excluded.not_found,
-                error = excluded.error,
-                fetched_at = excluded.fetched_at
+            f"""
+            SELECT scope, name, latest, resolved_index_url, not_found, error,
+                   fetched_at, release_times, error_count, latency_ms
+            FROM package_cache
+            WHERE {" AND ".join(clauses)}
+            ORDER BY scope, name
             """,
-            (
-                scope,
-                normalized_name,
-                str(latest) if latest else None,
-                resolved_index_url,
-                1 if not_found else 0,
-                error,
-                int(time.time()),
-            ),
+            params,
         )
-        self._conn.commit()
+        for row in cur:
+            yield str(row["scope"]), str(row["name"]), self._entry_from_row(row)
+
+
+class MemoryCache:
+    """
+    进程内 LRU 缓存（带 TTL），位于 CacheDB 之前，写入时同步写穿到后端。
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, *, max_entries: int = 4096, ttl_s: float = 600.0) -> None:
+        """
+        初始化内存缓存；backend 为 None 时仅在进程内缓存。
+        """
+        self._backend = backend
+        self._max_entries = max(1, max_entries)
+        self._ttl_s = ttl_s
+        self._entries: OrderedDict[tuple[str, str], tuple[float, CacheEntry]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, normalized_names: list[str]) -> None:
+        """
+        移除内存中对应包的条目，并在后端标记过期。
+        """
+        names = set(normalized_names)
+        for key in [k for k in self._entries if k[1] in names]:
+            del self._entries[key]
+        if self._backend is not None:
+            self._backend.invalidate(normalized_names)
+
+    def get_meta(self, key: str) -> str | None:
+        """
+        读取后端 meta 值（无后端时返回 None）。
+        """
+        return self._backend.get_meta(key) if self._backend is not None else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        写入后端 meta 值。
+        """
+        if self._backend is not None:
+            self._backend.set_meta(key, value)
+
+    def get_parsed(self, digest: str) -> bytes | None:
+        """
+        读取后端的解析结果缓存。
+        """
+        return self._backend.get_parsed(digest) if self._backend is not None else None
+
+    def set_parsed(self, digest: str, data: bytes) -> None:
+        """
+        写入后端的解析结果缓存。
+        """
+        if self._backend is not None:
+            self._backend.set_parsed(digest, data)
+
+    async def prefetch(self, names_by_scope: dict[str, list[str]]) -> None:
+        """
+        让后端预取内存中没有的条目。
+        """
+        if self._backend is None:
+            return
+        missing = {
+            scope: [n for n in names if (scope, n) not in self._entries] for scope, names in names_by_scope.items()
+        }
+        await self._backend.prefetch(missing)
+
+    async def flush(self) -> None:
+        """
+        刷新后端的暂存写入。
+        """
+        if self._backend is not None:
+            await self._backend.flush()
+
+    def close(self) -> None:
+        """
+        清空内存条目并关闭后端。
+        """
+        self._entries.clear()
+        if self._backend is not None:
+            self._backend.close()
+
+    def _remember(self, key: tuple[str, str], entry: CacheEntry) -> None:
+        """
+        写入内存条目并按 LRU 淘汰超出容量的旧条目。
+        """
+        self._entries[key] = (time.monotonic(), entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, *, scope: str, normalized_name: str, ttl_s: int) -> CacheEntry | None:
+        """
+        先查内存，未命中再查后端并回填；若过期或不存在则返回 None。
+        """
+        return self.get_many(scope=scope, normalized_names=[normalized_name], ttl_s=ttl_s).get(normalized_name)
+
+    def _lookup(self, key: tuple[str, str], ttl_s: int) -> CacheEntry | None:
+        """
+        仅在内存中查找条目，过期条目会被移除。
+        """
+        slot = self._entries.get(key)
+        if slot is None:
+            return None
+        stored_at, entry = slot
+        memory_fresh = self._ttl_s <= 0 or (time.monotonic() - stored_at) <= self._ttl_s
+        if memory_fresh and _is_fresh(entry.fetched_at, ttl_s):
+            self._entries.move_to_end(key)
+            return entry
+        del self._entries[key]
+        return None
+
+    def get_many(
+        self, *, scope: str, normalized_names: list[str], ttl_s: int, include_stale: bool = False
+    ) -> dict[str, CacheEntry]:
+        """
+        批量查询：内存未命中的部分一次性交给后端，并回填内存。
+
+        内存中不保留已失效的条目；include_stale 为 True 时由后端补上被标记过期的记录，这些记录不回填内存。
+        """
+        entries: dict[str, CacheEntry] = {}
+        missing: list[str] = []
+        for name in normalized_names:
+            entry = self._lookup((scope, name), ttl_s)
+            if entry is None:
+                missing.append(name)
+                continue
+            entries[name] = entry
+        self.hits += len(entries)
+        self.misses += len(missing)
+
+        if missing and self._backend is not None:
+            fetched = self._backend.get_many(
+                scope=scope, normalized_names=missing, ttl_s=ttl_s, include_stale=include_stale
+            )
+            if not include_stale:
+                for name, entry in fetched.items():
+                    self._remember((scope, name), entry)
+            entries.update(fetched)
+        return entries
+
+    def set(
+        self,
+        *,
+        scope: str,
+        normalized_name: str,
+        latest: Version | None,
+        resolved_index_url: str | None,
+        not_found: bool,
+        error: str | None,
+        release_times: tuple[int, ...] = (),
+        error_count: int = 0,
+        latency_ms: int = 0,
+    ) -> None:
+        """
+        写入内存缓存，并写穿到后端。
+        """
+        if self._backend is not None:
+            self._backend.set(
+                scope=scope,
+                normalized_name=normalized_name,
+                latest=latest,
+                resolved_index_url=resolved_index_url,
+                not_found=not_found,
+                error=error,
+                release_times=release_times,
+                error_count=error_count,
+                latency_ms=latency_ms,
+            )
+        entry = CacheEntry(
+            latest=latest,
+            resolved_index_url=resolved_index_url,
+            not_found=not_found,
+            error=error,
+            fetched_at=int(time.time()),
+            release_times=release_times,
+            error_count=error_count,
+            latency_ms=latency_ms,
+        )
+        self._remember((scope, normalized_name), entry)
+
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import time
+import xmlrpc.client
+from typing import Any
+from xml.parsers.expat import ExpatError
+
+import httpx
+
+from uv_lens.cache import CacheBackend
+from uv_lens.names import normalize_project_name
+
+DEFAULT_CHANGELOG_URL = "https://pypi.org/pypi"
+
+
+def _serial_key(feed_url: str) -> str:
+    """
+    meta 表中保存该变更源最新 serial 的键。
+    """
+    return f"changelog_serial:{feed_url.strip().rstrip('/')}"
+
+
+def _since_key(feed_url: str) -> str:
+    """
+    meta 表中保存该变更源开始生效时间（基线时间）的键。
+    """
+    return f"changelog_since:{feed_url.strip().rstrip('/')}"
+
+
+async def _xmlrpc_call(client: httpx.AsyncClient, url: str, method: str, *params: Any) -> Any:
+    """
+    发起一次 XML-RPC 调用并返回结果（PyPI 的 changelog 接口只提供 XML-RPC）。
+    """
+    body = xmlrpc.client.dumps(params, method)
+    resp = await client.post(url, content=body.encode("utf-8"), headers={"Content-Type": "text/xml"})
+    resp.raise_for_status()
+    result, _ = xmlrpc.client.loads(resp.content)
+    return result[0] if result else None
+
+
+async def fetch_changes_since(
+    client: httpx.AsyncClient,
+    feed_url: str,
+    serial: int,
+) -> tuple[int, set[str]]:
+    """
+    拉取 serial 之后的全部变更事件，返回 (最新 serial, 涉及的规范化包名集合)。
+    """
+    events = await _xmlrpc_call(client, feed_url, "changelog_since_serial", serial)
+    last_serial = serial
+    names: set[str] = set()
+    for event in events or []:
+        if not isinstance(event, (list, tuple)) or len(event) < 5:
+            continue
+        names.add(normalize_project_name(str(event[0])))
+        last_serial = max(last_serial, int(event[4]))
+    return last_serial, names
+
+
+async def fetch_last_serial(client: httpx.AsyncClient, feed_url: str) -> int:
+    """
+    获取变更源当前的全局 serial。
+    """
+    return int(await _xmlrpc_call(client, feed_url, "changelog_last_serial"))
+
+
+async def sync_changelog(
+    cache: CacheBackend,
+    *,
+    feed_url: str = DEFAULT_CHANGELOG_URL,
+    timeout_s: float = 10.0,
+    client: httpx.AsyncClient | None = None,
+) -> int | None:
+    """
+    按变更源失效缓存：只把上次 serial 之后有变动的包标记为过期。
+
+    首次运行时仅记录当前 serial 作为基线。返回基线时间（此后写入的条目不再按 TTL 过期）；
+    变更源不可用时返回 None，调用方应回退到 TTL 策略。
+    """
+    stored = cache.get_meta(_serial_key(feed_url))
+    since_raw = cache.get_meta(_since_key(feed_url))
+
+    owns_client = client is None
+    if client is None:
+        client = httpx.AsyncClient(timeout=httpx.Timeout(timeout_s), follow_redirects=True)
+    try:
+        if stored is None or since_raw is None:
+            serial = await fetch_last_serial(client, feed_url)
+            since = int(time.time())
+            cache.set_meta(_serial_key(feed_url), str(serial))
+            cache.set_meta(_since_key(feed_url), str(since))
+            return since
+
+        serial, names = await fetch_changes_since(client, feed_url, int(stored))
+    except (httpx.HTTPError, xmlrpc.client.Error, ExpatError, ValueError, TypeError):
+        return None
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    if names:
+        cache.invalidate(sorted(names))
+    cache.set_meta(_serial_key(feed_url), str(serial))
+    return int(since_raw)
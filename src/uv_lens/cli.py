@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import argparse
+import os
 from dataclasses import replace
 from pathlib import Path
 import sys
+from typing import TYPE_CHECKING, Any, Callable, TextIO
 
 from uv_lens.config import AppConfig, load_config
-from uv_lens.index_client import IndexAuth, IndexSettings
+from uv_lens.index_settings import IndexAuth, IndexSettings
 from uv_lens.models import PinMode
 
+if TYPE_CHECKING:
+    from uv_lens.report import Report, ReportItem
+
 
 def build_parser() -> argparse.ArgumentParser:
     """
@@ -40,7 +45,53 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--no-cache", action="store_true", help="禁用本地缓存")
     parser.add_argument("--refresh", action="store_true", help="忽略缓存并强制重新查询")
     parser.add_argument("--cache-ttl", type=int, help="缓存 TTL 秒数（0 表示永不过期）")
+    parser.add_argument("--no-cache-errors", action="store_true", help="不缓存查询出错的结果（下次运行重新查询）")
+    parser.add_argument(
+        "--adaptive-ttl",
+        action="store_true",
+        help="按包的发布节奏推导 TTL（范围由 cache_ttl_min_s / cache_ttl_max_s 限定）",
+    )
+    parser.add_argument(
+        "--invalidation",
+        choices=["ttl", "changelog"],
+        help="缓存失效方式：ttl（按时间过期）或 changelog（按 PyPI 变更源只失效有变动的包）",
+    )
+    parser.add_argument("--cache-url", help="共享缓存服务地址（uv-lens cache-serve），不可用时回退本地缓存")
+    parser.add_argument("--offline-index", help="离线版本索引文件（uv-lens index build 生成），优先于网络查询")
     parser.add_argument("--max-concurrency", type=int, help="最大并发请求数")
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="整次检查的时间上限（秒）：到期后取消未完成的查询，改用过期缓存或标记为 timed_out",
+    )
+    parser.add_argument(
+        "--prioritize-project",
+        action="store_true",
+        help="设置了 --deadline 时先查询 [project] 依赖，再查询 dev/optional/build 等其余依赖",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="不转发给 uv-lens daemon，始终在当前进程内检查（也可设置 UV_LENS_NO_DAEMON=1）",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="PATH",
+        help="运行结束后写出指标：各阶段耗时与各索引的请求数、状态码、重试、字节数与耗时直方图（.prom 为 Prometheus 文本格式，否则为 JSON）",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="记录追踪区间（检查、每个包的查询、每个索引、每次请求与重试、缓存读写），写出 Chrome trace JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="（写作 --profile 或 --profile=PATH）在 cProfile 下运行命令：热点函数与各阶段墙钟/CPU 耗时输出到 stderr，完整 profile 写入 PATH（默认：uv-lens.prof）",
+    )
     parser.add_argument(
         "--pin",
         choices=["none", "compatible", "exact"],
@@ -50,8 +101,38 @@ def build_parser() -> argparse.ArgumentParser:
     subparsers = parser.add_subparsers(dest="command")
 
     check = subparsers.add_parser("check", help="检查依赖版本并输出报告")
-    check.add_argument("--format", choices=["table", "json", "md"], default="table", help="输出格式")
+    check.add_argument(
+        "--format",
+        choices=["table", "json", "md", "ndjson"],
+        default="table",
+        help="输出格式（ndjson：每条结果一行，边检查边输出）",
+    )
     check.add_argument("--output", help="输出到文件（默认 stdout）")
+    check.add_argument(
+        "--workspace",
+        action="store_true",
+        help="检查 --pyproject 所在目录下的整个工作区（[tool.uv.workspace] 成员或目录扫描）",
+    )
+    check.add_argument(
+        "--lock",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="同时检查 uv.lock 中的锁定版本（直接与传递依赖，默认：pyproject.toml 同目录的 uv.lock）",
+    )
+    check.add_argument(
+        "--watch",
+        action="store_true",
+        help="监视 pyproject.toml（及 --lock 指定的 uv.lock），变化后只重新检查新增或修改的依赖",
+    )
+    check.add_argument("--watch-interval", type=float, default=0.5, help="监视模式的轮询间隔秒数（默认：0.5）")
+    check.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="工作区模式下并行发现与解析的进程数（0 表示 CPU 核数，默认 1）",
+    )
 
     export_uv = subparsers.add_parser("export-uv", help="生成可直接执行的 uv add 命令列表")
     export_uv.add_argument("--output", help="输出到文件（默认 stdout）")
@@ -65,6 +146,38 @@ def build_parser() -> argparse.ArgumentParser:
     update.add_argument("--write", action="store_true", help="写回 pyproject.toml（默认仅预览）")
     update.add_argument("--output", help="将变更预览输出到文件（默认 stdout）")
 
+    daemon = subparsers.add_parser("daemon", help="常驻进程：保持连接池与内存缓存，check/export-uv 自动转发（Unix socket）")
+    daemon.add_argument("--socket", help="socket 路径（默认：$XDG_RUNTIME_DIR/uv-lens/daemon.sock 或缓存目录）")
+    daemon.add_argument("--idle-timeout", type=float, default=15 * 60, help="空闲多少秒后自动退出（默认：900）")
+    daemon.add_argument("--stop", action="store_true", help="停止正在运行的守护进程")
+    daemon.add_argument("--status", action="store_true", help="查看守护进程是否在运行")
+
+    cache_serve = subparsers.add_parser("cache-serve", help="以 HTTP/JSON 方式共享本地缓存（供 CI runner 共用）")
+    cache_serve.add_argument("--host", default="127.0.0.1", help="监听地址（默认：127.0.0.1）")
+    cache_serve.add_argument("--port", type=int, default=8765, help="监听端口（默认：8765）")
+    cache_serve.add_argument("--db", help="缓存数据库路径（默认：用户目录全局缓存）")
+    cache_serve.add_argument(
+        "--token",
+        help="访问令牌，客户端需通过 UV_LENS_CACHE_TOKEN 提供（默认取 UV_LENS_CACHE_TOKEN；监听非本机地址时必填）",
+    )
+
+    index_cmd = subparsers.add_parser("index", help="离线版本索引（用于无法访问外网的环境）")
+    index_sub = index_cmd.add_subparsers(dest="index_command", required=True)
+    index_build = index_sub.add_parser("build", help="由镜像导出（JSONL 或 PyPI JSON 目录）生成离线索引")
+    index_build.add_argument("dump", help="镜像导出路径：JSONL 文件或包含 *.json 的目录")
+    index_build.add_argument("output", help="输出的离线索引文件路径")
+
+    cache_cmd = subparsers.add_parser("cache", help="导出/导入缓存快照（用于 CI 制品恢复缓存）")
+    cache_sub = cache_cmd.add_subparsers(dest="cache_command", required=True)
+    cache_export = cache_sub.add_parser("export", help="导出缓存快照（gzip 压缩的 JSON）")
+    cache_export.add_argument("output", help="快照文件路径")
+    cache_export.add_argument("--scope", action="append", default=[], help="只导出该索引 URL 下的记录（可重复）")
+    cache_export.add_argument("--package", action="append", default=[], help="只导出该包（可重复）")
+    cache_export.add_argument("--db", help="缓存数据库路径（默认：用户目录全局缓存）")
+    cache_import = cache_sub.add_parser("import", help="导入缓存快照，冲突时保留较新的记录")
+    cache_import.add_argument("input", help="快照文件路径")
+    cache_import.add_argument("--db", help="缓存数据库路径（默认：用户目录全局缓存）")
+
     return parser
 
 
@@ -91,6 +204,7 @@ def _merge_cli_overrides(cfg: AppConfig, args: argparse.Namespace) -> AppConfig:
         retries=index.retries,
         include_prereleases=index.include_prereleases,
         auth=auth,
+        offline_index=getattr(args, "offline_index", None) or index.offline_index,
     )
 
     exclude = tuple([*cfg.exclude, *(args.exclude or [])])
@@ -99,8 +213,16 @@ def _merge_cli_overrides(cfg: AppConfig, args: argparse.Namespace) -> AppConfig:
     cache_ttl_s = cfg.cache_ttl_s if args.cache_ttl is None else int(args.cache_ttl)
     max_concurrency = cfg.max_concurrency if args.max_concurrency is None else int(args.max_concurrency)
     pin: PinMode = cfg.pin if args.pin is None else args.pin
+    cache_url = getattr(args, "cache_url", None) or cfg.cache_url
+    adaptive_ttl = cfg.adaptive_ttl or bool(getattr(args, "adaptive_ttl", False))
+    invalidation = getattr(args, "invalidation", None) or cfg.invalidation
+    cache_errors = cfg.cache_errors and not bool(getattr(args, "no_cache_errors", False))
+    deadline = getattr(args, "deadline", None)
+    deadline_s = cfg.deadline_s if deadline is None else float(deadline)
+    prioritize_project = cfg.prioritize_project or bool(getattr(args, "prioritize_project", False))
 
-    return AppConfig(
+    return replace(
+        cfg,
         index=index,
         max_concurrency=max_concurrency,
         cache_ttl_s=cache_ttl_s,
@@ -108,15 +230,295 @@ def _merge_cli_overrides(cfg: AppConfig, args: argparse.Namespace) -> AppConfig:
         refresh=refresh,
         pin=pin,
         exclude=exclude,
+        cache_url=cache_url,
+        adaptive_ttl=adaptive_ttl,
+        invalidation=invalidation,
+        cache_errors=cache_errors,
+        deadline_s=deadline_s,
+        prioritize_project=prioritize_project,
     )
 
 
+def _run_cache_command(args: argparse.Namespace) -> int:
+    """
+    执行 cache export / cache import。
+    """
+    from uv_lens.cache import CacheDB, default_cache_path
+    from uv_lens.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+    db = CacheDB(Path(args.db) if args.db else default_cache_path())
+    try:
+        if args.cache_command == "export":
+            count = export_snapshot(
+                db,
+                Path(args.output),
+                index_urls=args.scope or None,
+                names=args.package or None,
+            )
+            print(f"已导出 {count} 条缓存记录：{args.output}", file=sys.stderr)
+            return 0
+        try:
+            count = import_snapshot(db, Path(args.input))
+        except SnapshotError as exc:
+            print(f"uv-lens: {exc}", file=sys.stderr)
+            return 1
+        print(f"已导入 {count} 条缓存记录：{args.input}", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+
+def _check_report(
+    args: argparse.Namespace,
+    cfg: AppConfig,
+    pyproject_path: Path,
+    *,
+    lock_path: Path | None = None,
+) -> Report:
+    """
+    执行单项目检查：守护进程在运行时转发给它，否则（或使用 --no-daemon 时）在当前进程内检查。
+
+    指定了 --metrics-out、--trace 或 --profile 时始终在当前进程内检查，使网络请求的指标、追踪与 profile 完整。
+    """
+    use_daemon = not getattr(args, "no_daemon", False) and not os.environ.get("UV_LENS_NO_DAEMON")
+    if use_daemon and not _instrumented(args):
+        from uv_lens.daemon import check_via_daemon
+
+        report = check_via_daemon(pyproject_path, config=cfg, lock_path=lock_path)
+        if report is not None:
+            return report
+
+    from uv_lens.app import run_check
+
+    return run_check(pyproject_path, config=cfg, lock_path=lock_path)
+
+
+def _write_output(output_path: str | None, write: Callable[[TextIO], Any]) -> None:
+    """
+    将输出流式写入 --output 指定的文件；未指定时写到 stdout。
+    """
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            write(f)
+    else:
+        write(sys.stdout)
+
+
+def _emit_report(report: Report, fmt: str, output_path: str | None) -> None:
+    """
+    按 --format 输出单项目报告。
+    """
+    from uv_lens.formatters import print_table, write_json, write_markdown, write_ndjson
+    from uv_lens.metrics import timed_phase
+
+    with timed_phase("render"):
+        if fmt == "table":
+            _write_output(output_path, lambda f: print_table(report, file=f))
+        elif fmt == "json":
+            _write_output(output_path, lambda f: write_json(report, f))
+        elif fmt == "ndjson":
+            _write_output(output_path, lambda f: write_ndjson(report.items, f))
+        else:
+            _write_output(output_path, lambda f: write_markdown(report, f))
+
+
+def _run_ndjson_check(args: argparse.Namespace, cfg: AppConfig, pyproject_path: Path, lock_path: Path | None) -> int:
+    """
+    执行 check --format ndjson：每得到一条结果立即输出一行，不等待全部查询完成。
+    """
+    from uv_lens.app import run_check_streaming
+    from uv_lens.formatters import ndjson_line
+
+    def write(f: TextIO) -> None:
+        interactive = f is sys.stdout
+
+        def on_item(item: ReportItem) -> None:
+            f.write(ndjson_line(item))
+            if interactive:
+                f.flush()
+
+        run_check_streaming(pyproject_path, config=cfg, lock_path=lock_path, on_item=on_item)
+
+    try:
+        _write_output(getattr(args, "output", None), write)
+    except Exception as exc:
+        print(f"uv-lens: 解析或检查失败：{exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_watch_check(args: argparse.Namespace, cfg: AppConfig, pyproject_path: Path, lock_path: Path | None) -> int:
+    """
+    执行 check --watch：文件变化时增量检查并重新输出报告，直到 Ctrl+C。
+    """
+    import asyncio
+
+    from uv_lens.app import create_memory_cache
+    from uv_lens.index_client import create_async_client
+    from uv_lens.watch import IncrementalChecker, ItemsDiff, watch
+
+    output_path = getattr(args, "output", None)
+
+    def on_report(report: Report, diff: ItemsDiff) -> None:
+        _emit_report(report, args.format, output_path)
+        print(
+            f"uv-lens: 新增/修改 {len(diff.added)}，移除 {len(diff.removed)}，未变化 {diff.unchanged}；等待文件变化…",
+            file=sys.stderr,
+        )
+
+    async def run() -> None:
+        cache = create_memory_cache(cfg)
+        try:
+            async with create_async_client(cfg.index) as client:
+                checker = IncrementalChecker(pyproject_path, config=cfg, cache=cache, lock_path=lock_path, client=client)
+                await watch(checker, on_report, interval_s=args.watch_interval)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _run_daemon_command(args: argparse.Namespace) -> int:
+    """
+    执行 daemon 子命令：前台运行、停止或查看状态。
+    """
+    from uv_lens.daemon import daemon_supported, ping_daemon, run_daemon, stop_daemon
+
+    if not daemon_supported():
+        print("uv-lens: 当前平台不支持 Unix socket，无法启动守护进程。", file=sys.stderr)
+        return 2
+    socket_path = Path(args.socket) if args.socket else None
+    if args.stop:
+        if not stop_daemon(socket_path):
+            print("uv-lens: 守护进程未运行。", file=sys.stderr)
+            return 1
+        return 0
+    if args.status:
+        status = ping_daemon(socket_path)
+        if status is None:
+            print("uv-lens: 守护进程未运行。", file=sys.stderr)
+            return 1
+        print(f"pid={status.get('pid')} requests={status.get('requests')}")
+        return 0
+    try:
+        run_daemon(socket_path, idle_timeout_s=args.idle_timeout)
+    except (OSError, RuntimeError) as exc:
+        print(f"uv-lens: 守护进程启动失败：{exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_workspace_check(args: argparse.Namespace, cfg: AppConfig, pyproject_path: Path) -> int:
+    """
+    执行 check --workspace：一次解析工作区内所有项目的依赖。
+    """
+    from uv_lens.app import run_check_workspace
+    from uv_lens.formatters import (
+        print_workspace_table,
+        render_workspace_markdown,
+        write_workspace_json,
+        write_workspace_ndjson,
+    )
+    from uv_lens.metrics import timed_phase
+
+    root = pyproject_path.parent if pyproject_path.name == "pyproject.toml" else pyproject_path
+    try:
+        jobs = int(getattr(args, "jobs", 1))
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        report = run_check_workspace(root, config=cfg, jobs=jobs)
+    except Exception as exc:
+        print(f"uv-lens: 解析或检查失败：{exc}", file=sys.stderr)
+        return 1
+    output_path = getattr(args, "output", None)
+    with timed_phase("render"):
+        if args.format == "table":
+            _write_output(output_path, lambda f: print_workspace_table(report, file=f))
+        elif args.format == "json":
+            _write_output(output_path, lambda f: write_workspace_json(report, f))
+        elif args.format == "ndjson":
+            _write_output(output_path, lambda f: write_workspace_ndjson(report, f))
+        else:
+            _write_output(output_path, lambda f: f.write(render_workspace_markdown(report)))
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     """
     uv-lens 命令行入口。
     """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # --profile[=PATH]：不带 = 时不消费下一个参数，避免把子命令名当作路径。
+    argv = ["--profile=" if arg == "--profile" else arg for arg in argv]
     args = build_parser().parse_args(argv)
+    if not _instrumented(args):
+        return _run_command(args)
+    return _run_instrumented(args)
+
+
+def _instrumented(args: argparse.Namespace) -> bool:
+    """
+    是否开启了指标收集、追踪或性能分析（此时检查总在当前进程内执行）。
+    """
+    return bool(
+        getattr(args, "metrics_out", None) or getattr(args, "trace", None) or getattr(args, "profile", None) is not None
+    )
+
+
+def _run_instrumented(args: argparse.Namespace) -> int:
+    """
+    在开启指标收集（--metrics-out）、追踪（--trace）与性能分析（--profile）的上下文中执行子命令，结束后写出结果文件。
+    """
+    from contextlib import ExitStack
 
+    from uv_lens.metrics import RunMetrics, collect_metrics, write_metrics
+    from uv_lens.tracing import Tracer, span, tracing
+
+    metrics: RunMetrics | None = None
+    tracer: Tracer | None = None
+    profiler = None
+    with ExitStack() as stack:
+        if args.metrics_out or args.profile is not None:
+            metrics = stack.enter_context(collect_metrics(RunMetrics()))
+        if args.trace:
+            tracer = stack.enter_context(tracing(Tracer()))
+            stack.enter_context(span(f"uv-lens {args.command or 'tui'}", "cli"))
+        if args.profile is not None:
+            import cProfile
+
+            from uv_lens.profiling import import_command_modules
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            stack.callback(profiler.disable)
+            import_command_modules()
+        code = _run_command(args)
+
+    try:
+        if metrics is not None:
+            metrics.finish(exit_code=code)
+        if args.metrics_out and metrics is not None:
+            write_metrics(metrics, Path(args.metrics_out))
+        if tracer is not None:
+            tracer.write(Path(args.trace))
+        if profiler is not None and metrics is not None:
+            from uv_lens.profiling import DEFAULT_PROFILE_PATH, write_profile_report
+
+            write_profile_report(profiler, metrics, Path(args.profile or DEFAULT_PROFILE_PATH), file=sys.stderr)
+    except OSError as exc:
+        print(f"uv-lens: 写出指标、追踪或 profile 文件失败：{exc}", file=sys.stderr)
+    return code
+
+
+def _run_command(args: argparse.Namespace) -> int:
+    """
+    执行解析后的子命令，返回退出码。
+    """
     if args.version:
         from uv_lens import __version__
 
@@ -131,43 +533,71 @@ def main(argv: list[str] | None = None) -> int:
             return 2
         return run_tui(Path(args.pyproject))
 
-    cfg = _merge_cli_overrides(load_config(args.config), args)
+    if args.command == "cache-serve":
+        from uv_lens.cache import default_cache_path
+        from uv_lens.remote_cache import TOKEN_ENV, serve_cache
+
+        db_path = Path(args.db) if args.db else default_cache_path()
+        token = args.token or os.environ.get(TOKEN_ENV) or None
+        try:
+            serve_cache(db_path, host=args.host, port=args.port, token=token)
+        except ValueError as exc:
+            print(f"uv-lens: {exc}", file=sys.stderr)
+            return 2
+        except OSError as exc:
+            print(f"uv-lens: 缓存服务启动失败：{exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.command == "cache":
+        return _run_cache_command(args)
+
+    if args.command == "daemon":
+        return _run_daemon_command(args)
+
+    if args.command == "index":
+        from uv_lens.offline_index import build_offline_index, iter_dump_records
+
+        try:
+            count = build_offline_index(iter_dump_records(Path(args.dump)), Path(args.output))
+        except OSError as exc:
+            print(f"uv-lens: 生成离线索引失败：{exc}", file=sys.stderr)
+            return 1
+        print(f"已写入 {count} 个包：{args.output}", file=sys.stderr)
+        return 0
+
+    from uv_lens.metrics import timed_phase
+
+    with timed_phase("config"):
+        cfg = _merge_cli_overrides(load_config(args.config), args)
     pyproject_path = Path(args.pyproject)
 
-    if args.command == "check":
-        from uv_lens.app import run_check
-        from uv_lens.formatters import print_table, render_json, render_markdown
+    if args.command == "check" and getattr(args, "workspace", False):
+        return _run_workspace_check(args, cfg, pyproject_path)
 
+    if args.command == "check":
+        lock_arg = getattr(args, "lock", None)
+        lock_path: Path | None = None
+        if lock_arg is not None:
+            lock_path = Path(lock_arg) if lock_arg else pyproject_path.parent / "uv.lock"
+        if getattr(args, "watch", False):
+            return _run_watch_check(args, cfg, pyproject_path, lock_path)
+        if args.format == "ndjson":
+            return _run_ndjson_check(args, cfg, pyproject_path, lock_path)
         try:
-            report = run_check(pyproject_path, config=cfg)
+            report = _check_report(args, cfg, pyproject_path, lock_path=lock_path)
         except Exception as exc:
             print(f"uv-lens: 解析或检查失败：{exc}", file=sys.stderr)
             return 1
-        output_path = getattr(args, "output", None)
-        if args.format == "table":
-            if output_path:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    print_table(report, file=f)
-            else:
-                print_table(report)
-            return 0
-        if args.format == "json":
-            text = render_json(report)
-        else:
-            text = render_markdown(report)
-        if output_path:
-            Path(output_path).write_text(text, encoding="utf-8")
-        else:
-            print(text)
+        _emit_report(report, args.format, getattr(args, "output", None))
         return 0
 
     if args.command == "export-uv":
-        from uv_lens.app import run_check
         from uv_lens.uv_commands import generate_uv_add_commands
 
         export_pin: PinMode = cfg.pin if cfg.pin != "none" else "exact"
         try:
-            report = run_check(pyproject_path, config=replace(cfg, pin=export_pin))
+            report = _check_report(args, replace(cfg, pin=export_pin), pyproject_path)
         except Exception as exc:
             print(f"uv-lens: 解析或检查失败：{exc}", file=sys.stderr)
             return 1
@@ -3,16 +3,19 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 try:
     import tomllib
 except ModuleNotFoundError:  # pragma: no cover
     import tomli as tomllib
 
-from uv_lens.index_client import IndexAuth, IndexSettings
+from uv_lens.index_settings import IndexAuth, IndexSettings
 from uv_lens.models import PinMode
 
+# 工作区扫描时默认额外跳过的目录名（依赖的源码副本）；可用配置 workspace_skip_dirs 替换。
+DEFAULT_WORKSPACE_SKIP_DIRS: tuple[str, ...] = ("vendor", "_vendor", "third_party")
+
 
 @dataclass(frozen=True, slots=True)
 class AppConfig:
@@ -27,6 +30,22 @@ class AppConfig:
     refresh: bool = False
     pin: PinMode = "none"
     exclude: tuple[str, ...] = ()
+    memory_cache_size: int = 4096
+    memory_cache_ttl_s: float = 600.0
+    cache_url: str | None = None
+    cache_token: str | None = None
+    adaptive_ttl: bool = False
+    cache_ttl_min_s: int = 60 * 60
+    cache_ttl_max_s: int = 7 * 24 * 60 * 60
+    invalidation: Literal["ttl", "changelog"] = "ttl"
+    changelog_url: str = "https://pypi.org/pypi"
+    cache_not_found_ttl_s: int = 6 * 60 * 60
+    cache_error_ttl_s: int = 5 * 60
+    cache_error_max_ttl_s: int = 60 * 60
+    cache_errors: bool = True
+    deadline_s: float | None = None
+    prioritize_project: bool = False
+    workspace_skip_dirs: tuple[str, ...] = DEFAULT_WORKSPACE_SKIP_DIRS
 
 
 def _find_default_config_file(cwd: Path) -> Path | None:
@@ -119,6 +138,7 @@ def load_config(config_path: str | None) -> AppConfig:
     include_prereleases = bool(tool_cfg.get("include_prereleases") or False)
     retries = int(tool_cfg.get("retries") or 2)
     timeout_s = float(tool_cfg.get("timeout_s") or 10.0)
+    offline_index = os.environ.get("UV_LENS_OFFLINE_INDEX") or str(tool_cfg.get("offline_index") or "") or None
 
     settings = IndexSettings(
         index_url=index_url,
@@ -127,6 +147,7 @@ def load_config(config_path: str | None) -> AppConfig:
         retries=retries,
         include_prereleases=include_prereleases,
         auth=auth,
+        offline_index=offline_index,
     )
 
     max_concurrency = int(tool_cfg.get("max_concurrency") or 20)
@@ -135,6 +156,28 @@ def load_config(config_path: str | None) -> AppConfig:
     refresh = bool(tool_cfg.get("refresh") or False)
     pin = str(tool_cfg.get("pin") or "none")
     exclude = tuple(tool_cfg.get("exclude") or [])
+    memory_cache_size = int(tool_cfg.get("memory_cache_size") or 4096)
+    memory_cache_ttl_s = float(tool_cfg.get("memory_cache_ttl_s") or 600.0)
+    adaptive_ttl = bool(tool_cfg.get("adaptive_ttl") or False)
+    cache_ttl_min_s = int(tool_cfg.get("cache_ttl_min_s") or (60 * 60))
+    cache_ttl_max_s = int(tool_cfg.get("cache_ttl_max_s") or (7 * 24 * 60 * 60))
+    invalidation = str(tool_cfg.get("invalidation") or "ttl")
+    changelog_url = str(tool_cfg.get("changelog_url") or "https://pypi.org/pypi")
+    cache_not_found_ttl_s = int(tool_cfg.get("cache_not_found_ttl_s") or (6 * 60 * 60))
+    cache_error_ttl_s = int(tool_cfg.get("cache_error_ttl_s") or (5 * 60))
+    cache_error_max_ttl_s = int(tool_cfg.get("cache_error_max_ttl_s") or (60 * 60))
+    cache_errors = bool(tool_cfg.get("cache_errors") if "cache_errors" in tool_cfg else True)
+    deadline_raw = os.environ.get("UV_LENS_DEADLINE") or tool_cfg.get("deadline_s")
+    deadline_s = float(deadline_raw) if deadline_raw else None
+    prioritize_project = bool(tool_cfg.get("prioritize_project") or False)
+    workspace_skip_dirs = (
+        tuple(str(d) for d in tool_cfg.get("workspace_skip_dirs") or [])
+        if "workspace_skip_dirs" in tool_cfg
+        else DEFAULT_WORKSPACE_SKIP_DIRS
+    )
+    cache_url = os.environ.get("UV_LENS_CACHE_URL") or str(tool_cfg.get("cache_url") or "") or None
+    # 令牌只从环境变量读取，不写进可能提交到仓库的配置文件。
+    cache_token = os.environ.get("UV_LENS_CACHE_TOKEN") or None
 
     return AppConfig(
         index=settings,
@@ -144,4 +187,20 @@ def load_config(config_path: str | None) -> AppConfig:
         refresh=refresh,
         pin=pin if pin in {"none", "compatible", "exact"} else "none",
         exclude=exclude,
+        memory_cache_size=memory_cache_size,
+        memory_cache_ttl_s=memory_cache_ttl_s,
+        cache_url=cache_url,
+        cache_token=cache_token,
+        adaptive_ttl=adaptive_ttl,
+        cache_ttl_min_s=cache_ttl_min_s,
+        cache_ttl_max_s=cache_ttl_max_s,
+        invalidation="changelog" if invalidation == "changelog" else "ttl",
+        changelog_url=changelog_url,
+        cache_not_found_ttl_s=cache_not_found_ttl_s,
+        cache_error_ttl_s=cache_error_ttl_s,
+        cache_error_max_ttl_s=cache_error_max_ttl_s,
+        cache_errors=cache_errors,
+        deadline_s=deadline_s,
+        prioritize_project=prioritize_project,
+        workspace_skip_dirs=workspace_skip_dirs,
     )
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import sys
+import time
+from dataclasses import asdict, fields, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from packaging.version import Version
+
+from uv_lens.cache import MemoryCache, default_cache_path
+from uv_lens.config import AppConfig
+from uv_lens.index_settings import IndexAuth, IndexSettings
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.report import Report, ReportItem
+
+if TYPE_CHECKING:
+    import httpx
+
+DAEMON_PROTOCOL_VERSION = 2
+DEFAULT_IDLE_TIMEOUT_S = 15 * 60
+
+# 单个请求/响应行的上限（工作区级别的报告也足够）。
+_MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# 连接守护进程的超时。
+_CONNECT_TIMEOUT_S = 0.5
+# 等待响应的上限：ping / shutdown 应立即返回；检查需要联网，配置了 deadline_s 时为其加上余量，超时后回退到进程内检查。
+_CONTROL_TIMEOUT_S = 5.0
+_CHECK_TIMEOUT_S = 300.0
+_DEADLINE_GRACE_S = 5.0
+
+
+def _wire_schema() -> str:
+    """
+    请求与响应中各结构的字段名摘要：配置或报告增删字段后，新旧版本的客户端与守护进程不会互相接受对方的请求。
+    """
+    shape = [
+        (cls.__name__, sorted(f.name for f in fields(cls)))
+        for cls in (AppConfig, IndexSettings, IndexAuth, Report, ReportItem)
+    ]
+    return hashlib.sha256(json.dumps(shape).encode("utf-8")).hexdigest()[:12]
+
+
+# 实际在请求中携带、由守护进程校验的协议标识：手动维护的版本号加字段摘要。
+DAEMON_PROTOCOL = f"{DAEMON_PROTOCOL_VERSION}:{_wire_schema()}"
+
+
+class DaemonError(RuntimeError):
+    """
+    守护进程返回了错误，或响应无法识别。
+    """
+
+
+def daemon_supported() -> bool:
+    """
+    当前平台是否支持 Unix socket 守护进程。
+    """
+    return hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path() -> Path:
+    """
+    返回守护进程的 socket 路径：UV_LENS_DAEMON_SOCKET > $XDG_RUNTIME_DIR/uv-lens/daemon.sock > 缓存目录。
+    """
+    env = os.environ.get("UV_LENS_DAEMON_SOCKET")
+    if env:
+        return Path(env)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "uv-lens" / "daemon.sock"
+    return default_cache_path().parent / "daemon.sock"
+
+
+def config_to_json(config: AppConfig) -> dict[str, Any]:
+    """
+    将 AppConfig 转换为可 JSON 序列化的字典（客户端随请求发送，守护进程按调用方的配置执行）。
+    """
+    return asdict(config)
+
+
+def absolute_config(config: AppConfig) -> AppConfig:
+    """
+    将配置中的相对路径（离线索引）按当前工作目录转为绝对路径：守护进程的工作目录与调用方不同。
+    """
+    offline_index = config.index.offline_index
+    if not offline_index:
+        return config
+    return replace(config, index=replace(config.index, offline_index=str(Path(offline_index).resolve())))
+
+
+def config_from_json(data: dict[str, Any]) -> AppConfig:
+    """
+    由 config_to_json 的结果还原 AppConfig。
+    """
+    values = dict(data)
+    index = dict(values.pop("index"))
+    auth = index.pop("auth", None)
+    index["extra_index_urls"] = tuple(index.get("extra_index_urls") or ())
+    values["exclude"] = tuple(values.get("exclude") or ())
+    return AppConfig(
+        index=IndexSettings(**index, auth=IndexAuth(**auth) if auth else None),
+        **values,
+    )
+
+
+def report_to_wire(report: Report) -> dict[str, Any]:
+    """
+    将报告编码为传输格式（枚举取值、版本转字符串；解析后的 requirement 不传输）。
+    """
+    names = [f.name for f in fields(ReportItem) if f.name != "requirement"]
+    items = []
+    for item in report.items:
+        data = {name: getattr(item, name) for name in names}
+        data["kind"] = item.kind.value
+        data["status"] = item.status.value
+        data["latest"] = str(item.latest) if item.latest is not None else None
+        data["locked"] = str(item.locked) if item.locked is not None else None
+        items.append(data)
+    return {
+        "pyproject_path": report.pyproject_path,
+        "items": items,
+        "cache_hits": report.cache_hits,
+        "fetched": report.fetched,
+        "adaptive_saved": report.adaptive_saved,
+    }
+
+
+def report_from_wire(data: dict[str, Any]) -> Report:
+    """
+    由 report_to_wire 的结果还原报告。
+    """
+    items = []
+    for raw in data.get("items") or []:
+        values = dict(raw)
+        values["kind"] = DependencyKind(values["kind"])
+        values["status"] = CheckStatus(values["status"])
+        values["latest"] = Version(values["latest"]) if values.get("latest") else None
+        values["locked"] = Version(values["locked"]) if values.get("locked") else None
+        items.append(ReportItem(**values))
+    return Report(
+        pyproject_path=str(data["pyproject_path"]),
+        items=items,
+        cache_hits=int(data.get("cache_hits", 0)),
+        fetched=int(data.get("fetched", 0)),
+        adaptive_saved=int(data.get("adaptive_saved", 0)),
+    )
+
+
+class LensDaemon:
+    """
+    常驻进程：在多次请求间保留 HTTP 连接池、内存缓存与已导入的模块，空闲超时后自动退出。
+
+    每个请求携带调用方的完整配置；连接池按索引配置复用，内存缓存按缓存配置复用。
+    """
+
+    def __init__(self, *, idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S) -> None:
+        """
+        初始化守护进程状态（尚未监听）。
+        """
+        self._idle_timeout_s = idle_timeout_s
+        self._clients: dict[IndexSettings, httpx.AsyncClient] = {}
+        self._caches: dict[tuple[Any, ...], MemoryCache | None] = {}
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._stop: asyncio.Event | None = None
+        self.requests = 0
+
+    def _client_for(self, settings: IndexSettings) -> httpx.AsyncClient:
+        """
+        返回该索引配置对应的长驻 HTTP 客户端。
+        """
+        client = self._clients.get(settings)
+        if client is None:
+            from uv_lens.index_client import create_async_client
+
+            client = create_async_client(settings)
+            self._clients[settings] = client
+        return client
+
+    def _cache_for(self, config: AppConfig, cache_path: Path | None = None) -> MemoryCache | None:
+        """
+        返回该缓存配置对应的长驻内存缓存（禁用缓存时为 None）；cache_path 为调用方的缓存库路径，缺省时用守护进程自己的默认路径。
+        """
+        key = (config.use_cache, config.cache_url, config.memory_cache_size, config.memory_cache_ttl_s, cache_path)
+        if key not in self._caches:
+            from uv_lens.app import create_memory_cache
+
+            self._caches[key] = create_memory_cache(config, cache_path=cache_path)
+        return self._caches[key]
+
+    async def handle_request(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """
+        处理一条请求：ping / shutdown / check。
+        """
+        command = payload.get("command")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid(), "protocol": DAEMON_PROTOCOL, "requests": self.requests}
+        if command == "shutdown":
+            if self._stop is not None:
+                self._stop.set()
+            return {"ok": True}
+        if command != "check":
+            return {"ok": False, "error": f"unknown command: {command}"}
+
+        from uv_lens.app import check_pyproject
+
+        config = config_from_json(payload["config"])
+        lock = payload.get("lock")
+        cache_path = payload.get("cache_path")
+        report = await check_pyproject(
+            Path(payload["pyproject"]),
+            config=config,
+            cache=self._cache_for(config, Path(cache_path) if cache_path else None),
+            lock_path=Path(lock) if lock else None,
+            client=self._client_for(config.index),
+        )
+        self.requests += 1
+        return {"ok": True, "report": report_to_wire(report)}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        每个连接处理一条以换行结尾的 JSON 请求并写回一条 JSON 响应。
+        """
+        self._active += 1
+        try:
+            line = await reader.readline()
+            try:
+                payload = json.loads(line)
+                if not isinstance(payload, dict) or payload.get("protocol") != DAEMON_PROTOCOL:
+                    response: dict[str, Any] = {"ok": False, "error": "unsupported daemon protocol"}
+                else:
+                    response = await self.handle_request(payload)
+            except Exception as exc:
+                response = {"ok": False, "error": str(exc)}
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+            self._active -= 1
+            self._last_activity = time.monotonic()
+
+    async def _watch_idle(self) -> None:
+        """
+        没有进行中的请求且空闲超过 idle_timeout_s 时停止服务。
+        """
+        assert self._stop is not None
+        interval = min(max(self._idle_timeout_s / 4, 0.05), 5.0)
+        while not self._stop.is_set():
+            await asyncio.sleep(interval)
+            if self._active == 0 and time.monotonic() - self._last_activity >= self._idle_timeout_s:
+                self._stop.set()
+
+    async def serve(self, socket_path: Path) -> None:
+        """
+        在 Unix socket 上提供服务，直到收到 shutdown 或空闲超时。
+        """
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if socket_path.exists():
+            if ping_daemon(socket_path) is not None:
+                raise DaemonError(f"守护进程已在运行：{socket_path}")
+            socket_path.unlink()
+
+        self._stop = asyncio.Event()
+        self._last_activity = time.monotonic()
+        # 在 bind 时就只允许当前用户访问，避免先创建再 chmod 之间的窗口。
+        previous_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self._handle_connection, path=str(socket_path), limit=_MAX_MESSAGE_BYTES
+            )
+        finally:
+            os.umask(previous_umask)
+        watcher = asyncio.create_task(self._watch_idle())
+        try:
+            await self._stop.wait()
+        finally:
+            watcher.cancel()
+            server.close()
+            await server.wait_closed()
+            await self.aclose()
+            try:
+                socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    async def aclose(self) -> None:
+        """
+        关闭长驻的 HTTP 客户端与缓存。
+        """
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        for cache in self._caches.values():
+            if cache is not None:
+                cache.close()
+        self._caches.clear()
+
+
+def run_daemon(socket_path: Path | None = None, *, idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S) -> None:
+    """
+    前台运行守护进程，直到 shutdown、空闲超时或 Ctrl+C。
+    """
+    path = socket_path or default_socket_path()
+    print(f"uv-lens daemon: {path}（空闲 {idle_timeout_s:g}s 后退出）", file=sys.stderr)
+    try:
+        asyncio.run(LensDaemon(idle_timeout_s=idle_timeout_s).serve(path))
+    except KeyboardInterrupt:
+        pass
+
+
+def request_daemon(
+    payload: dict[str, Any],
+    *,
+    socket_path: Path | None = None,
+    timeout_s: float = _CONTROL_TIMEOUT_S,
+) -> dict[str, Any] | None:
+    """
+    向守护进程发送一条请求；守护进程未运行（socket 不存在或无法连接）时返回 None。
+
+    timeout_s 秒内未收到完整响应时抛出 DaemonError。
+    """
+    if not daemon_supported():
+        return None
+    path = socket_path or default_socket_path()
+    if not path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(_CONNECT_TIMEOUT_S)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        deadline = time.monotonic() + timeout_s
+        sock.settimeout(timeout_s)
+        message = dict(payload, protocol=DAEMON_PROTOCOL)
+        sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        chunks: list[bytes] = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError
+            sock.settimeout(remaining)
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+    except TimeoutError as exc:
+        raise DaemonError(f"守护进程 {timeout_s:g}s 内未响应") from exc
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+    if not chunks:
+        return None
+    try:
+        response = json.loads(b"".join(chunks))
+    except ValueError as exc:
+        raise DaemonError(f"无法识别守护进程的响应：{exc}") from exc
+    if not isinstance(response, dict):
+        raise DaemonError("无法识别守护进程的响应")
+    return response
+
+
+def ping_daemon(socket_path: Path | None = None) -> dict[str, Any] | None:
+    """
+    探测守护进程是否在运行，返回其状态；未运行时返回 None。
+    """
+    try:
+        return request_daemon({"command": "ping"}, socket_path=socket_path)
+    except DaemonError:
+        return None
+
+
+def stop_daemon(socket_path: Path | None = None) -> bool:
+    """
+    请求守护进程退出；返回是否有守护进程在运行。
+    """
+    try:
+        return request_daemon({"command": "shutdown"}, socket_path=socket_path) is not None
+    except DaemonError:
+        return False
+
+
+def check_via_daemon(
+    pyproject_path: Path,
+    *,
+    config: AppConfig,
+    lock_path: Path | None = None,
+    socket_path: Path | None = None,
+) -> Report | None:
+    """
+    通过守护进程执行检查；守护进程未运行时返回 None（调用方回退到进程内检查）。
+
+    守护进程来自不兼容的版本、检查失败、超时未响应或响应无法识别时同样返回 None，并在 stderr 提示一次原因，
+    检查不会因为一个旧的或卡住的守护进程而失败。路径（含缓存库与离线索引）在发送前按当前进程解析为绝对路径。
+    """
+    timeout_s = _CHECK_TIMEOUT_S
+    if config.deadline_s is not None:
+        timeout_s = min(timeout_s, config.deadline_s + _DEADLINE_GRACE_S)
+    try:
+        response = request_daemon(
+            {
+                "command": "check",
+                "pyproject": str(pyproject_path.resolve()),
+                "lock": str(lock_path.resolve()) if lock_path is not None else None,
+                "cache_path": str(default_cache_path().resolve()),
+                "config": config_to_json(absolute_config(config)),
+            },
+            socket_path=socket_path,
+            timeout_s=timeout_s,
+        )
+        if response is None:
+            return None
+        if not response.get("ok"):
+            raise DaemonError(str(response.get("error") or "守护进程检查失败"))
+        return report_from_wire(response["report"])
+    except (DaemonError, KeyError, TypeError, ValueError) as exc:
+        print(
+            f"守护进程不可用（{exc}），改为在当前进程内检查；可用 uv-lens daemon --stop 停止旧的守护进程",
+            file=sys.stderr,
+        )
+        return None
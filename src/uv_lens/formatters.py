@@ -1,63 +1,185 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
-from typing import Any, TextIO
+from typing import Any, Iterable, Iterator, TextIO
 
 from rich.console import Console
 from rich.table import Table
 
-from uv_lens.report import Report
+try:
+    import orjson
+except ModuleNotFoundError:  # pragma: no cover - 可选加速，未安装时使用标准库 json
+    orjson = None
+
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.names import normalize_project_name
+from uv_lens.report import Report, ReportItem, WorkspaceReport
+
+
+def item_to_json_obj(item: ReportItem) -> dict[str, Any]:
+    """
+    将单条检查结果转换为可 JSON 序列化的字典（直接读取字段，不做 asdict 深拷贝）。
+    """
+    return {
+        "kind": str(item.kind),
+        "group": item.group,
+        "name": item.name,
+        "raw": item.raw,
+        "latest": str(item.latest) if item.latest is not None else None,
+        "status": str(item.status),
+        "suggestion": item.suggestion,
+        "index_url": item.index_url,
+        "error": item.error,
+        "locked": str(item.locked) if item.locked is not None else None,
+        "lag": item.lag,
+    }
 
 
 def report_to_json_obj(report: Report) -> dict[str, Any]:
     """
     将报告转换为可 JSON 序列化的字典结构。
     """
-    data = asdict(report)
-    for item in data.get("items", []):
-        if item.get("latest") is not None:
-            item["latest"] = str(item["latest"])
-        if item.get("kind") is not None:
-            item["kind"] = str(item["kind"])
-        if item.get("status") is not None:
-            item["status"] = str(item["status"])
-    return data
+    return {
+        "pyproject_path": report.pyproject_path,
+        "items": [item_to_json_obj(item) for item in report.items],
+        "cache_hits": report.cache_hits,
+        "fetched": report.fetched,
+        "adaptive_saved": report.adaptive_saved,
+    }
+
+
+def _dumps(obj: Any, *, indent: bool) -> str:
+    """
+    序列化为 JSON 字符串；安装了 orjson 时使用它加速。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _dump(obj: Any, file: TextIO) -> None:
+    """
+    以缩进格式写出 JSON；未安装 orjson 时由 json.dump 分块写出，不构造完整字符串。
+    """
+    if orjson is not None:
+        file.write(_dumps(obj, indent=True))
+    else:
+        json.dump(obj, file, ensure_ascii=False, indent=2)
+    file.write("\n")
 
 
 def render_json(report: Report) -> str:
     """
     渲染 JSON 输出。
     """
-    return json.dumps(report_to_json_obj(report), ensure_ascii=False, indent=2)
+    return _dumps(report_to_json_obj(report), indent=True)
+
+
+def write_json(report: Report, file: TextIO) -> None:
+    """
+    将 JSON 报告写入文件。
+    """
+    _dump(report_to_json_obj(report), file)
+
+
+def ndjson_line(item: ReportItem, *, pyproject_path: str | None = None) -> str:
+    """
+    单条检查结果的 NDJSON 行（含换行符）；工作区输出时附带所属项目。
+    """
+    obj = item_to_json_obj(item)
+    if pyproject_path is not None:
+        obj["pyproject_path"] = pyproject_path
+    return _dumps(obj, indent=False) + "\n"
+
+
+def write_ndjson(items: Iterable[ReportItem], file: TextIO, *, pyproject_path: str | None = None) -> int:
+    """
+    逐条写出 NDJSON（每条结果一行），返回写出的行数。
+    """
+    count = 0
+    for item in items:
+        file.write(ndjson_line(item, pyproject_path=pyproject_path))
+        count += 1
+    return count
+
+
+def _iter_markdown_lines(report: Report) -> Iterator[str]:
+    """
+    逐行生成 Markdown 报告。
+    """
+    yield f"# uv-lens 报告\n\n- 文件：`{report.pyproject_path}`\n- 缓存命中：{report.cache_hits}\n- 发起查询：{report.fetched}"
+    if report.adaptive_saved:
+        yield f"- 自适应 TTL 节省查询：{report.adaptive_saved}"
+    locked_summary = _locked_summary(report)
+    if locked_summary:
+        yield f"- {locked_summary}"
+    yield ""
+    yield from _markdown_item_rows(report)
 
 
 def render_markdown(report: Report) -> str:
     """
     渲染 Markdown 报告（表格 + 简要统计）。
     """
-    lines: list[str] = []
-    lines.append(f"# uv-lens 报告\n\n- 文件：`{report.pyproject_path}`\n- 缓存命中：{report.cache_hits}\n- 发起查询：{report.fetched}\n")
-    lines.append("| 分组 | 包 | 当前 | 最新 | 状态 | 建议 | 错误 |")
-    lines.append("|---|---|---|---|---|---|---|")
+    return "\n".join(_iter_markdown_lines(report)) + "\n"
+
+
+def write_markdown(report: Report, file: TextIO) -> None:
+    """
+    逐行将 Markdown 报告写入文件。
+    """
+    for line in _iter_markdown_lines(report):
+        file.write(line)
+        file.write("\n")
+
+
+def _status_text(item: ReportItem) -> str:
+    """
+    状态列文本；锁定包附带落后程度。
+    """
+    if item.lag:
+        return f"{item.status.value} ({item.lag})"
+    return item.status.value
+
+
+def _locked_summary(report: Report) -> str | None:
+    """
+    uv.lock 锁定包的落后统计；报告中没有锁定包时返回 None。
+    """
+    # 同一个包可能在 pyproject 的多个分组中声明，按包名计一次。
+    by_name = {normalize_project_name(item.name): item for item in report.items if item.locked is not None}
+    locked = list(by_name.values())
+    if not locked:
+        return None
+    behind = [item for item in locked if item.lag]
+    direct = sum(1 for item in behind if item.kind != DependencyKind.LOCKED or item.group == "direct")
+    return f"锁定包：{len(locked)}，落后最新版本：{len(behind)}（直接依赖 {direct}，传递依赖 {len(behind) - direct}）"
+
+
+def _markdown_item_rows(report: Report) -> Iterator[str]:
+    """
+    逐行生成报告条目的 Markdown 表格。
+    """
+    yield "| 分组 | 包 | 当前 | 最新 | 状态 | 建议 | 错误 |"
+    yield "|---|---|---|---|---|---|---|"
     for item in report.items:
         group = f"{item.kind.value}:{item.group}"
         name = item.name or "-"
         current = item.raw
         latest = str(item.latest) if item.latest else "-"
-        status = item.status.value
+        status = _status_text(item)
         suggestion = item.suggestion or "-"
         error = item.error or "-"
-        lines.append(f"| {group} | {name} | {current} | {latest} | {status} | {suggestion} | {error} |")
-    return "\n".join(lines) + "\n"
+        yield f"| {group} | {name} | {current} | {latest} | {status} | {suggestion} | {error} |"
 
 
-def print_table(report: Report, *, file: TextIO | None = None) -> None:
+def _items_table(report: Report, *, title: str) -> Table:
     """
-    以控制台表格形式输出报告。
+    构造报告条目的控制台表格。
     """
-    console = Console(file=file)
-    table = Table(title="uv-lens 依赖检查")
+    table = Table(title=title)
     table.add_column("分组", no_wrap=True)
     table.add_column("包", no_wrap=True)
     table.add_column("当前")
@@ -73,9 +195,126 @@ def print_table(report: Report, *, file: TextIO | None = None) -> None:
             item.name or "-",
             item.raw,
             latest,
-            item.status.value,
+            _status_text(item),
             item.suggestion or "-",
             item.error or "-",
         )
-    console.print(table)
-    console.print(f"缓存命中：{report.cache_hits}，发起查询：{report.fetched}")
+    return table
+
+
+def print_table(report: Report, *, file: TextIO | None = None) -> None:
+    """
+    以控制台表格形式输出报告。
+    """
+    console = Console(file=file)
+    console.print(_items_table(report, title="uv-lens 依赖检查"))
+    summary = f"缓存命中：{report.cache_hits}，发起查询：{report.fetched}"
+    if report.adaptive_saved:
+        summary += f"，自适应 TTL 节省查询：{report.adaptive_saved}"
+    console.print(summary)
+    locked_summary = _locked_summary(report)
+    if locked_summary:
+        console.print(locked_summary)
+
+
+def _workspace_summary(report: WorkspaceReport) -> str:
+    """
+    工作区整体统计的一行摘要。
+    """
+    summary = (
+        f"项目：{len(report.reports)}，不同包：{report.unique_packages}，"
+        f"缓存命中：{report.cache_hits}，发起查询：{report.fetched}"
+    )
+    if report.adaptive_saved:
+        summary += f"，自适应 TTL 节省查询：{report.adaptive_saved}"
+    if report.failed:
+        summary += f"，解析失败：{len(report.failed)}"
+    return summary
+
+
+def _status_count(report: Report, status: CheckStatus) -> int:
+    """
+    统计单个报告中某状态的条目数。
+    """
+    return sum(1 for item in report.items if item.status == status)
+
+
+def workspace_to_json_obj(report: WorkspaceReport) -> dict[str, Any]:
+    """
+    将工作区报告转换为可 JSON 序列化的字典结构。
+    """
+    return {
+        "root": report.root,
+        "unique_packages": report.unique_packages,
+        "cache_hits": report.cache_hits,
+        "fetched": report.fetched,
+        "adaptive_saved": report.adaptive_saved,
+        "status_counts": {status.value: count for status, count in report.status_counts().items()},
+        "projects": [report_to_json_obj(r) for r in report.reports],
+        "failed": [{"pyproject_path": path, "error": error} for path, error in report.failed],
+    }
+
+
+def render_workspace_json(report: WorkspaceReport) -> str:
+    """
+    渲染工作区 JSON 输出。
+    """
+    return _dumps(workspace_to_json_obj(report), indent=True)
+
+
+def write_workspace_json(report: WorkspaceReport, file: TextIO) -> None:
+    """
+    将工作区 JSON 报告写入文件。
+    """
+    _dump(workspace_to_json_obj(report), file)
+
+
+def write_workspace_ndjson(report: WorkspaceReport, file: TextIO) -> int:
+    """
+    逐条写出工作区内所有项目的检查结果（每行附带 pyproject_path），返回写出的行数。
+    """
+    return sum(write_ndjson(r.items, file, pyproject_path=r.pyproject_path) for r in report.reports)
+
+
+def render_workspace_markdown(report: WorkspaceReport) -> str:
+    """
+    渲染工作区 Markdown 报告：汇总表 + 各项目明细。
+    """
+    lines: list[str] = [f"# uv-lens 工作区报告\n\n- 根目录：`{report.root}`\n- {_workspace_summary(report)}", ""]
+    lines.append("| 项目 | 依赖 | 可升级 | 约束阻止 | 未找到 | 错误 |")
+    lines.append("|---|---|---|---|---|---|")
+    for r in report.reports:
+        errors = sum(
+            _status_count(r, s)
+            for s in (
+                CheckStatus.NETWORK_ERROR,
+                CheckStatus.INDEX_ERROR,
+                CheckStatus.INVALID_REQUIREMENT,
+                CheckStatus.TIMED_OUT,
+            )
+        )
+        lines.append(
+            f"| `{r.pyproject_path}` | {len(r.items)} | {_status_count(r, CheckStatus.UPGRADE_AVAILABLE)} "
+            f"| {_status_count(r, CheckStatus.CONSTRAINT_BLOCKS_LATEST)} | {_status_count(r, CheckStatus.NOT_FOUND)} "
+            f"| {errors} |"
+        )
+    for path, error in report.failed:
+        lines.append(f"| `{path}` | - | - | - | - | 解析失败：{error} |")
+    for r in report.reports:
+        lines.append("")
+        lines.append(f"## `{r.pyproject_path}`")
+        lines.append("")
+        lines.extend(_markdown_item_rows(r))
+    return "\n".join(lines) + "\n"
+
+
+def print_workspace_table(report: WorkspaceReport, *, file: TextIO | None = None) -> None:
+    """
+    以控制台表格形式逐个输出工作区内的项目报告，最后输出汇总。
+    """
+    console = Console(file=file)
+    for r in report.reports:
+        console.print(_items_table(r, title=r.pyproject_path))
+    for path, error in report.failed:
+        console.print(f"解析失败：{path}：{error}")
+    console.print(_workspace_summary(report))
@@ -3,36 +3,19 @@ from __future__ import annotations
 import asyncio
 import base64
 import random
+import time
 from dataclasses import dataclass
-from typing import Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Sequence
 
-import httpx
 from packaging.version import InvalidVersion, Version
 
+from uv_lens.index_settings import IndexAuth, IndexSettings
+from uv_lens.metrics import current_metrics
+from uv_lens.tracing import span
 
-@dataclass(frozen=True, slots=True)
-class IndexAuth:
-    """
-    私有索引认证配置。
-    """
-
-    bearer_token: str | None = None
-    basic_username: str | None = None
-    basic_password: str | None = None
-
-
-@dataclass(frozen=True, slots=True)
-class IndexSettings:
-    """
-    包索引查询配置。
-    """
-
-    index_url: str
-    extra_index_urls: tuple[str, ...] = ()
-    timeout_s: float = 10.0
-    retries: int = 2
-    include_prereleases: bool = False
-    auth: IndexAuth | None = None
+if TYPE_CHECKING:
+    import httpx
 
 
 @dataclass(frozen=True, slots=True)
@@ -46,6 +29,11 @@ class PackageLookupResult:
     latest: Version | None
     not_found: bool
     error: str | None
+    release_times: tuple[int, ...] = ()
+    timed_out: bool = False
+
+
+_RELEASE_HISTORY_SIZE = 10
 
 
 def _build_headers(auth: IndexAuth | None) -> dict[str, str]:
@@ -91,11 +79,61 @@ def _candidate_versions_from_pypi_json(data: dict[str, Any]) -> list[Version]:
     return versions
 
 
+def _parse_upload_time(raw: Any) -> int | None:
+    """
+    解析 PyPI 文件的上传时间（ISO 8601）为 Unix 时间戳。
+    """
+    if not isinstance(raw, str) or not raw:
+        return None
+    try:
+        return int(datetime.fromisoformat(raw.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def release_times_from_pypi_json(data: dict[str, Any], *, include_prereleases: bool) -> tuple[int, ...]:
+    """
+    从 PyPI JSON API 响应中提取最近若干个版本的发布时间（升序）。
+    """
+    releases = data.get("releases")
+    if not isinstance(releases, dict):
+        return ()
+
+    times: list[int] = []
+    for raw_version, files in releases.items():
+        try:
+            version = Version(str(raw_version))
+        except InvalidVersion:
+            continue
+        if not include_prereleases and (version.is_prerelease or version.is_devrelease):
+            continue
+        if not isinstance(files, list):
+            continue
+        uploaded: list[int] = []
+        for f in files:
+            if not isinstance(f, dict):
+                continue
+            uploaded_at = _parse_upload_time(f.get("upload_time_iso_8601") or f.get("upload_time"))
+            if uploaded_at is not None:
+                uploaded.append(uploaded_at)
+        if uploaded:
+            times.append(min(uploaded))
+
+    times.sort()
+    return tuple(times[-_RELEASE_HISTORY_SIZE:])
+
+
 def pick_latest_version(data: dict[str, Any], *, include_prereleases: bool) -> Version | None:
     """
     从 PyPI JSON API 响应中选择“最新稳定版本”（默认过滤 pre-release）。
     """
-    candidates = _candidate_versions_from_pypi_json(data)
+    return select_latest_version(_candidate_versions_from_pypi_json(data), include_prereleases=include_prereleases)
+
+
+def select_latest_version(candidates: list[Version], *, include_prereleases: bool) -> Version | None:
+    """
+    从候选版本中选择最新版本（默认优先稳定版本）。
+    """
     if not candidates:
         return None
 
@@ -111,25 +149,48 @@ async def _request_json(
     url: str,
     *,
     retries: int,
+    index_url: str | None = None,
 ) -> tuple[dict[str, Any] | None, int | None, str | None]:
     """
     请求 JSON 并返回 (data, status_code, error)。
+
+    开启指标收集且传入 index_url 时，按索引记录每次请求（含重试）的状态码、字节数与耗时；
+    开启追踪时每次请求与重试等待各记录一个区间。
     """
+    import httpx
+
+    metrics = current_metrics() if index_url is not None else None
     attempt = 0
     while True:
+        started = time.perf_counter()
         try:
-            resp = await client.get(url)
+            with span("GET", "http", url=url, attempt=attempt) as request_span:
+                resp = await client.get(url)
+                request_span.set(status=resp.status_code, bytes=len(resp.content))
+            if metrics is not None:
+                metrics.record_request(
+                    index_url,
+                    status=resp.status_code,
+                    latency_s=time.perf_counter() - started,
+                    size=len(resp.content),
+                    retry=attempt > 0,
+                )
             if resp.status_code == 404:
                 return None, 404, None
             if resp.status_code >= 400:
                 return None, resp.status_code, f"http {resp.status_code}"
             return resp.json(), resp.status_code, None
         except (httpx.TimeoutException, httpx.NetworkError) as exc:
+            if metrics is not None:
+                metrics.record_request(
+                    index_url, status=None, latency_s=time.perf_counter() - started, retry=attempt > 0
+                )
             if attempt >= retries:
                 return None, None, str(exc)
             backoff = (2**attempt) * 0.25 + random.random() * 0.25
             attempt += 1
-            await asyncio.sleep(backoff)
+            with span("retry backoff", "http", url=url, attempt=attempt, delay_s=round(backoff, 3)):
+                await asyncio.sleep(backoff)
         except ValueError as exc:
             return None, None, f"invalid json: {exc}"
 
@@ -142,40 +203,63 @@ def _build_pypi_json_url(index_url: str, normalized_name: str) -> str:
     return f"{base}/{normalized_name}/json"
 
 
-async def fetch_latest_from_indexes(
+async def fetch_latest_from_index(
     normalized_name: str,
+    index_url: str,
     *,
     settings: IndexSettings,
     client: httpx.AsyncClient,
 ) -> PackageLookupResult:
     """
-    依次从 index_url 与 extra_index_urls 查询包的最新版本。
+    从单个索引查询包的最新版本（404 返回 not_found，请求失败返回 error 且 index_url 为 None）。
     """
-    urls = (settings.index_url, *settings.extra_index_urls)
-    last_error: str | None = None
-
-    for base in urls:
-        url = _build_pypi_json_url(base, normalized_name)
-        data, status, error = await _request_json(client, url, retries=settings.retries)
-        if status == 404:
-            last_error = None
-            continue
-        if data is None:
-            last_error = error or "request failed"
-            continue
-        if status is not None and status >= 400:
-            last_error = f"http {status}"
-            continue
-
-        latest = pick_latest_version(data, include_prereleases=settings.include_prereleases)
+    url = _build_pypi_json_url(index_url, normalized_name)
+    data, status, error = await _request_json(client, url, retries=settings.retries, index_url=index_url)
+    if status == 404:
+        return PackageLookupResult(
+            normalized_name=normalized_name, index_url=None, latest=None, not_found=True, error=None
+        )
+    if data is None or (status is not None and status >= 400):
         return PackageLookupResult(
             normalized_name=normalized_name,
-            index_url=base,
-            latest=latest,
+            index_url=None,
+            latest=None,
             not_found=False,
-            error=None if latest else "no version found",
+            error=error or (f"http {status}" if status is not None else "request failed"),
         )
 
+    latest = pick_latest_version(data, include_prereleases=settings.include_prereleases)
+    return PackageLookupResult(
+        normalized_name=normalized_name,
+        index_url=index_url,
+        latest=latest,
+        not_found=False,
+        error=None if latest else "no version found",
+        release_times=release_times_from_pypi_json(data, include_prereleases=settings.include_prereleases),
+    )
+
+
+async def resolve_index_chain(
+    normalized_name: str,
+    index_urls: Sequence[str],
+    lookup: Callable[[str], Awaitable[PackageLookupResult]],
+) -> PackageLookupResult:
+    """
+    按顺序组合各索引的单独结果：第一个有响应的索引胜出；未找到与出错的索引跳过。
+
+    全部跳过时，若最后一个跳过的索引是出错则返回该错误，否则视为未找到。
+    """
+    last_error: str | None = None
+    for base in index_urls:
+        res = await lookup(base)
+        if res.not_found:
+            last_error = None
+            continue
+        if res.index_url is None:
+            last_error = res.error or "request failed"
+            continue
+        return res
+
     return PackageLookupResult(
         normalized_name=normalized_name,
         index_url=None,
@@ -185,10 +269,108 @@ async def fetch_latest_from_indexes(
     )
 
 
+def lookup_offline_index(normalized_name: str, *, settings: IndexSettings) -> PackageLookupResult | None:
+    """
+    从离线索引查询最新版本（视为主索引的快照）；未配置离线索引或其中没有该包时返回 None。
+
+    离线索引缺失或损坏时不中断检查：提示一次后停用该索引，此后全部返回 None（改为在线查询）。
+    """
+    path = settings.offline_index
+    if not path:
+        return None
+    from uv_lens.offline_index import (
+        OFFLINE_INDEX_ERRORS,
+        disable_offline_index,
+        offline_index_disabled,
+        open_offline_index,
+    )
+
+    if offline_index_disabled(path):
+        return None
+    try:
+        latest = open_offline_index(path).latest(normalized_name, include_prereleases=settings.include_prereleases)
+    except KeyError:
+        return None
+    except OFFLINE_INDEX_ERRORS as exc:
+        disable_offline_index(path, exc)
+        return None
+    return PackageLookupResult(
+        normalized_name=normalized_name,
+        index_url=settings.index_url,
+        latest=latest,
+        not_found=False,
+        error=None if latest else "no version found",
+    )
+
+
+async def fetch_latest_from_indexes(
+    normalized_name: str,
+    *,
+    settings: IndexSettings,
+    client: httpx.AsyncClient,
+) -> PackageLookupResult:
+    """
+    依次从 index_url 与 extra_index_urls 查询包的最新版本（配置了离线索引时优先查离线索引）。
+    """
+    offline = lookup_offline_index(normalized_name, settings=settings)
+    if offline is not None:
+        return offline
+
+    urls = (settings.index_url, *settings.extra_index_urls)
+
+    async def lookup(base: str) -> PackageLookupResult:
+        return await fetch_latest_from_index(normalized_name, base, settings=settings, client=client)
+
+    return await resolve_index_chain(normalized_name, urls, lookup)
+
+
 def create_async_client(settings: IndexSettings) -> httpx.AsyncClient:
     """
     创建用于访问索引的 AsyncClient。
+
+    httpx 在这里才导入：全部命中缓存的检查不会创建客户端，也就不需要加载它。
     """
+    import httpx
+
     headers = _build_headers(settings.auth)
     timeout = httpx.Timeout(settings.timeout_s)
     return httpx.AsyncClient(headers=headers, timeout=timeout, follow_redirects=True)
+
+
+class SharedAsyncClient:
+    """
+    多批查询共用的 AsyncClient，在第一次需要联网时才创建；没有包需要联网时不创建也不导入 httpx。
+    """
+
+    def __init__(self, settings: IndexSettings) -> None:
+        self._settings = settings
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def created(self) -> bool:
+        """
+        是否已经创建了底层客户端。
+        """
+        return self._client is not None
+
+    def get(self) -> httpx.AsyncClient:
+        """
+        返回底层客户端，首次调用时创建。
+        """
+        if self._client is None:
+            self._client = create_async_client(self._settings)
+        return self._client
+
+    async def aclose(self) -> None:
+        """
+        关闭已创建的客户端。
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> SharedAsyncClient:
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.aclose()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# 索引配置单独成模块，不依赖 httpx / packaging：加载配置与解析命令行时无需导入网络相关模块。
+
+
+@dataclass(frozen=True, slots=True)
+class IndexAuth:
+    """
+    私有索引认证配置。
+    """
+
+    bearer_token: str | None = None
+    basic_username: str | None = None
+    basic_password: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class IndexSettings:
+    """
+    包索引查询配置。
+    """
+
+    index_url: str
+    extra_index_urls: tuple[str, ...] = ()
+    timeout_s: float = 10.0
+    retries: int = 2
+    include_prereleases: bool = False
+    auth: IndexAuth | None = None
+    offline_index: str | None = None
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from packaging.version import InvalidVersion, Version
+
+from uv_lens.models import DependencyItem, DependencyKind
+from uv_lens.names import normalize_project_name
+from uv_lens.pyproject import parse_requirement
+
+_KEY_STRING_RE = re.compile(r'^(name|version)\s*=\s*"([^"]*)"')
+_SOURCE_RE = re.compile(r"^source\s*=\s*\{(.*)\}")
+_SOURCE_KIND_RE = re.compile(r'(registry|editable|virtual|directory|path|git|url)\s*=\s*"([^"]*)"')
+_DEP_NAME_RE = re.compile(r'\{\s*name\s*=\s*"([^"]+)"')
+
+# 工作区内的本地项目：其依赖即为直接依赖，自身不参与版本检查。
+_LOCAL_SOURCES = frozenset({"editable", "virtual", "directory", "path"})
+# 本地项目中声明依赖的表（主表的 dependencies 与这些子表中的数组）。
+_LOCAL_DEPENDENCY_TABLES = frozenset({"package.optional-dependencies", "package.dev-dependencies"})
+
+
+@dataclass(frozen=True, slots=True)
+class LockedPackage:
+    """
+    uv.lock 中锁定的一个包。
+    """
+
+    name: str
+    version: Version
+    source_kind: str
+    source: str | None
+    direct: bool
+
+
+@dataclass(slots=True)
+class _PackageBlock:
+    """
+    解析过程中的单个 [[package]] 块。
+    """
+
+    name: str | None = None
+    version: str | None = None
+    source_kind: str | None = None
+    source: str | None = None
+
+
+def _iter_blocks(lines: Iterable[str], direct_names: set[str]) -> Iterator[_PackageBlock]:
+    """
+    逐行扫描 uv.lock，产出每个 [[package]] 块；本地项目声明的依赖名写入 direct_names。
+
+    只识别顶格的 name / version / source 键与依赖数组中的 { name = "..." }，
+    其余内容（sdist、wheels、metadata 等）直接跳过，不构建完整的 TOML 结构。
+    """
+    block: _PackageBlock | None = None
+    table = ""
+    in_dependency_array = False
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\n")
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith("["):
+            header = line.strip()
+            if header == "[[package]]":
+                if block is not None:
+                    yield block
+                block = _PackageBlock()
+                table = "package"
+            else:
+                table = header.strip("[]").strip()
+            in_dependency_array = False
+            continue
+
+        if block is None:
+            continue
+
+        is_local = block.source_kind in _LOCAL_SOURCES
+        if not line[0].isspace():
+            in_dependency_array = False
+            if table == "package":
+                match = _KEY_STRING_RE.match(line)
+                if match:
+                    setattr(block, match.group(1), match.group(2))
+                    continue
+                match = _SOURCE_RE.match(line)
+                if match:
+                    kind = _SOURCE_KIND_RE.search(match.group(1))
+                    if kind:
+                        block.source_kind, block.source = kind.group(1), kind.group(2)
+                    continue
+            collects = is_local and (
+                (table == "package" and line.startswith("dependencies")) or table in _LOCAL_DEPENDENCY_TABLES
+            )
+            if collects and "=" in line:
+                direct_names.update(normalize_project_name(n) for n in _DEP_NAME_RE.findall(line))
+                in_dependency_array = line.rstrip().endswith("[")
+            continue
+
+        if in_dependency_array and is_local:
+            if line.strip() == "]":
+                in_dependency_array = False
+                continue
+            direct_names.update(normalize_project_name(n) for n in _DEP_NAME_RE.findall(line))
+
+    if block is not None:
+        yield block
+
+
+def parse_uv_lock(path: Path) -> list[LockedPackage]:
+    """
+    流式解析 uv.lock，返回来自包索引的锁定包（按包名排序）。
+
+    本地项目（editable / virtual 等）不参与检查，其声明的依赖标记为直接依赖；git / url 来源的包无法与索引对比，跳过。
+    """
+    direct_names: set[str] = set()
+    blocks: list[_PackageBlock] = []
+    with open(path, encoding="utf-8") as f:
+        for block in _iter_blocks(f, direct_names):
+            if block.name and block.version and block.source_kind == "registry":
+                blocks.append(block)
+
+    packages: dict[str, LockedPackage] = {}
+    for block in blocks:
+        try:
+            version = Version(str(block.version))
+        except InvalidVersion:
+            continue
+        name = normalize_project_name(str(block.name))
+        existing = packages.get(name)
+        # 同一包可能按平台锁定多个版本：保留最低的版本，报告最大的落后程度。
+        if existing is not None and existing.version <= version:
+            continue
+        packages[name] = LockedPackage(
+            name=name,
+            version=version,
+            source_kind="registry",
+            source=block.source,
+            direct=name in direct_names,
+        )
+    return [packages[n] for n in sorted(packages)]
+
+
+def locked_dependency_items(path: Path) -> list[DependencyItem]:
+    """
+    将 uv.lock 中的锁定包转换为依赖项（分组为 direct / transitive，约束为 ==锁定版本，locked 为锁定版本）。
+    """
+    return [
+        replace(
+            parse_requirement(
+                f"{pkg.name}=={pkg.version}",
+                kind=DependencyKind.LOCKED,
+                group="direct" if pkg.direct else "transitive",
+            ),
+            locked=pkg.version,
+        )
+        for pkg in parse_uv_lock(path)
+    ]
+
+
+def merge_locked_items(items: list[DependencyItem], locked_items: list[DependencyItem]) -> list[DependencyItem]:
+    """
+    合并 pyproject 依赖与锁定项：pyproject 中已声明的包不再单独列出锁定项，锁定版本记在对应依赖项的 locked 上。
+    """
+    locked_by_name = {
+        normalize_project_name(item.requirement.name): item.locked
+        for item in locked_items
+        if item.requirement is not None
+    }
+    declared: set[str] = set()
+    merged: list[DependencyItem] = []
+    for item in items:
+        name = normalize_project_name(item.requirement.name) if item.requirement is not None else None
+        if name is not None and name in locked_by_name:
+            declared.add(name)
+            item = replace(item, locked=locked_by_name[name])
+        merged.append(item)
+    merged.extend(
+        item
+        for item in locked_items
+        if item.requirement is None or normalize_project_name(item.requirement.name) not in declared
+    )
+    return merged
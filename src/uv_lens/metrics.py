@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+# 请求耗时直方图的桶上界（秒），与 Prometheus 客户端库的默认桶接近。
+LATENCY_BUCKETS_S: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 当前运行的指标收集器；未开启 --metrics-out 时为 None，各处埋点只做一次查找。
+_current: ContextVar[RunMetrics | None] = ContextVar("uv_lens_metrics", default=None)
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """
+    累积直方图（与 Prometheus histogram 语义一致：bucket 计数包含所有更小的桶）。
+    """
+
+    buckets: tuple[float, ...] = LATENCY_BUCKETS_S
+    counts: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_S))
+    total: int = 0
+    sum_s: float = 0.0
+
+    def observe(self, value_s: float) -> None:
+        """
+        记录一次观测值。
+        """
+        self.total += 1
+        self.sum_s += value_s
+        for i, upper in enumerate(self.buckets):
+            if value_s <= upper:
+                self.counts[i] += 1
+
+
+@dataclass(slots=True)
+class IndexMetrics:
+    """
+    单个索引的请求统计。
+    """
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes: int = 0
+    status_codes: dict[str, int] = field(default_factory=dict)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+@dataclass(slots=True)
+class RunMetrics:
+    """
+    单次运行的指标：各阶段的墙钟与 CPU 耗时（秒，同一阶段多次进入时累加）、各索引的请求统计与查询计数。
+    """
+
+    started_at: float = field(default_factory=time.time)
+    phases: dict[str, float] = field(default_factory=dict)
+    phases_cpu: dict[str, float] = field(default_factory=dict)
+    indexes: dict[str, IndexMetrics] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    duration_s: float = 0.0
+    exit_code: int | None = None
+
+    def add_phase(self, name: str, seconds: float, cpu_s: float = 0.0) -> None:
+        """
+        累加某个阶段的墙钟耗时与 CPU 耗时。
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.phases_cpu[name] = self.phases_cpu.get(name, 0.0) + cpu_s
+
+    def add_phase_since(self, name: str, started: tuple[float, float]) -> None:
+        """
+        以 phase_clock() 的读数为起点累加某个阶段的耗时。
+        """
+        wall, cpu = phase_clock()
+        self.add_phase(name, wall - started[0], cpu - started[1])
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        累加计数器。
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_request(
+        self,
+        index_url: str,
+        *,
+        status: int | None,
+        latency_s: float,
+        size: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """
+        记录一次 HTTP 请求（每次重试单独记录）；status 为 None 表示连接失败或超时。
+        """
+        stats = self.indexes.setdefault(index_url.rstrip("/"), IndexMetrics())
+        stats.requests += 1
+        stats.bytes += size
+        if retry:
+            stats.retries += 1
+        code = "error" if status is None else str(status)
+        stats.status_codes[code] = stats.status_codes.get(code, 0) + 1
+        if status is None or (status >= 400 and status != 404):
+            stats.errors += 1
+        stats.latency.observe(latency_s)
+
+    def finish(self, *, exit_code: int) -> None:
+        """
+        记录运行结束时的总耗时与退出码。
+        """
+        self.duration_s = time.time() - self.started_at
+        self.exit_code = exit_code
+
+    def to_json(self) -> dict[str, Any]:
+        """
+        转换为可 JSON 序列化的字典。
+        """
+        return {
+            "started_at": self.started_at,
+            "duration_s": self.duration_s,
+            "exit_code": self.exit_code,
+            "phases": dict(self.phases),
+            "phases_cpu": dict(self.phases_cpu),
+            "counters": dict(self.counters),
+            "indexes": {
+                url: {
+                    "requests": stats.requests,
+                    "retries": stats.retries,
+                    "errors": stats.errors,
+                    "bytes": stats.bytes,
+                    "status_codes": dict(stats.status_codes),
+                    "latency": {
+                        "buckets": list(stats.latency.buckets),
+                        "counts": list(stats.latency.counts),
+                        "count": stats.latency.total,
+                        "sum_s": stats.latency.sum_s,
+                    },
+                }
+                for url, stats in self.indexes.items()
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        渲染为 Prometheus 文本格式（供 node-exporter textfile collector 读取）。
+        """
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {_format_value(value)}")
+
+        metric("uv_lens_last_run_timestamp_seconds", "gauge", "Start time of the last run.", [("", self.started_at)])
+        metric("uv_lens_run_duration_seconds", "gauge", "Wall time of the last run.", [("", self.duration_s)])
+        if self.exit_code is not None:
+            metric("uv_lens_exit_code", "gauge", "Exit code of the last run.", [("", float(self.exit_code))])
+        metric(
+            "uv_lens_phase_duration_seconds",
+            "gauge",
+            "Wall time spent in each phase of the last run.",
+            [(_labels(phase=name), seconds) for name, seconds in sorted(self.phases.items())],
+        )
+        metric(
+            "uv_lens_phase_cpu_seconds",
+            "gauge",
+            "CPU time spent in each phase of the last run.",
+            [(_labels(phase=name), seconds) for name, seconds in sorted(self.phases_cpu.items())],
+        )
+        metric(
+            "uv_lens_lookups",
+            "gauge",
+            "Package lookup counts of the last run by outcome.",
+            [(_labels(outcome=name), float(value)) for name, value in sorted(self.counters.items())],
+        )
+
+        urls = sorted(self.indexes)
+        for name, attr, help_text in (
+            ("uv_lens_index_requests_total", "requests", "HTTP requests sent to the index."),
+            ("uv_lens_index_retries_total", "retries", "Retried HTTP requests."),
+            ("uv_lens_index_errors_total", "errors", "Failed HTTP requests (network errors and HTTP errors except 404)."),
+            ("uv_lens_index_response_bytes_total", "bytes", "Response body bytes received from the index."),
+        ):
+            metric(name, "counter", help_text, [(_labels(index=u), float(getattr(self.indexes[u], attr))) for u in urls])
+        metric(
+            "uv_lens_index_responses_total",
+            "counter",
+            "HTTP responses by status code ('error' for connection failures and timeouts).",
+            [
+                (_labels(index=u, code=code), float(count))
+                for u in urls
+                for code, count in sorted(self.indexes[u].status_codes.items())
+            ],
+        )
+
+        name = "uv_lens_index_request_duration_seconds"
+        lines.append(f"# HELP {name} HTTP request latency per index.")
+        lines.append(f"# TYPE {name} histogram")
+        for u in urls:
+            hist = self.indexes[u].latency
+            for upper, count in zip(hist.buckets, hist.counts):
+                lines.append(f"{name}_bucket{_labels(index=u, le=_format_value(upper))} {count}")
+            lines.append(f'{name}_bucket{_labels(index=u, le="+Inf")} {hist.total}')
+            lines.append(f"{name}_sum{_labels(index=u)} {_format_value(hist.sum_s)}")
+            lines.append(f"{name}_count{_labels(index=u)} {hist.total}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    """
+    Prometheus 样本值的文本形式。
+    """
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _labels(**labels: str) -> str:
+    """
+    渲染 Prometheus 标签集（转义反斜杠、引号与换行）。
+    """
+    parts = []
+    for key, value in labels.items():
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def phase_clock() -> tuple[float, float]:
+    """
+    当前的 (墙钟, 进程 CPU) 读数，配合 RunMetrics.add_phase_since 使用。
+    """
+    return time.perf_counter(), time.process_time()
+
+
+def current_metrics() -> RunMetrics | None:
+    """
+    返回当前上下文中的指标收集器（未开启时为 None）。
+    """
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics(metrics: RunMetrics) -> Iterator[RunMetrics]:
+    """
+    在上下文内开启指标收集；asyncio 任务会继承创建时的上下文，因此在 asyncio.run 之前进入即可。
+    """
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """
+    将上下文内的墙钟与 CPU 耗时累加到当前收集器的 name 阶段；未开启收集时什么都不做。
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = phase_clock()
+    try:
+        yield
+    finally:
+        metrics.add_phase_since(name, started)
+
+
+def write_metrics(metrics: RunMetrics, path: Path) -> None:
+    """
+    写出指标文件：后缀为 .prom 时写 Prometheus 文本格式，否则写 JSON。
+
+    先写临时文件再原子替换，textfile collector 不会读到写了一半的文件。
+    """
+    if path.suffix == ".prom":
+        text = metrics.to_prometheus()
+    else:
+        text = json.dumps(metrics.to_json(), ensure_ascii=False, indent=2) + "\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-from packaging.requirements import Requirement
+if TYPE_CHECKING:
+    from packaging.requirements import Requirement
+    from packaging.version import Version
 
 
 class DependencyKind(str, Enum):
@@ -16,12 +18,15 @@ class DependencyKind(str, Enum):
     DEV_GROUP = "dev_group"
     OPTIONAL = "optional"
     BUILD_SYSTEM = "build_system"
+    LOCKED = "locked"
 
 
 @dataclass(frozen=True, slots=True)
 class DependencyItem:
     """
     从 pyproject.toml 中抽取出来的一条依赖项（保留原始字符串与解析结果）。
+
+    locked 为 uv.lock 中该包的锁定版本：LOCKED 项总是设置，pyproject 依赖仅在检查时传入 uv.lock 且其中有该包时设置。
     """
 
     kind: DependencyKind
@@ -29,6 +34,7 @@ class DependencyItem:
     raw: str
     requirement: Requirement | None
     error: str | None
+    locked: Version | None = None
 
 
 class CheckStatus(str, Enum):
@@ -44,6 +50,7 @@ class CheckStatus(str, Enum):
     INVALID_REQUIREMENT = "invalid_requirement"
     NETWORK_ERROR = "network_error"
     INDEX_ERROR = "index_error"
+    TIMED_OUT = "timed_out"
 
 
 PinMode = Literal["none", "compatible", "exact"]
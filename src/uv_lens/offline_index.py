@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from packaging.version import InvalidVersion, Version
+
+from uv_lens.names import normalize_project_name
+
+# 文件布局（小端）：
+#   header   : magic(8) | version u32 | count u32
+#   offsets  : (count + 1) 个 u64，第 i 条记录相对 records 起点的偏移（最后一个为 records 总长度）
+#   records  : 按规范化包名字节序排序；每条为 name_len u16 | name | n u32 | n 个 (len u8 | version)
+#              version 按 Version 升序排列
+_MAGIC = b"UVLENSIX"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_OFFSET = struct.Struct("<Q")
+_NAME_LEN = struct.Struct("<H")
+_COUNT = struct.Struct("<I")
+
+
+class OfflineIndexError(ValueError):
+    """
+    离线索引文件无法识别或已损坏。
+    """
+
+
+# 打开或读取离线索引时可能出现的错误（文件缺失、格式不对、记录被截断或损坏）。
+OFFLINE_INDEX_ERRORS = (OSError, ValueError, struct.error, IndexError)
+
+
+class OfflineIndex:
+    """
+    基于 mmap 的只读离线版本索引：打开时只读取文件头，查询为对排序名表的二分查找。
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        打开离线索引文件并校验文件头。
+        """
+        self._path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            self._file.close()
+            raise OfflineIndexError(f"离线索引为空：{path}") from exc
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise OfflineIndexError(f"离线索引已损坏：{path}")
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            self.close()
+            raise OfflineIndexError(f"不是受支持的离线索引文件：{path}")
+        self._count = count
+        # 各包的最新版本：键为 (规范化包名, 是否包含预发布)；索引只读，条目数不超过索引中的包数。
+        self._latest: dict[tuple[str, bool], Version | None] = {}
+        self._offsets_start = _HEADER.size
+        self._records_start = self._offsets_start + _OFFSET.size * (count + 1)
+        if len(self._mm) < self._records_start:
+            self.close()
+            raise OfflineIndexError(f"离线索引已损坏：{path}")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def close(self) -> None:
+        """
+        释放 mmap 与文件句柄。
+        """
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None  # type: ignore[assignment]
+        self._file.close()
+
+    def _record_offset(self, i: int) -> int:
+        """
+        第 i 条记录在文件中的绝对偏移。
+        """
+        (rel,) = _OFFSET.unpack_from(self._mm, self._offsets_start + i * _OFFSET.size)
+        return self._records_start + rel
+
+    def _name_at(self, offset: int) -> bytes:
+        """
+        读取记录中的包名。
+        """
+        (size,) = _NAME_LEN.unpack_from(self._mm, offset)
+        start = offset + _NAME_LEN.size
+        return self._mm[start : start + size]
+
+    def _versions_at(self, offset: int) -> tuple[str, ...]:
+        """
+        读取记录中的版本列表。
+        """
+        (size,) = _NAME_LEN.unpack_from(self._mm, offset)
+        pos = offset + _NAME_LEN.size + size
+        (n,) = _COUNT.unpack_from(self._mm, pos)
+        pos += _COUNT.size
+        versions: list[str] = []
+        for _ in range(n):
+            length = self._mm[pos]
+            pos += 1
+            versions.append(self._mm[pos : pos + length].decode("utf-8"))
+            pos += length
+        return tuple(versions)
+
+    def versions(self, name: str) -> tuple[str, ...] | None:
+        """
+        返回包的全部版本（升序）；索引中没有该包时返回 None。
+        """
+        return self._find(normalize_project_name(name))
+
+    def latest(self, name: str, *, include_prereleases: bool) -> Version | None:
+        """
+        返回包的最新版本（默认优先稳定版本，规则同 select_latest_version），结果按包名缓存；没有合法版本时返回 None。
+
+        版本已按 Version 升序存放，从末尾向前只解析到第一个符合条件的版本。索引中没有该包时抛出 KeyError。
+        """
+        normalized = normalize_project_name(name)
+        key = (normalized, include_prereleases)
+        if key in self._latest:
+            return self._latest[key]
+        raw_versions = self._find(normalized)
+        if raw_versions is None:
+            raise KeyError(normalized)
+
+        newest: Version | None = None
+        for raw in reversed(raw_versions):
+            try:
+                version = Version(raw)
+            except InvalidVersion:
+                continue
+            newest = newest or version
+            if include_prereleases or not (version.is_prerelease or version.is_devrelease):
+                newest = version
+                break
+        self._latest[key] = newest
+        return newest
+
+    def _find(self, normalized_name: str) -> tuple[str, ...] | None:
+        """
+        二分查找规范化包名对应的版本列表。
+        """
+        key = normalized_name.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = self._record_offset(mid)
+            current = self._name_at(offset)
+            if current == key:
+                return self._versions_at(offset)
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+@lru_cache(maxsize=8)
+def open_offline_index(path: str) -> OfflineIndex:
+    """
+    打开离线索引（同一路径在进程内复用同一个映射）。
+    """
+    return OfflineIndex(Path(path))
+
+
+# 已停用的离线索引路径：每个路径只提示一次，此后的查询直接回退到在线索引。
+_disabled_paths: set[str] = set()
+
+
+def offline_index_disabled(path: str) -> bool:
+    """
+    该离线索引是否已因错误停用。
+    """
+    return path in _disabled_paths
+
+
+def disable_offline_index(path: str, reason: object) -> None:
+    """
+    停用无法打开或读取的离线索引，并在 stderr 提示一次。
+    """
+    if path in _disabled_paths:
+        return
+    _disabled_paths.add(path)
+    print(f"uv-lens: 离线索引 {path} 不可用（{reason}），改为在线查询", file=sys.stderr)
+
+
+def _sorted_versions(raw_versions: Iterable[Any]) -> list[str]:
+    """
+    过滤无法解析的版本号并按 Version 升序去重排序。
+    """
+    parsed: dict[Version, str] = {}
+    for raw in raw_versions:
+        text = str(raw).strip()
+        if not text or len(text.encode("utf-8")) > 255:
+            continue
+        try:
+            parsed.setdefault(Version(text), text)
+        except InvalidVersion:
+            continue
+    return [parsed[v] for v in sorted(parsed)]
+
+
+def build_offline_index(records: Iterable[tuple[str, Iterable[Any]]], path: Path) -> int:
+    """
+    由 (包名, 版本列表) 生成离线索引文件，返回写入的包数量；同名记录合并版本。
+    """
+    merged: dict[bytes, set[str]] = {}
+    for name, versions in records:
+        key = normalize_project_name(str(name)).encode("utf-8")
+        if not key or len(key) > 0xFFFF:
+            continue
+        merged.setdefault(key, set()).update(str(v) for v in versions)
+
+    names = sorted(merged)
+    offsets: list[int] = []
+    chunks: list[bytes] = []
+    size = 0
+    for key in names:
+        versions = _sorted_versions(merged[key])
+        parts = [_NAME_LEN.pack(len(key)), key, _COUNT.pack(len(versions))]
+        for v in versions:
+            encoded = v.encode("utf-8")
+            parts.append(bytes((len(encoded),)))
+            parts.append(encoded)
+        record = b"".join(parts)
+        offsets.append(size)
+        chunks.append(record)
+        size += len(record)
+    offsets.append(size)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(names)))
+        f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+        for chunk in chunks:
+            f.write(chunk)
+    tmp_path.replace(path)
+    return len(names)
+
+
+def _record_from_json(data: Any) -> tuple[str, list[Any]] | None:
+    """
+    从一条镜像导出记录中提取 (包名, 版本列表)。
+
+    支持 {"name": ..., "versions": [...]} 以及 PyPI JSON API 响应（info.name + releases）。
+    """
+    if not isinstance(data, dict):
+        return None
+    name = data.get("name")
+    info = data.get("info")
+    if not name and isinstance(info, dict):
+        name = info.get("name")
+    if not name:
+        return None
+
+    versions: list[Any] = []
+    if isinstance(data.get("versions"), list):
+        versions.extend(data["versions"])
+    if isinstance(data.get("releases"), dict):
+        versions.extend(data["releases"].keys())
+    if isinstance(info, dict) and info.get("version"):
+        versions.append(info["version"])
+    return str(name), versions
+
+
+def iter_dump_records(path: Path) -> Iterator[tuple[str, list[Any]]]:
+    """
+    读取镜像导出：JSONL 文件（每行一个包），或包含 PyPI JSON API 响应（*.json）的目录。
+    """
+    if path.is_dir():
+        for file in sorted(path.rglob("*.json")):
+            try:
+                record = _record_from_json(json.loads(file.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+            if record is not None:
+                yield record
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = _record_from_json(json.loads(line))
+            except ValueError:
+                continue
+            if record is not None:
+                yield record
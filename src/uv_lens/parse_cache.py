@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+from uv_lens import __version__
+from uv_lens.cache import CacheBackend
+from uv_lens.models import DependencyItem, DependencyKind
+from uv_lens.pyproject import extract_dependencies, flatten_dependencies, parse_requirement, tomllib
+
+# 解析逻辑或存储格式变化时递增，使旧的缓存结果自然失效；缓存键同时包含 uv-lens 版本。
+_PARSE_FORMAT_VERSION = 2
+_MEMO_SIZE = 256
+
+_memo: OrderedDict[str, list[DependencyItem]] = OrderedDict()
+
+
+def content_digest(content: bytes) -> str:
+    """
+    计算 pyproject.toml 内容的缓存键（包含解析格式版本与 uv-lens 版本）。
+    """
+    return f"v{_PARSE_FORMAT_VERSION}:{__version__}:{hashlib.blake2b(content, digest_size=16).hexdigest()}"
+
+
+def _encode_items(items: list[DependencyItem]) -> bytes:
+    """
+    将依赖项编码为 JSON：只保存 (来源, 分组, 原始字符串)，不序列化 Requirement 对象。
+    """
+    return json.dumps([[item.kind.value, item.group, item.raw] for item in items], ensure_ascii=False).encode("utf-8")
+
+
+def _decode_items(blob: bytes) -> list[DependencyItem] | None:
+    """
+    由 _encode_items 的结果重新解析依赖项；数据无法识别时返回 None（调用方重新解析文件）。
+    """
+    try:
+        rows = json.loads(blob)
+        return [parse_requirement(str(raw), kind=DependencyKind(kind), group=str(group)) for kind, group, raw in rows]
+    except (TypeError, ValueError):
+        return None
+
+
+def _remember(digest: str, items: list[DependencyItem]) -> None:
+    """
+    写入进程内 LRU，超出容量时淘汰最久未使用的记录。
+    """
+    _memo[digest] = items
+    _memo.move_to_end(digest)
+    while len(_memo) > _MEMO_SIZE:
+        _memo.popitem(last=False)
+
+
+def clear_memo() -> None:
+    """
+    清空进程内的解析结果缓存。
+    """
+    _memo.clear()
+
+
+def load_dependency_items_cached(
+    pyproject_path: Path,
+    *,
+    store: CacheBackend | None = None,
+) -> tuple[str, list[DependencyItem]]:
+    """
+    读取 pyproject.toml 并抽取依赖项，返回 (内容哈希, 依赖项列表)。
+
+    内容未变化时直接复用进程内的解析结果；store 中只保存依赖字符串，命中时跳过 TOML 解析，只重新解析 Requirement。
+    """
+    content = pyproject_path.read_bytes()
+    digest = content_digest(content)
+
+    items = _memo.get(digest)
+    if items is not None:
+        _memo.move_to_end(digest)
+        return digest, list(items)
+
+    if store is not None:
+        blob = store.get_parsed(digest)
+        if blob is not None:
+            items = _decode_items(blob)
+
+    if items is None:
+        items = flatten_dependencies(extract_dependencies(tomllib.loads(content.decode("utf-8"))))
+        if store is not None:
+            store.set_parsed(digest, _encode_items(items))
+
+    _remember(digest, items)
+    return digest, list(items)
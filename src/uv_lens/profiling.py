@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import cProfile
+import importlib
+import io
+import pstats
+from pathlib import Path
+from typing import TextIO
+
+from uv_lens.metrics import RunMetrics, timed_phase
+
+DEFAULT_PROFILE_PATH = "uv-lens.prof"
+
+# 子命令按需导入的模块；性能分析模式下预先导入，以便单独统计导入耗时。
+_COMMAND_MODULES = ("uv_lens.app", "uv_lens.formatters", "uv_lens.cache", "uv_lens.resolver")
+
+# 阶段在摘要中的显示顺序；未列出的阶段排在最后。
+_PHASE_ORDER = ("import", "config", "parse", "cache_read", "network", "cache_write", "evaluation", "render")
+
+
+def import_command_modules() -> None:
+    """
+    在 import 阶段内导入子命令使用的模块（已导入的模块不会重复计时）。
+    """
+    with timed_phase("import"):
+        for name in _COMMAND_MODULES:
+            importlib.import_module(name)
+
+
+def format_phase_table(metrics: RunMetrics) -> str:
+    """
+    各阶段的墙钟时间、CPU 时间与等待时间（墙钟减 CPU，主要是网络与磁盘等待）。
+
+    network 阶段与同时进行的缓存写入、评估重叠，各阶段之和不一定等于总耗时。
+    """
+    names = sorted(metrics.phases, key=lambda n: (_PHASE_ORDER.index(n) if n in _PHASE_ORDER else len(_PHASE_ORDER), n))
+    lines = [f"{'phase':<12} {'wall ms':>10} {'cpu ms':>10} {'wait ms':>10}"]
+    for name in names:
+        wall = metrics.phases[name] * 1000
+        cpu = metrics.phases_cpu.get(name, 0.0) * 1000
+        lines.append(f"{name:<12} {wall:>10.1f} {cpu:>10.1f} {max(0.0, wall - cpu):>10.1f}")
+    lines.append(f"{'total':<12} {metrics.duration_s * 1000:>10.1f}")
+    return "\n".join(lines) + "\n"
+
+
+def format_hot_functions(profiler: cProfile.Profile, *, limit: int = 25) -> str:
+    """
+    按自身耗时排序的热点函数摘要（pstats 格式）。
+    """
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.strip_dirs().sort_stats(pstats.SortKey.TIME, pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return buffer.getvalue()
+
+
+def write_profile_report(
+    profiler: cProfile.Profile,
+    metrics: RunMetrics,
+    path: Path,
+    *,
+    file: TextIO,
+    limit: int = 25,
+) -> None:
+    """
+    将完整的 profile 写入 path（可用 snakeviz、pstats 等工具查看），并把热点函数与阶段耗时摘要写到 file。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(str(path))
+    file.write(format_hot_functions(profiler, limit=limit))
+    file.write("\n")
+    file.write(format_phase_table(metrics))
+    file.write(f"\nprofile 已写入：{path}\n")
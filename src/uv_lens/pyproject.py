@@ -93,3 +93,23 @@ def extract_dependencies(pyproject_data: dict[str, Any]) -> PyprojectDependencie
         optional=optional,
         build_system=build_system,
     )
+
+
+def flatten_dependencies(deps: PyprojectDependencies) -> list[DependencyItem]:
+    """
+    按 项目 → 开发组 → 可选依赖 → 构建依赖 的顺序展开为单个列表。
+    """
+    items: list[DependencyItem] = list(deps.project)
+    for group_items in deps.dev_groups.values():
+        items.extend(group_items)
+    for extra_items in deps.optional.values():
+        items.extend(extra_items)
+    items.extend(deps.build_system)
+    return items
+
+
+def load_dependency_items(pyproject_path: Path) -> list[DependencyItem]:
+    """
+    读取 pyproject.toml 并抽取所有依赖项列表。
+    """
+    return flatten_dependencies(extract_dependencies(load_pyproject_data(pyproject_path)))
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import httpx
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CacheEntry, entry_from_json, entry_to_json
+
+PROTOCOL_VERSION = 2
+
+# 客户端与服务端共用的访问令牌环境变量（cache-serve --token 的默认值）。
+TOKEN_ENV = "UV_LENS_CACHE_TOKEN"
+
+
+class CacheServer(ThreadingHTTPServer):
+    """
+    通过 HTTP/JSON 暴露 CacheDB 的共享缓存服务（供多台 CI runner 共用）。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], db: CacheDB, *, token: str | None = None) -> None:
+        """
+        绑定地址并持有缓存数据库；多线程请求通过锁串行访问 SQLite。设置 token 时除 /v1/health 外的请求都需携带该令牌。
+        """
+        super().__init__(address, _CacheRequestHandler)
+        self.db = db
+        self.lock = threading.Lock()
+        self.token = token
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+    """
+    处理 /v1/health、/v1/get、/v1/put 与 /v1/invalidate 请求。
+    """
+
+    server: CacheServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        关闭默认的逐请求访问日志。
+        """
+        return None
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        """
+        发送 JSON 响应。
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        """
+        校验 Authorization: Bearer 令牌（服务未设置令牌时总是通过）。
+        """
+        token = self.server.token
+        if not token:
+            return True
+        header = self.headers.get("Authorization") or ""
+        return hmac.compare_digest(header.encode("utf-8"), f"Bearer {token}".encode("utf-8"))
+
+    def do_GET(self) -> None:
+        if self.path == "/v1/health":
+            self._send_json(200, {"ok": True, "protocol": PROTOCOL_VERSION})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            self._send_json(401, {"error": "unauthorized"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": "invalid payload"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid json"})
+            return
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "invalid payload"})
+            return
+
+        if self.path == "/v1/get":
+            scopes = body.get("scopes") or {}
+            if not isinstance(scopes, dict):
+                self._send_json(400, {"error": "invalid payload"})
+                return
+            try:
+                ttl_s = int(body.get("ttl_s") or 0)
+            except (TypeError, ValueError):
+                self._send_json(400, {"error": "invalid payload"})
+                return
+            found: dict[str, dict[str, Any]] = {}
+            with self.server.lock:
+                for scope, names in scopes.items():
+                    if not isinstance(names, list):
+                        continue
+                    entries = self.server.db.get_many(
+                        scope=str(scope), normalized_names=[str(n) for n in names], ttl_s=ttl_s
+                    )
+                    found[str(scope)] = {n: entry_to_json(e) for n, e in entries.items()}
+            self._send_json(200, {"scopes": found})
+            return
+
+        if self.path == "/v1/put":
+            scopes = body.get("scopes") or {}
+            if not isinstance(scopes, dict):
+                self._send_json(400, {"error": "invalid payload"})
+                return
+            stored = 0
+            with self.server.lock:
+                for scope, raw_entries in scopes.items():
+                    if not isinstance(raw_entries, dict):
+                        continue
+                    entries = {
+                        str(n): entry_from_json(d) for n, d in raw_entries.items() if isinstance(d, dict)
+                    }
+                    self.server.db.put_entries(scope=str(scope), entries=entries)
+                    stored += len(entries)
+            self._send_json(200, {"stored": stored})
+            return
+
+        if self.path == "/v1/invalidate":
+            names = [str(n) for n in body.get("names") or []]
+            with self.server.lock:
+                self.server.db.invalidate(names)
+            self._send_json(200, {"invalidated": len(names)})
+            return
+
+        self._send_json(404, {"error": "not found"})
+
+
+def _is_loopback(host: str) -> bool:
+    """
+    判断监听地址是否只接受本机连接。
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_cache_server(
+    db_path: Path,
+    *,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    token: str | None = None,
+) -> CacheServer:
+    """
+    创建共享缓存服务（port=0 时由系统分配端口）。
+
+    服务可读写整个缓存，监听非回环地址时必须设置 token，否则抛出 ValueError。
+    """
+    if not token and not _is_loopback(host):
+        raise ValueError(f"监听非本机地址 {host} 时必须设置访问令牌（--token 或 {TOKEN_ENV}）")
+    db = CacheDB(db_path, check_same_thread=False)
+    return CacheServer((host, port), db, token=token or None)
+
+
+def serve_cache(db_path: Path, *, host: str = "127.0.0.1", port: int = 8765, token: str | None = None) -> None:
+    """
+    阻塞运行共享缓存服务，直到收到 Ctrl+C。
+    """
+    server = create_cache_server(db_path, host=host, port=port, token=token)
+    bound_host, bound_port = server.server_address[:2]
+    print(f"uv-lens cache server: http://{bound_host}:{bound_port}（{db_path}）", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.db.close()
+
+
+class RemoteCache:
+    """
+    共享缓存服务的客户端：读写都落在本地 SQLite，与服务端的交换由异步的 prefetch / flush 各一次批量请求完成。
+
+    服务不可用时本次运行只用本地缓存；同步的 CacheBackend 方法从不访问网络，不会阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        fallback: CacheDB | None = None,
+        timeout_s: float = 5.0,
+        client: httpx.AsyncClient | None = None,
+        token: str | None = None,
+    ) -> None:
+        """
+        初始化客户端；未传入 client 时每次请求临时创建 httpx.AsyncClient（每次运行只有两次请求）。
+        """
+        self._base_url = url.strip().rstrip("/")
+        self._fallback = fallback
+        self._timeout_s = timeout_s
+        self._client = client
+        self._headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._entries: dict[tuple[str, str], CacheEntry] = {}
+        self._pending: dict[str, dict[str, CacheEntry]] = {}
+        self._invalidated: set[str] = set()
+        self._available = True
+
+    @property
+    def available(self) -> bool:
+        """
+        远程服务是否仍可用（任意一次请求失败后即停止访问，本次运行只用本地缓存）。
+        """
+        return self._available
+
+    async def _post(self, path: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        发送 JSON 请求；失败时标记服务不可用并返回 None。
+        """
+        if not self._available:
+            return None
+        url = f"{self._base_url}{path}"
+        try:
+            if self._client is not None:
+                resp = await self._client.post(url, json=payload, headers=self._headers)
+            else:
+                async with httpx.AsyncClient(timeout=httpx.Timeout(self._timeout_s)) as client:
+                    resp = await client.post(url, json=payload, headers=self._headers)
+            resp.raise_for_status()
+            data = resp.json()
+        except (httpx.HTTPError, ValueError):
+            self._available = False
+            return None
+        return data if isinstance(data, dict) else None
+
+    async def prefetch(self, names_by_scope: dict[str, list[str]]) -> None:
+        """
+        一次请求取回各 scope 下这些包的全部记录（不按 TTL 过滤，调用方读取时再判断），并回填本地缓存。
+        """
+        requested = {scope: list(dict.fromkeys(names)) for scope, names in names_by_scope.items() if names}
+        if not requested:
+            return
+        # 先推送失效标记，否则服务端仍会返回这些包未过期的旧记录，回填后在本地重新变为有效。
+        await self._push_invalidations()
+        if self._invalidated:
+            return
+        data = await self._post("/v1/get", {"scopes": requested, "ttl_s": 0})
+        raw_scopes = data.get("scopes") if data else None
+        if not isinstance(raw_scopes, dict):
+            return
+
+        fetched: dict[str, dict[str, CacheEntry]] = {}
+        for scope, raw_entries in raw_scopes.items():
+            if not isinstance(raw_entries, dict):
+                continue
+            entries = {str(n): entry_from_json(d) for n, d in raw_entries.items() if isinstance(d, dict)}
+            fetched[str(scope)] = entries
+            for name, entry in entries.items():
+                self._entries[(str(scope), name)] = entry
+        if self._fallback is not None and fetched:
+            self._fallback.merge_scopes(fetched)
+
+    def get(self, *, scope: str, normalized_name: str, ttl_s: int) -> CacheEntry | None:
+        """
+        获取单条缓存记录。
+        """
+        return self.get_many(scope=scope, normalized_names=[normalized_name], ttl_s=ttl_s).get(normalized_name)
+
+    def get_many(
+        self, *, scope: str, normalized_names: list[str], ttl_s: int, include_stale: bool = False
+    ) -> dict[str, CacheEntry]:
+        """
+        先查本地缓存，缺失的部分再查本次预取或写入的记录；不访问网络。
+        """
+        entries = (
+            self._fallback.get_many(
+                scope=scope, normalized_names=normalized_names, ttl_s=ttl_s, include_stale=include_stale
+            )
+            if self._fallback is not None
+            else {}
+        )
+        now = time.time()
+        for name in normalized_names:
+            entry = self._entries.get((scope, name))
+            if name not in entries and entry is not None and (ttl_s <= 0 or now - entry.fetched_at <= ttl_s):
+                entries[name] = entry
+        return entries
+
+    def set(
+        self,
+        *,
+        scope: str,
+        normalized_name: str,
+        latest: Version | None,
+        resolved_index_url: str | None,
+        not_found: bool,
+        error: str | None,
+        release_times: tuple[int, ...] = (),
+        error_count: int = 0,
+        latency_ms: int = 0,
+    ) -> None:
+        """
+        写入本地缓存，并暂存等待批量推送到服务端。
+        """
+        if self._fallback is not None:
+            self._fallback.set(
+                scope=scope,
+                normalized_name=normalized_name,
+                latest=latest,
+                resolved_index_url=resolved_index_url,
+                not_found=not_found,
+                error=error,
+                release_times=release_times,
+                error_count=error_count,
+                latency_ms=latency_ms,
+            )
+        entry = CacheEntry(
+            latest=latest,
+            resolved_index_url=resolved_index_url,
+            not_found=not_found,
+            error=error,
+            fetched_at=int(time.time()),
+            release_times=release_times,
+            error_count=error_count,
+            latency_ms=latency_ms,
+        )
+        self._entries[(scope, normalized_name)] = entry
+        self._pending.setdefault(scope, {})[normalized_name] = entry
+
+    def invalidate(self, normalized_names: list[str]) -> None:
+        """
+        在本地标记过期，丢弃这些包已预取与尚未推送的记录，并暂存等待推送到服务端。
+        """
+        names = set(normalized_names)
+        for entries in self._pending.values():
+            for name in names & entries.keys():
+                del entries[name]
+        for key in [k for k in self._entries if k[1] in names]:
+            del self._entries[key]
+        if self._fallback is not None:
+            self._fallback.invalidate(normalized_names)
+        self._invalidated |= names
+
+    def get_meta(self, key: str) -> str | None:
+        """
+        meta 值（如变更源 serial）只保存在本地缓存中。
+        """
+        return self._fallback.get_meta(key) if self._fallback is not None else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        写入本地 meta 值。
+        """
+        if self._fallback is not None:
+            self._fallback.set_meta(key, value)
+
+    def get_parsed(self, digest: str) -> bytes | None:
+        """
+        解析结果缓存只保存在本地。
+        """
+        return self._fallback.get_parsed(digest) if self._fallback is not None else None
+
+    def set_parsed(self, digest: str, data: bytes) -> None:
+        """
+        写入本地解析结果缓存。
+        """
+        if self._fallback is not None:
+            self._fallback.set_parsed(digest, data)
+
+    async def _push_invalidations(self) -> None:
+        """
+        推送暂存的失效标记；推送失败时保留，服务不可用后不再访问服务端。
+        """
+        if not self._invalidated:
+            return
+        names = sorted(self._invalidated)
+        if await self._post("/v1/invalidate", {"names": names}) is not None:
+            self._invalidated.difference_update(names)
+
+    async def flush(self) -> None:
+        """
+        将暂存的失效标记与写入推送到服务端（各一次批量请求）。
+        """
+        await self._push_invalidations()
+        if not self._pending:
+            return
+        payload = {
+            "scopes": {
+                scope: {n: entry_to_json(e) for n, e in entries.items()} for scope, entries in self._pending.items()
+            }
+        }
+        self._pending = {}
+        await self._post("/v1/put", payload)
+
+    def close(self) -> None:
+        """
+        释放本地缓存；未经 flush 推送的写入只保留在本地。
+        """
+        self._entries.clear()
+        if self._fallback is not None:
+            self._fallback.close()
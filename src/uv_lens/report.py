@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from packaging.version import Version
+if TYPE_CHECKING:
+    from packaging.requirements import Requirement
+    from packaging.version import Version
 
 from uv_lens.models import CheckStatus, DependencyKind
 
@@ -11,6 +15,11 @@ from uv_lens.models import CheckStatus, DependencyKind
 class ReportItem:
     """
     单条依赖检查结果。
+
+    locked / lag 为 uv.lock 中的锁定版本与其落后程度（major / minor / patch / pre），仅在检查时传入 uv.lock 时设置；
+    pyproject 中已声明的包记在对应的依赖项上，不再单独列出锁定项。
+    requirement 为 raw 解析后的结果，供写回与生成 uv add 命令时复用，不参与比较也不输出；
+    为 None 时（如经守护进程传输的报告）使用方自行解析 raw。
     """
 
     kind: DependencyKind
@@ -22,6 +31,9 @@ class ReportItem:
     suggestion: str | None
     index_url: str | None
     error: str | None
+    locked: Version | None = None
+    lag: str | None = None
+    requirement: Requirement | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -34,3 +46,29 @@ class Report:
     items: list[ReportItem]
     cache_hits: int
     fetched: int
+    adaptive_saved: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class WorkspaceReport:
+    """
+    工作区（monorepo）检查报告：各项目的报告与整体汇总。
+
+    unique_packages 为所有项目去重后的包数量；cache_hits / fetched 为本次解析的整体统计；
+    failed 为无法读取或解析的项目 (路径, 错误)。
+    """
+
+    root: str
+    reports: list[Report]
+    unique_packages: int
+    cache_hits: int
+    fetched: int
+    adaptive_saved: int = 0
+    failed: list[tuple[str, str]] = field(default_factory=list)
+
+    def status_counts(self) -> dict[CheckStatus, int]:
+        """
+        汇总所有项目中各检查状态的数量。
+        """
+        counts = Counter(item.status for report in self.reports for item in report.items)
+        return {status: counts[status] for status in CheckStatus if counts[status]}
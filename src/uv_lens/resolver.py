@@ -1,11 +1,25 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
 
-from uv_lens.cache import CacheDB, CacheEntry, index_scope_key
-from uv_lens.index_client import IndexSettings, PackageLookupResult, create_async_client, fetch_latest_from_indexes
+from uv_lens.cache import CacheBackend, CacheEntry, CachePolicy, index_scope_key
+from uv_lens.index_client import (
+    IndexSettings,
+    PackageLookupResult,
+    SharedAsyncClient,
+    create_async_client,
+    fetch_latest_from_index,
+    lookup_offline_index,
+    resolve_index_chain,
+)
+from uv_lens.metrics import current_metrics, phase_clock, timed_phase
+from uv_lens.tracing import span
+
+if TYPE_CHECKING:
+    import httpx
 
 
 @dataclass(frozen=True, slots=True)
@@ -17,6 +31,26 @@ class ResolveStats:
     total: int
     cache_hits: int
     fetched: int
+    adaptive_saved: int = 0
+    offline_hits: int = 0
+    fetched_names: frozenset[str] = frozenset()
+    timed_out: int = 0
+
+
+# 超过截止时间、且没有可用的旧缓存时，查询结果中的错误信息。
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+# meta 表中记录各索引平均查询耗时的键前缀（后接索引 scope）。
+_INDEX_LATENCY_META = "index_latency_ms:"
+
+
+def _smooth_latency(previous: int, observed: int) -> int:
+    """
+    对查询耗时做指数平滑（新观测值占 1/4），避免偶发的慢请求打乱调度；previous 为 0 表示没有历史。
+    """
+    if previous <= 0:
+        return max(1, observed)
+    return max(1, round((previous * 3 + observed) / 4))
 
 
 def _result_from_cache(normalized_name: str, entry: CacheEntry) -> PackageLookupResult:
@@ -32,61 +66,371 @@ def _result_from_cache(normalized_name: str, entry: CacheEntry) -> PackageLookup
     )
 
 
-async def resolve_latest_versions(
+async def _resolve_from_cache(normalized_name: str, chain: dict[str, CacheEntry]) -> PackageLookupResult:
+    """
+    仅用索引链上的缓存记录组合出查询结果。
+    """
+
+    async def lookup(base: str) -> PackageLookupResult:
+        return _result_from_cache(normalized_name, chain[base])
+
+    return await resolve_index_chain(normalized_name, tuple(chain), lookup)
+
+
+def _stale_results(
+    normalized_names: list[str],
+    *,
+    cache: CacheBackend | None,
+    index_urls: tuple[str, ...],
+) -> list[tuple[str, PackageLookupResult]]:
+    """
+    为超过截止时间的包构造结果：沿索引链取第一个有最新版本的缓存记录（不论是否过期），没有时 latest 为 None。
+    """
+    stale: dict[str, dict[str, CacheEntry]] = {}
+    if cache is not None and normalized_names:
+        for base in index_urls:
+            stale[base] = cache.get_many(
+                scope=index_scope_key(base), normalized_names=normalized_names, ttl_s=0, include_stale=True
+            )
+
+    results: list[tuple[str, PackageLookupResult]] = []
+    for name in normalized_names:
+        entry = next(
+            (
+                e
+                for e in (stale.get(base, {}).get(name) for base in index_urls)
+                if e is not None and e.latest is not None and e.resolved_index_url is not None
+            ),
+            None,
+        )
+        results.append(
+            (
+                name,
+                PackageLookupResult(
+                    normalized_name=name,
+                    index_url=entry.resolved_index_url if entry is not None else None,
+                    latest=entry.latest if entry is not None else None,
+                    not_found=False,
+                    error=None if entry is not None else DEADLINE_EXCEEDED,
+                    timed_out=True,
+                ),
+            )
+        )
+    return results
+
+
+async def iter_latest_versions(
     normalized_names: list[str],
     *,
     settings: IndexSettings,
     max_concurrency: int,
-    cache: CacheDB | None,
+    cache: CacheBackend | None,
     cache_ttl_s: int,
     refresh: bool,
+    policy: CachePolicy | None = None,
     on_fetch_start: Callable[[int], Any] | None = None,
     on_fetch_complete: Callable[[], Any] | None = None,
-) -> tuple[dict[str, PackageLookupResult], ResolveStats]:
+    client: httpx.AsyncClient | SharedAsyncClient | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    on_stats: Callable[[ResolveStats], Any] | None = None,
+    deadline: float | None = None,
+    priority: dict[str, int] | None = None,
+) -> AsyncIterator[tuple[str, PackageLookupResult]]:
     """
-    并行解析多个包的最新版本，支持用户目录全局缓存与增量更新。
+    并行解析多个包的最新版本，按完成顺序逐个产出 (包名, 结果)：离线索引与缓存命中先产出，联网查询的结果在各自完成时产出。
+
+    缓存按 (索引, 包名) 记录，结果由索引链上各索引的记录组合而成，只查询缺失或过期的索引。
+    配置了离线索引时，其中已有的包直接取离线结果，不读缓存也不联网。
+    policy 为 None 时按 cache_ttl_s 统一过期；自适应策略下逐条按发布节奏判断是否过期。
+    多批并发调用时可传入共享的 client（或按需创建的 SharedAsyncClient）与 semaphore，使连接池与并发上限在各批之间共用；
+    全部命中缓存时不创建客户端。
+    全部产出后以统计信息调用 on_stats；调用方提前停止迭代时，未完成的查询会被取消。
+    deadline 为 time.monotonic() 下的截止时刻：到期时取消未完成的查询，改用已过期的缓存记录（含被变更源标记失效的记录，
+    没有时 latest 为 None），这些结果标记为 timed_out 且不写入缓存；共享缓存的预取同样在截止时刻放弃。
+
+    需要联网的包按预计耗时从长到短发起（依据缓存中记录的各包、各索引的平滑耗时），使慢查询不会拖在最后；
+    传入 priority 时先按其取值从小到大分组，组内再按耗时排序。
     """
-    scope = index_scope_key(settings.index_url, settings.extra_index_urls)
-    results: dict[str, PackageLookupResult] = {}
+    policy = policy or CachePolicy(ttl_s=cache_ttl_s)
+    index_urls = (settings.index_url, *settings.extra_index_urls)
 
-    cache_hits = 0
-    to_fetch: list[str] = []
-    for name in normalized_names:
-        if cache is None or refresh:
-            to_fetch.append(name)
-            continue
+    pending = normalized_names
+    offline_hits = 0
+    if settings.offline_index:
+        offline_names: set[str] = set()
+        for name in normalized_names:
+            offline = lookup_offline_index(name, settings=settings)
+            if offline is not None:
+                offline_names.add(name)
+                yield name, offline
+        pending = [n for n in normalized_names if n not in offline_names]
+        offline_hits = len(offline_names)
+
+    if cache is not None and pending:
+        # 远程缓存在此一次取回各索引上这些包的全部记录，之后的读取（含历史记录与过期兜底）都在本地完成；
+        # 预取同样受截止时间约束，超时则只用本地缓存。
+        with timed_phase("cache_read"), span("cache.prefetch", "cache", requested=len(pending)):
+            prefetch = cache.prefetch({index_scope_key(base): pending for base in index_urls})
+            try:
+                await asyncio.wait_for(prefetch, None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                pass
 
-        entry = cache.get(scope=scope, normalized_name=name, ttl_s=cache_ttl_s)
+    cached: dict[str, dict[str, CacheEntry]] = {}
+    if cache is not None and not refresh and pending:
+        lookup_ttl_s = policy.lookup_ttl_s()
+        with timed_phase("cache_read"):
+            for base in index_urls:
+                scope = index_scope_key(base)
+                with span("cache.get_many", "cache", scope=scope, requested=len(pending)) as read_span:
+                    cached[base] = cache.get_many(scope=scope, normalized_names=pending, ttl_s=lookup_ttl_s)
+                    read_span.set(found=len(cached[base]))
+
+    now = time.time()
+
+    def fresh_entry(base: str, name: str) -> CacheEntry | None:
+        """
+        返回该索引上仍在有效期内的缓存记录。
+        """
+        entry = cached.get(base, {}).get(name)
         if entry is None:
+            return None
+        ttl_s = policy.ttl_for(entry, now=now)
+        if ttl_s > 0 and now - entry.fetched_at > ttl_s:
+            return None
+        return entry
+
+    def cached_chain(name: str) -> dict[str, CacheEntry] | None:
+        """
+        沿索引链收集有效的缓存记录，直到某个索引给出结果；中途有索引需要重新查询时返回 None。
+        """
+        chain: dict[str, CacheEntry] = {}
+        for base in index_urls:
+            entry = fresh_entry(base, name)
+            if entry is None:
+                return None
+            chain[base] = entry
+            if not entry.not_found and entry.resolved_index_url is not None:
+                break
+        return chain
+
+    cache_hits = 0
+    adaptive_saved = 0
+    to_fetch: list[str] = []
+    timed_out: list[str] = []
+    for name in pending:
+        chain = cached_chain(name)
+        if chain is None:
             to_fetch.append(name)
             continue
 
         cache_hits += 1
-        results[name] = _result_from_cache(name, entry)
+        entry = next(reversed(chain.values()))
+        age = now - entry.fetched_at
+        if policy.adaptive and policy.ttl_s > 0 and age > policy.ttl_s and not policy.covered_by_changelog(entry):
+            adaptive_saved += 1
+        with span("lookup", "resolver", package=name, cache_hit=True) as lookup_span:
+            result = await _resolve_from_cache(name, chain)
+            lookup_span.set(latest=result.latest, index=result.index_url)
+        yield name, result
 
     if on_fetch_start:
         on_fetch_start(len(to_fetch))
 
-    sem = asyncio.Semaphore(max(1, max_concurrency))
-    async with create_async_client(settings) as client:
+    # 待查询包在各索引上的历史记录（不论是否过期）与各索引的平均耗时，用于排序与平滑耗时。
+    history: dict[str, dict[str, CacheEntry]] = {}
+    index_latency: dict[str, int] = {}
+    if cache is not None and to_fetch:
+        with timed_phase("cache_read"):
+            for base in index_urls:
+                scope = index_scope_key(base)
+                with span("cache.get_many", "cache", scope=scope, requested=len(to_fetch), stale=True):
+                    history[base] = cache.get_many(
+                        scope=scope, normalized_names=to_fetch, ttl_s=0, include_stale=True
+                    )
+                raw_latency = cache.get_meta(_INDEX_LATENCY_META + scope)
+                index_latency[base] = int(raw_latency) if raw_latency and raw_latency.isdigit() else 0
+
+    def expected_ms(name: str) -> int:
+        """
+        预计的联网耗时：沿索引链累加需要重新查询的索引的历史耗时（该包没有记录时取索引平均值）。
+        """
+        total = 0
+        for base in index_urls:
+            fresh = fresh_entry(base, name)
+            entry = fresh or history.get(base, {}).get(name)
+            if fresh is None:
+                total += entry.latency_ms if entry is not None and entry.latency_ms else index_latency.get(base, 0)
+            if entry is not None and not entry.not_found and entry.resolved_index_url is not None:
+                break
+        return total
 
-        async def worker(n: str) -> None:
+    to_fetch.sort(key=lambda n: ((priority or {}).get(n, 0), -expected_ms(n)))
+    observed: dict[str, list[int]] = {}
+
+    def store(base: str, n: str, res: PackageLookupResult, latency_ms: int) -> None:
+        """
+        将单个索引的查询结果写入该索引的缓存 scope；出错时累加连续失败次数，并平滑记录查询耗时。
+        """
+        observed.setdefault(base, []).append(latency_ms)
+        failed = res.error is not None and not res.not_found
+        if cache is None or (failed and not policy.cache_errors):
+            return
+        # 取不论是否过期的历史记录：cached 已按 TTL 过滤，--refresh 时为空，会把连续失败次数清零。
+        earlier = history.get(base, {}).get(n)
+        error_count = 0
+        if failed:
+            error_count = 1 + (earlier.error_count if earlier is not None and earlier.error else 0)
+        with span("cache.set", "cache", scope=index_scope_key(base), package=n):
+            cache.set(
+                scope=index_scope_key(base),
+                normalized_name=n,
+                latest=res.latest,
+                resolved_index_url=res.index_url,
+                not_found=res.not_found,
+                error=res.error,
+                release_times=res.release_times,
+                error_count=error_count,
+                latency_ms=_smooth_latency(earlier.latency_ms if earlier is not None else 0, latency_ms),
+            )
+
+    def record_index_latency() -> None:
+        """
+        将本次各索引的平均耗时平滑后写入 meta，供没有单包记录的包估算耗时。
+        """
+        if cache is None:
+            return
+        for base, samples in observed.items():
+            mean = round(sum(samples) / len(samples))
+            smoothed = _smooth_latency(index_latency.get(base, 0), mean)
+            cache.set_meta(_INDEX_LATENCY_META + index_scope_key(base), str(smoothed))
+
+    if to_fetch:
+        sem = semaphore or asyncio.Semaphore(max(1, max_concurrency))
+        owns_client = client is None
+        if isinstance(client, SharedAsyncClient):
+            http = client.get()
+        else:
+            http = client or create_async_client(settings)
+
+        async def worker(n: str) -> tuple[str, PackageLookupResult]:
+            async def lookup(base: str) -> PackageLookupResult:
+                with span("index", "resolver", package=n, index=base) as index_span:
+                    entry = fresh_entry(base, n)
+                    if entry is not None:
+                        index_span.set(cache_hit=True)
+                        return _result_from_cache(n, entry)
+                    started = time.monotonic()
+                    res = await fetch_latest_from_index(n, base, settings=settings, client=http)
+                    index_span.set(cache_hit=False, not_found=res.not_found, result_error=res.error)
+                    store(base, n, res, round((time.monotonic() - started) * 1000))
+                    return res
+
+            queued = time.perf_counter()
             async with sem:
-                res = await fetch_latest_from_indexes(n, settings=settings, client=client)
-                results[n] = res
-                if cache is not None:
-                    cache.set(
-                        scope=scope,
-                        normalized_name=n,
-                        latest=res.latest,
-                        resolved_index_url=res.index_url,
-                        not_found=res.not_found,
-                        error=res.error,
-                    )
+                with span("lookup", "resolver", package=n, cache_hit=False) as lookup_span:
+                    lookup_span.set(queued_ms=round((time.perf_counter() - queued) * 1000, 3))
+                    result = await resolve_index_chain(n, index_urls, lookup)
+                    lookup_span.set(latest=result.latest, index=result.index_url, result_error=result.error)
                 if on_fetch_complete:
                     on_fetch_complete()
+                return n, result
+
+        network_started = phase_clock()
+        tasks = {asyncio.create_task(worker(n)): n for n in to_fetch}
+        try:
+            running = set(tasks)
+            while running:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, running = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    yield task.result()
 
-        await asyncio.gather(*(worker(n) for n in to_fetch))
+            if running:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                timed_out = [n for task, n in tasks.items() if task in running]
+                for name, result in _stale_results(timed_out, cache=cache, index_urls=index_urls):
+                    yield name, result
+        finally:
+            unfinished = [t for t in tasks if not t.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            if owns_client:
+                await http.aclose()
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.add_phase_since("network", network_started)
+            with timed_phase("cache_write"), span("cache.flush", "cache"):
+                record_index_latency()
+                if cache is not None:
+                    await cache.flush()
+    elif cache is not None:
+        # 全部命中缓存时也要推送暂存的失效标记（如变更源同步产生的），否则共享缓存会继续提供过期记录。
+        with timed_phase("cache_write"), span("cache.flush", "cache"):
+            await cache.flush()
+
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.count("offline_hits", offline_hits)
+        metrics.count("cache_hits", cache_hits)
+        metrics.count("fetched", len(to_fetch))
+        metrics.count("timed_out", len(timed_out))
+    if on_stats:
+        on_stats(
+            ResolveStats(
+                total=len(normalized_names),
+                cache_hits=cache_hits,
+                fetched=len(to_fetch),
+                adaptive_saved=adaptive_saved,
+                offline_hits=offline_hits,
+                fetched_names=frozenset(to_fetch),
+                timed_out=len(timed_out),
+            )
+        )
 
-    stats = ResolveStats(total=len(normalized_names), cache_hits=cache_hits, fetched=len(to_fetch))
-    return results, stats
+
+async def resolve_latest_versions(
+    normalized_names: list[str],
+    *,
+    settings: IndexSettings,
+    max_concurrency: int,
+    cache: CacheBackend | None,
+    cache_ttl_s: int,
+    refresh: bool,
+    policy: CachePolicy | None = None,
+    on_fetch_start: Callable[[int], Any] | None = None,
+    on_fetch_complete: Callable[[], Any] | None = None,
+    client: httpx.AsyncClient | SharedAsyncClient | None = None,
+    semaphore: asyncio.Semaphore | None = None,
+    deadline: float | None = None,
+    priority: dict[str, int] | None = None,
+) -> tuple[dict[str, PackageLookupResult], ResolveStats]:
+    """
+    解析多个包的最新版本并一次性返回全部结果与统计（iter_latest_versions 的收集版本）。
+    """
+    results: dict[str, PackageLookupResult] = {}
+    stats: list[ResolveStats] = []
+    async for name, result in iter_latest_versions(
+        normalized_names,
+        settings=settings,
+        max_concurrency=max_concurrency,
+        cache=cache,
+        cache_ttl_s=cache_ttl_s,
+        refresh=refresh,
+        policy=policy,
+        on_fetch_start=on_fetch_start,
+        on_fetch_complete=on_fetch_complete,
+        client=client,
+        semaphore=semaphore,
+        on_stats=stats.append,
+        deadline=deadline,
+        priority=priority,
+    ):
+        results[name] = result
+    return results, stats[0]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from uv_lens.cache import CacheDB, CacheEntry, entry_from_json, entry_to_json, normalize_index_url
+from uv_lens.names import normalize_project_name
+
+SNAPSHOT_FORMAT = "uv-lens-cache-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(ValueError):
+    """
+    快照文件无法识别（格式或版本不符、内容损坏）。
+    """
+
+
+def export_snapshot(
+    db: CacheDB,
+    path: Path,
+    *,
+    index_urls: list[str] | None = None,
+    names: list[str] | None = None,
+) -> int:
+    """
+    将缓存导出为 gzip 压缩的 JSON 快照（可按索引与包名筛选），返回导出的记录数。
+    """
+    scopes_filter = [normalize_index_url(u) for u in index_urls] if index_urls else None
+    names_filter = [normalize_project_name(n) for n in names] if names else None
+
+    scopes: dict[str, dict[str, dict[str, Any]]] = {}
+    count = 0
+    for scope, name, entry in db.iter_entries(scopes=scopes_filter, normalized_names=names_filter):
+        scopes.setdefault(scope, {})[name] = entry_to_json(entry)
+        count += 1
+
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": int(time.time()),
+        "scopes": scopes,
+    }
+    data = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        f.write(data)
+    return count
+
+
+# 快照条目各字段允许的 JSON 类型（None 表示缺省值）。
+_ENTRY_FIELD_TYPES: dict[str, tuple[type, ...]] = {
+    "latest": (str,),
+    "resolved_index_url": (str,),
+    "not_found": (bool,),
+    "error": (str,),
+    "fetched_at": (int,),
+    "release_times": (list,),
+    "error_count": (int,),
+    "latency_ms": (int,),
+}
+
+
+def _entry_from_snapshot(data: Any) -> CacheEntry:
+    """
+    校验单条快照记录的字段类型并还原为缓存条目，不合法时抛出 SnapshotError。
+    """
+    if not isinstance(data, dict):
+        raise SnapshotError("快照内容损坏")
+    for key, types in _ENTRY_FIELD_TYPES.items():
+        value = data.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise SnapshotError("快照内容损坏")
+    try:
+        return entry_from_json(data)
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise SnapshotError("快照内容损坏") from exc
+
+
+def read_snapshot(path: Path) -> dict[str, dict[str, CacheEntry]]:
+    """
+    读取并校验快照，返回 {scope: {name: entry}}。
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            payload = json.loads(f.read())
+    except (OSError, EOFError, ValueError) as exc:
+        raise SnapshotError(f"无法读取缓存快照：{exc}") from exc
+
+    if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError("不是 uv-lens 缓存快照")
+    version = payload.get("version")
+    if not isinstance(version, int) or version > SNAPSHOT_VERSION:
+        raise SnapshotError(f"不支持的快照版本：{version}")
+
+    raw_scopes = payload.get("scopes")
+    if not isinstance(raw_scopes, dict):
+        raise SnapshotError("快照内容损坏")
+
+    scopes: dict[str, dict[str, CacheEntry]] = {}
+    for scope, raw_entries in raw_scopes.items():
+        if not isinstance(raw_entries, dict):
+            raise SnapshotError("快照内容损坏")
+        scopes[str(scope)] = {str(n): _entry_from_snapshot(d) for n, d in raw_entries.items()}
+    return scopes
+
+
+def import_snapshot(db: CacheDB, path: Path) -> int:
+    """
+    在单个事务中将快照合并进缓存（冲突时保留较新的记录），返回处理的记录数。
+    """
+    return db.merge_scopes(read_snapshot(path))
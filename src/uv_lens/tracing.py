@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+# 当前运行的 Tracer；未开启 --trace 时为 None，span() 直接返回共享的空操作对象。
+_current: ContextVar[Tracer | None] = ContextVar("uv_lens_tracer", default=None)
+
+
+class Span:
+    """
+    一个进行中的区间；退出时以 Chrome trace 的完整事件（ph="X"）记录到 Tracer。
+    """
+
+    __slots__ = ("_tracer", "name", "category", "attrs", "_start")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, attrs: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self._start = 0.0
+
+    def set(self, **attrs: Any) -> None:
+        """
+        追加或覆盖区间属性（如状态码、字节数、是否命中缓存）。
+        """
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> Span:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, _tb: Any) -> None:
+        if exc_type is not None:
+            self.attrs["error"] = "cancelled" if exc_type is asyncio.CancelledError else repr(exc)
+        self._tracer.record(self.name, self.category, self._start, time.perf_counter(), self.attrs)
+
+
+class _NoopSpan:
+    """
+    未开启追踪时使用的区间：所有操作都不做任何事。
+    """
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, _tb: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    收集区间并导出为 Chrome trace 格式（chrome://tracing、Perfetto 可直接打开）。
+
+    每个 asyncio 任务对应一条轨道，同一时刻并发的查询分开显示。
+    """
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._events: list[dict[str, Any]] = []
+        self._tracks: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _track(self) -> int:
+        """
+        当前 asyncio 任务（没有时为当前线程）对应的轨道编号。
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else threading.get_ident()
+        track = self._tracks.get(key)
+        if track is None:
+            track = len(self._tracks) + 1
+            self._tracks[key] = track
+            label = task.get_name() if task is not None else threading.current_thread().name
+            self._events.append(
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": track, "args": {"name": label}}
+            )
+        return track
+
+    def record(self, name: str, category: str, start: float, end: float, attrs: dict[str, Any]) -> None:
+        """
+        记录一个已结束的区间（start / end 为 time.perf_counter() 读数）。
+        """
+        with self._lock:
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1_000_000, 3),
+                    "dur": round((end - start) * 1_000_000, 3),
+                    "pid": os.getpid(),
+                    "tid": self._track(),
+                    "args": {k: _json_value(v) for k, v in attrs.items()},
+                }
+            )
+
+    @property
+    def events(self) -> list[dict[str, Any]]:
+        """
+        已记录的事件（含轨道名称元数据）。
+        """
+        return list(self._events)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        导出为 Chrome trace JSON 对象。
+        """
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> None:
+        """
+        将追踪结果写入 JSON 文件。
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+
+def _json_value(value: Any) -> Any:
+    """
+    将属性值转换为 JSON 可表示的值（版本号等对象转为字符串）。
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def current_tracer() -> Tracer | None:
+    """
+    返回当前上下文中的 Tracer（未开启时为 None）。
+    """
+    return _current.get()
+
+
+@contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """
+    在上下文内开启追踪；asyncio 任务会继承创建时的上下文，因此在 asyncio.run 之前进入即可。
+    """
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+def span(name: str, category: str = "uv_lens", **attrs: Any) -> Span | _NoopSpan:
+    """
+    创建一个区间，用于 with 语句；未开启追踪时返回共享的空操作对象。
+    """
+    tracer = _current.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, category, attrs)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import replace
 from pathlib import Path
+from typing import Any
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -9,12 +10,14 @@ from textual.containers import Horizontal
 from textual.screen import ModalScreen
 from textual.widgets import DataTable, Footer, Header, Label, Static, TextArea
 
-from uv_lens.app import check_pyproject
+from uv_lens.app import create_memory_cache
+from uv_lens.cache import MemoryCache
 from uv_lens.config import load_config
 from uv_lens.models import PinMode
 from uv_lens.report import Report, ReportItem
 from uv_lens.updater import apply_updates_to_pyproject
 from uv_lens.uv_commands import generate_uv_add_commands
+from uv_lens.watch import IncrementalChecker
 
 
 class TextPreview(ModalScreen[bool]):
@@ -64,10 +67,17 @@ class UvLensApp(App[None]):
         Binding("u", "update_preview", "更新预览/写回"),
     ]
 
+    # 自动重新检查时轮询 pyproject.toml 的间隔（秒）。
+    WATCH_INTERVAL_S = 1.0
+
     def __init__(self, pyproject_path: Path) -> None:
         super().__init__()
         self._pyproject_path = pyproject_path
         self._report: Report | None = None
+        self._cache: MemoryCache | None = None
+        self._checker: IncrementalChecker | None = None
+        self._signatures: tuple[Any, ...] | None = None
+        self._checking = False
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -81,18 +91,46 @@ class UvLensApp(App[None]):
         table.add_columns("分组", "包", "当前", "最新", "状态")
         self.query_one("#details", Static).update("按 r 刷新；e 导出 uv 命令；u 预览/写回更新。")
         await self._load_report(refresh=False)
+        self.set_interval(self.WATCH_INTERVAL_S, self._reload_if_changed)
 
     async def _load_report(self, *, refresh: bool) -> None:
         cfg = load_config(None)
         cfg = replace(cfg, pin="compatible", refresh=refresh)
+        if self._cache is None:
+            self._cache = create_memory_cache(cfg)
+        if refresh or self._checker is None:
+            self._checker = IncrementalChecker(self._pyproject_path, config=cfg, cache=self._cache)
         self.query_one("#details", Static).update("正在检查依赖，请稍候…")
-        report = await check_pyproject(self._pyproject_path, config=cfg)
+        self._checking = True
+        try:
+            self._signatures = self._checker.signatures()
+            report, _ = await self._checker.check()
+        finally:
+            self._checking = False
         self._report = report
         self._render_table(report)
         self.query_one("#details", Static).update(
             f"完成：缓存命中 {report.cache_hits}，发起查询 {report.fetched}。"
         )
 
+    async def _reload_if_changed(self) -> None:
+        """
+        pyproject.toml 变化后自动增量检查（只重新查询与评估新增或修改的依赖）。
+        """
+        if self._checker is None or self._checking:
+            return
+        if self._checker.signatures() == self._signatures and not self._checker.refresh_due():
+            return
+        try:
+            await self._load_report(refresh=False)
+        except (OSError, UnicodeDecodeError, ValueError) as exc:
+            self.query_one("#details", Static).update(f"pyproject.toml 暂时无法解析：{exc}")
+
+    def on_unmount(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
     def _render_table(self, report: Report) -> None:
         table = self.query_one("#table", DataTable)
         table.clear()
@@ -40,13 +40,16 @@ def _suggest_from_report_item(raw: str, *, latest: Version, pin: PinMode) -> str
 
 def _build_change_map(report: Report, *, pin: PinMode) -> dict[tuple[str, str, str], str]:
     """
-    从报告构建 (kind, group, normalized_name) -> new_requirement 的映射。
+    从报告构建 (kind, group, normalized_name) -> new_requirement 的映射（优先使用报告中已解析的 requirement）。
     """
     mapping: dict[tuple[str, str, str], str] = {}
     for item in report.items:
         if item.latest is None or not item.name:
             continue
-        suggested = _suggest_from_report_item(item.raw, latest=item.latest, pin=pin)
+        if item.requirement is not None:
+            suggested = suggest_updated_requirement(item.requirement, latest=item.latest, pin=pin)
+        else:
+            suggested = _suggest_from_report_item(item.raw, latest=item.latest, pin=pin)
         if not suggested:
             continue
         key = (item.kind.value, item.group, normalize_project_name(item.name))
@@ -65,6 +68,8 @@ def apply_updates_to_pyproject(
     根据报告与 pin 策略更新 pyproject.toml 中的版本约束。
     """
     change_map = _build_change_map(report, pin=pin)
+    # 报告中出现过的原始字符串直接取其包名，不再重复解析；文件在检查后被改动过的条目才重新解析。
+    known_names = {item.raw: item.name for item in report.items if item.requirement is not None}
     doc = parse(pyproject_path.read_text(encoding="utf-8"))
     changes: list[UpdateChange] = []
 
@@ -74,11 +79,13 @@ def apply_updates_to_pyproject(
         for i, raw in enumerate(list(arr)):
             if not isinstance(raw, str):
                 continue
-            try:
-                req = Requirement(raw)
-            except InvalidRequirement:
-                continue
-            key = (kind.value, group, normalize_project_name(req.name))
+            name = known_names.get(raw)
+            if name is None:
+                try:
+                    name = Requirement(raw).name
+                except InvalidRequirement:
+                    continue
+            key = (kind.value, group, normalize_project_name(name))
             new_raw = change_map.get(key)
             if new_raw and new_raw != raw:
                 arr[i] = new_raw
@@ -86,7 +93,7 @@ def apply_updates_to_pyproject(
                     UpdateChange(
                         kind=kind,
                         group=group,
-                        name=req.name,
+                        name=name,
                         before=raw,
                         after=new_raw,
                     )
@@ -26,10 +26,10 @@ def generate_uv_add_commands(report: Report, *, pin: PinMode, use_dev_flag: bool
     for item in report.items:
         if item.latest is None or not item.name:
             continue
-        if item.kind == DependencyKind.BUILD_SYSTEM:
+        if item.kind in {DependencyKind.BUILD_SYSTEM, DependencyKind.LOCKED}:
             continue
 
-        req = Requirement(item.raw) if item.raw else Requirement(item.name)
+        req = item.requirement or (Requirement(item.raw) if item.raw else Requirement(item.name))
         pinned = _pin_for_uv(req, latest=item.latest, pin=pin)
 
         if item.kind == DependencyKind.PROJECT:
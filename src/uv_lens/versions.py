@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from packaging.requirements import Requirement
@@ -134,6 +135,90 @@ def evaluate_requirement_against_latest(
     )
 
 
+# 评估结果复用：键为 (原始 requirement 字符串, 最新版本字符串, pin)。按原始字符串而不是 Requirement 对象区分，
+# 大小写或写法不同的同一依赖各自保留原样的建议字符串，也省去每次计算 Requirement 的哈希；
+# 最新版本同样按字符串区分，Version("1.0") == Version("1.0.0") 时建议中仍保留索引返回的写法。
+_EVALUATION_CACHE_SIZE = 8192
+_evaluation_cache: OrderedDict[tuple[str, str, PinMode], VersionEvaluation] = OrderedDict()
+
+
+def evaluate_requirement_cached(
+    raw: str,
+    req: Requirement | None,
+    *,
+    latest: Version | None,
+    not_found: bool = False,
+    network_error: str | None = None,
+    pin: PinMode = "none",
+) -> VersionEvaluation:
+    """
+    与 evaluate_requirement_against_latest 相同，但对已解析出最新版本的依赖按 (raw, str(latest), pin) 复用结果（有界 LRU）。
+
+    req 必须是由 raw 解析得到的 Requirement；工作区与多次运行中相同的依赖写法只做一次版本比较与建议生成。
+    """
+    if req is None or latest is None or not_found or network_error:
+        return evaluate_requirement_against_latest(
+            req, latest=latest, not_found=not_found, network_error=network_error, pin=pin
+        )
+    key = (raw, str(latest), pin)
+    cached = _evaluation_cache.get(key)
+    if cached is not None:
+        _evaluation_cache.move_to_end(key)
+        return cached
+    evaluation = evaluate_requirement_against_latest(req, latest=latest, pin=pin)
+    _evaluation_cache[key] = evaluation
+    if len(_evaluation_cache) > _EVALUATION_CACHE_SIZE:
+        _evaluation_cache.popitem(last=False)
+    return evaluation
+
+
+def version_lag(locked: Version, latest: Version) -> str | None:
+    """
+    锁定版本相对最新版本的落后程度：major / minor / patch / pre / post；不落后时返回 None。
+
+    发布号第四段及以后的差异计为 patch；发布号相同时，预发布或开发版差异为 pre，仅后发布或本地版本号不同为 post。
+    """
+    if locked >= latest:
+        return None
+    if locked.major != latest.major:
+        return "major"
+    if locked.minor != latest.minor:
+        return "minor"
+    if locked.micro != latest.micro or locked.release != latest.release:
+        return "patch"
+    if locked.pre != latest.pre or locked.dev != latest.dev:
+        return "pre"
+    return "post"
+
+
+def evaluate_locked_against_latest(
+    locked: Version,
+    *,
+    latest: Version | None,
+    not_found: bool = False,
+    network_error: str | None = None,
+) -> VersionEvaluation:
+    """
+    将 uv.lock 中的锁定版本与最新版本对比；reason 为落后程度（见 version_lag）。
+    """
+    if network_error:
+        return VersionEvaluation(status=CheckStatus.NETWORK_ERROR, latest=latest, suggestion=None, reason=network_error)
+    if not_found:
+        return VersionEvaluation(status=CheckStatus.NOT_FOUND, latest=latest, suggestion=None, reason="package not found")
+    if latest is None:
+        return VersionEvaluation(
+            status=CheckStatus.INDEX_ERROR,
+            latest=None,
+            suggestion=None,
+            reason="no latest version resolved",
+        )
+
+    lag = version_lag(locked, latest)
+    if lag is None:
+        return VersionEvaluation(status=CheckStatus.UP_TO_DATE, latest=latest, suggestion=None, reason=None)
+    return VersionEvaluation(status=CheckStatus.UPGRADE_AVAILABLE, latest=latest, suggestion=None, reason=lag)
+
+
 def contains_exact_pin(req: Requirement) -> bool:
     """
     判断 requirement 是否包含精确 pin（== 或 ===）。
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from uv_lens.app import evaluate_item, prepare_cache_policy, requested_names
+from uv_lens.cache import CacheBackend
+from uv_lens.config import AppConfig
+from uv_lens.index_client import PackageLookupResult
+from uv_lens.lockfile import locked_dependency_items, merge_locked_items
+from uv_lens.models import DependencyItem, DependencyKind
+from uv_lens.names import normalize_project_name
+from uv_lens.parse_cache import load_dependency_items_cached
+from uv_lens.report import Report, ReportItem
+from uv_lens.resolver import resolve_latest_versions
+
+if TYPE_CHECKING:
+    import httpx
+    from packaging.version import Version
+
+# 依赖项的身份：来源、分组、原始字符串与锁定版本都相同才视为未变化。
+ItemKey = tuple[DependencyKind, str, str, "Version | None"]
+
+
+def item_key(item: DependencyItem) -> ItemKey:
+    """
+    依赖项在增量比较中的键。
+    """
+    return (item.kind, item.group, item.raw, item.locked)
+
+
+@dataclass(frozen=True, slots=True)
+class ItemsDiff:
+    """
+    两次读取之间依赖项的变化（修改一行视为移除旧项 + 新增新项）。
+    """
+
+    added: list[DependencyItem]
+    removed: list[DependencyItem]
+    unchanged: int
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def diff_items(old: list[DependencyItem], new: list[DependencyItem]) -> ItemsDiff:
+    """
+    按 item_key 比较两组依赖项（重复项按次数计）。
+    """
+    remaining = Counter(item_key(item) for item in old)
+    added: list[DependencyItem] = []
+    unchanged = 0
+    for item in new:
+        key = item_key(item)
+        if remaining[key] > 0:
+            remaining[key] -= 1
+            unchanged += 1
+        else:
+            added.append(item)
+
+    removed: list[DependencyItem] = []
+    for item in old:
+        key = item_key(item)
+        if remaining[key] > 0:
+            remaining[key] -= 1
+            removed.append(item)
+    return ItemsDiff(added=added, removed=removed, unchanged=unchanged)
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    """
+    文件的 (mtime_ns, size)；文件不存在时返回 None。
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class IncrementalChecker:
+    """
+    增量检查：保留上一次的依赖项、查询结果与评估结果，
+    文件变化后只查询新出现的包名、只评估新增或修改的依赖项，其余报告条目直接复用。
+
+    查询结果最多保留 config.memory_cache_ttl_s 秒（与内存缓存一致），到期后经正常的缓存路径重新解析，
+    最新版本有变化的包对应的依赖项重新评估；不再出现在文件中的包名随即丢弃。
+    """
+
+    def __init__(
+        self,
+        pyproject_path: Path,
+        *,
+        config: AppConfig,
+        cache: CacheBackend | None = None,
+        lock_path: Path | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        """
+        初始化检查器；cache / client 由调用方持有与关闭。
+        """
+        self._pyproject_path = pyproject_path
+        self._lock_path = lock_path
+        self._config = config
+        self._cache = cache
+        self._client = client
+        self._exclude = {normalize_project_name(n) for n in config.exclude}
+        self._items: list[DependencyItem] = []
+        self._evaluated: dict[ItemKey, ReportItem | None] = {}
+        self._lookups: dict[str, PackageLookupResult] = {}
+        self._resolved_at: dict[str, float] = {}
+        self._lock_signature: tuple[int, int] | None = None
+        self._lock_items: list[DependencyItem] = []
+        self.report: Report | None = None
+
+    def signatures(self) -> tuple[Any, ...]:
+        """
+        被监视文件的当前签名（pyproject.toml 与 uv.lock）。
+        """
+        lock_sig = file_signature(self._lock_path) if self._lock_path is not None else None
+        return (file_signature(self._pyproject_path), lock_sig)
+
+    def _expired(self, now: float) -> set[str]:
+        """
+        查询结果已超过保留时间的包名（memory_cache_ttl_s <= 0 时永不过期）。
+        """
+        ttl_s = self._config.memory_cache_ttl_s
+        if ttl_s <= 0:
+            return set()
+        return {name for name, resolved_at in self._resolved_at.items() if now - resolved_at >= ttl_s}
+
+    def refresh_due(self) -> bool:
+        """
+        是否有查询结果到期、需要在文件未变化时也重新检查。
+        """
+        return bool(self._expired(time.monotonic()))
+
+    def _load_items(self) -> list[DependencyItem]:
+        """
+        读取当前依赖项；uv.lock 未变化时复用上一次的锁定项。
+        """
+        _, items = load_dependency_items_cached(self._pyproject_path, store=self._cache)
+        if self._lock_path is None:
+            return items
+        signature = file_signature(self._lock_path)
+        if signature is None:
+            self._lock_items = []
+        elif signature != self._lock_signature:
+            self._lock_items = locked_dependency_items(self._lock_path)
+        self._lock_signature = signature
+        return merge_locked_items(items, self._lock_items)
+
+    async def check(
+        self,
+        *,
+        on_fetch_start: Callable[[int], Any] | None = None,
+        on_fetch_complete: Callable[[], Any] | None = None,
+    ) -> tuple[Report, ItemsDiff]:
+        """
+        重新读取文件并增量更新报告，返回 (报告, 依赖项变化)。
+        """
+        items = self._load_items()
+        diff = diff_items(self._items, items)
+
+        wanted = requested_names(items, self._exclude)
+        wanted_set = set(wanted)
+        for name in [n for n in self._lookups if n not in wanted_set]:
+            del self._lookups[name]
+            del self._resolved_at[name]
+        expired = self._expired(time.monotonic())
+        missing = [n for n in wanted if n not in self._lookups or n in expired]
+        cache_hits = fetched = adaptive_saved = 0
+        if missing:
+            policy = await prepare_cache_policy(self._config, self._cache)
+            lookups, stats = await resolve_latest_versions(
+                missing,
+                settings=self._config.index,
+                max_concurrency=self._config.max_concurrency,
+                cache=self._cache,
+                cache_ttl_s=self._config.cache_ttl_s,
+                refresh=self._config.refresh,
+                policy=policy,
+                on_fetch_start=on_fetch_start,
+                on_fetch_complete=on_fetch_complete,
+                client=self._client,
+            )
+            resolved_at = time.monotonic()
+            changed = {n for n, result in lookups.items() if self._lookups.get(n, result) != result}
+            self._lookups.update(lookups)
+            self._resolved_at.update(dict.fromkeys(lookups, resolved_at))
+            cache_hits, fetched, adaptive_saved = stats.cache_hits, stats.fetched, stats.adaptive_saved
+            if changed:
+                for item in items:
+                    if item.requirement is not None and normalize_project_name(item.requirement.name) in changed:
+                        self._evaluated.pop(item_key(item), None)
+
+        for item in items:
+            key = item_key(item)
+            if key not in self._evaluated:
+                self._evaluated[key] = evaluate_item(
+                    item, lookups=self._lookups, config=self._config, exclude=self._exclude
+                )
+        current = {item_key(item) for item in items}
+        for key in [k for k in self._evaluated if k not in current]:
+            del self._evaluated[key]
+
+        report_items = [r for r in (self._evaluated[item_key(item)] for item in items) if r is not None]
+        self._items = items
+        self.report = Report(
+            pyproject_path=str(self._pyproject_path),
+            items=report_items,
+            cache_hits=cache_hits,
+            fetched=fetched,
+            adaptive_saved=adaptive_saved,
+        )
+        return self.report, diff
+
+
+async def watch(
+    checker: IncrementalChecker,
+    on_report: Callable[[Report, ItemsDiff], Awaitable[None] | None],
+    *,
+    interval_s: float = 0.5,
+    stop: asyncio.Event | None = None,
+) -> None:
+    """
+    轮询被监视文件的签名：启动时检查一次，此后每次变化增量检查并回调 on_report，直到 stop 被设置。
+
+    文件未变化但查询结果到期时也会重新检查，报告内容有变化（如出现新版本）才回调。
+    """
+    stop = stop or asyncio.Event()
+    last: tuple[Any, ...] | None = None
+    while not stop.is_set():
+        signatures = checker.signatures()
+        files_changed = signatures != last
+        if (files_changed or checker.refresh_due()) and signatures[0] is not None:
+            last = signatures
+            previous = checker.report
+            try:
+                report, diff = await checker.check()
+            except (OSError, UnicodeDecodeError, ValueError):
+                # 编辑器保存到一半或语法暂时错误：等待下一次变化。
+                pass
+            else:
+                if files_changed or previous is None or report.items != previous.items:
+                    result = on_report(report, diff)
+                    if asyncio.iscoroutine(result):
+                        await result
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval_s)
+        except asyncio.TimeoutError:
+            pass
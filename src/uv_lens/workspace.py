@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from uv_lens.config import DEFAULT_WORKSPACE_SKIP_DIRS
+from uv_lens.models import DependencyItem
+from uv_lens.parse_cache import load_dependency_items_cached
+from uv_lens.pyproject import load_pyproject_data, tomllib
+
+# 目录扫描时总是跳过的目录：版本控制、虚拟环境与工具缓存目录。隐藏目录与带 pyvenv.cfg 的虚拟环境另行跳过；
+# vendor 等依赖副本目录由 skip_dirs 参数（配置 workspace_skip_dirs）决定，build、dist 这类名称常被真实项目使用，默认不跳过。
+SKIP_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".venv",
+        "venv",
+        ".tox",
+        ".nox",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        "site-packages",
+    }
+)
+
+# 交给子进程解析时每批的项目数量。
+_PARSE_CHUNK_SIZE = 16
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedProject:
+    """
+    单个项目的解析结果；读取或解析失败时 items 为空并记录 error。
+    """
+
+    path: Path
+    items: list[DependencyItem]
+    error: str | None = None
+
+
+def project_sort_key(path: Path) -> tuple[str, ...]:
+    """
+    项目的稳定排序键（父目录在前，子目录在后）。
+    """
+    return path.parent.parts
+
+
+def _workspace_table(pyproject_data: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    返回 [tool.uv.workspace] 表；不存在时返回 None。
+    """
+    tool = pyproject_data.get("tool")
+    uv = tool.get("uv") if isinstance(tool, dict) else None
+    workspace = uv.get("workspace") if isinstance(uv, dict) else None
+    return workspace if isinstance(workspace, dict) else None
+
+
+def _glob_dirs(root: Path, patterns: list[Any]) -> set[Path]:
+    """
+    按 glob 模式（相对 root）匹配目录。
+    """
+    matched: set[Path] = set()
+    for pattern in patterns:
+        if not isinstance(pattern, str) or not pattern.strip():
+            continue
+        matched.update(p.resolve() for p in root.glob(pattern.strip()) if p.is_dir())
+    return matched
+
+
+def workspace_members(root: Path) -> list[Path] | None:
+    """
+    按 root/pyproject.toml 中 [tool.uv.workspace] 的 members / exclude 返回成员项目的 pyproject.toml。
+
+    根目录本身带 [project] 时也作为一个项目；未声明 workspace 时返回 None。
+    """
+    root_pyproject = root / "pyproject.toml"
+    if not root_pyproject.is_file():
+        return None
+    data = load_pyproject_data(root_pyproject)
+    workspace = _workspace_table(data)
+    if workspace is None:
+        return None
+
+    members = _glob_dirs(root, list(workspace.get("members") or []))
+    members -= _glob_dirs(root, list(workspace.get("exclude") or []))
+
+    projects: list[Path] = []
+    if isinstance(data.get("project"), dict):
+        projects.append(root_pyproject)
+    for member in sorted(members):
+        candidate = member / "pyproject.toml"
+        if candidate.is_file() and candidate.resolve() != root_pyproject.resolve():
+            projects.append(candidate)
+    return projects
+
+
+def _skip_dir(name: str, skip_dirs: Iterable[str]) -> bool:
+    """
+    扫描时是否跳过该目录。
+    """
+    return name in SKIP_DIRS or name in skip_dirs or name.startswith(".")
+
+
+def iter_project_files(root: Path, *, skip_dirs: Iterable[str] = DEFAULT_WORKSPACE_SKIP_DIRS) -> Iterator[Path]:
+    """
+    递归遍历目录下的 pyproject.toml（跳过隐藏目录、SKIP_DIRS、skip_dirs 与任意命名的虚拟环境）。
+    """
+    skip = frozenset(skip_dirs)
+    for dirpath, dirnames, filenames in os.walk(root):
+        if "pyvenv.cfg" in filenames:
+            dirnames[:] = []
+            continue
+        dirnames[:] = sorted(d for d in dirnames if not _skip_dir(d, skip))
+        if "pyproject.toml" in filenames:
+            yield Path(dirpath) / "pyproject.toml"
+
+
+def scan_projects(root: Path, *, skip_dirs: Iterable[str] = DEFAULT_WORKSPACE_SKIP_DIRS) -> list[Path]:
+    """
+    递归扫描目录下的 pyproject.toml。
+    """
+    return sorted(iter_project_files(root, skip_dirs=skip_dirs), key=project_sort_key)
+
+
+def discover_workspace_projects(
+    root: Path,
+    *,
+    skip_dirs: Iterable[str] = DEFAULT_WORKSPACE_SKIP_DIRS,
+) -> list[Path]:
+    """
+    发现工作区内的项目：优先使用 [tool.uv.workspace] 声明，否则扫描目录。
+    """
+    members = workspace_members(root)
+    if members is not None:
+        return members
+    return scan_projects(root, skip_dirs=skip_dirs)
+
+
+def parse_project(path: Path) -> ParsedProject:
+    """
+    解析单个项目（内容未变时复用进程内的解析结果）；文件无法读取或不是合法 TOML 时返回带 error 的结果。
+    """
+    try:
+        _, items = load_dependency_items_cached(path)
+        return ParsedProject(path=path, items=items)
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError) as exc:
+        return ParsedProject(path=path, items=[], error=str(exc))
+
+
+def _parse_many(paths: list[Path]) -> list[ParsedProject]:
+    """
+    子进程任务：解析一批项目。
+    """
+    return [parse_project(p) for p in paths]
+
+
+def _scan_and_parse(directory: Path, skip_dirs: tuple[str, ...]) -> list[ParsedProject]:
+    """
+    子进程任务：扫描一个子目录并解析其中的全部项目。
+    """
+    return [parse_project(p) for p in iter_project_files(directory, skip_dirs=skip_dirs)]
+
+
+def _chunks(paths: list[Path], size: int) -> Iterator[list[Path]]:
+    """
+    按固定大小切分列表。
+    """
+    for start in range(0, len(paths), size):
+        yield paths[start : start + size]
+
+
+async def iter_workspace_projects(
+    root: Path,
+    *,
+    jobs: int = 1,
+    projects: list[Path] | None = None,
+    skip_dirs: Iterable[str] = DEFAULT_WORKSPACE_SKIP_DIRS,
+) -> AsyncIterator[list[ParsedProject]]:
+    """
+    发现并解析工作区内的项目，按批产出（顺序不保证，调用方自行排序）；目录扫描时额外跳过 skip_dirs 中的目录名。
+
+    jobs > 1 时使用进程池：目录扫描模式下每个顶层子目录由一个子进程完成遍历与解析，
+    已知项目列表时按批分发解析任务。jobs <= 1 时在当前进程内逐批解析。
+    """
+    if projects is None:
+        projects = workspace_members(root)
+
+    if jobs <= 1:
+        paths = projects if projects is not None else scan_projects(root, skip_dirs=skip_dirs)
+        for chunk in _chunks(paths, _PARSE_CHUNK_SIZE):
+            yield _parse_many(chunk)
+            await asyncio.sleep(0)
+        return
+
+    skip = tuple(skip_dirs)
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    futures: list[asyncio.Future[list[ParsedProject]]] = []
+    try:
+        if projects is not None:
+            for chunk in _chunks(projects, _PARSE_CHUNK_SIZE):
+                futures.append(loop.run_in_executor(pool, _parse_many, chunk))
+        else:
+            root_pyproject = root / "pyproject.toml"
+            if root_pyproject.is_file():
+                futures.append(loop.run_in_executor(pool, _parse_many, [root_pyproject]))
+            with os.scandir(root) as entries:
+                subdirs = sorted(
+                    e.path for e in entries if e.is_dir(follow_symlinks=False) and not _skip_dir(e.name, skip)
+                )
+            for subdir in subdirs:
+                futures.append(loop.run_in_executor(pool, _scan_and_parse, Path(subdir), skip))
+
+        for future in asyncio.as_completed(futures):
+            batch = await future
+            if batch:
+                yield batch
+    finally:
+        # 不在事件循环里等待子进程退出：正常结束时任务均已完成，提前停止迭代时丢弃尚未开始的任务。
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
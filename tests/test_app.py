@@ -5,10 +5,12 @@ from pathlib import Path
 import pytest
 from packaging.version import Version
 
-from uv_lens.app import check_pyproject
+from uv_lens.app import check_pyproject, evaluate_item, iter_check
 from uv_lens.config import AppConfig
 from uv_lens.index_client import IndexSettings, PackageLookupResult
-from uv_lens.models import CheckStatus
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.pyproject import parse_requirement
+from uv_lens.resolver import ResolveStats
 
 
 @pytest.mark.asyncio
@@ -45,7 +47,7 @@ requires = ["buildpkg>=0"]
 
     expected_query = ["buildpkg", "optpkg", "range", "unpinned", "validpkg"]
 
-    async def fake_resolve_latest_versions(
+    async def fake_iter_latest_versions(
         normalized_names: list[str],
         *,
         settings: IndexSettings,
@@ -53,6 +55,7 @@ requires = ["buildpkg>=0"]
         cache,
         cache_ttl_s: int,
         refresh: bool,
+        on_stats=None,
         **kwargs,
     ):
         """
@@ -101,10 +104,13 @@ requires = ["buildpkg>=0"]
                 error="timeout",
             ),
         }
-        stats = type("Stats", (), {"cache_hits": 0, "fetched": len(normalized_names)})
-        return results, stats
+        stats = ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names))
+        for name in normalized_names:
+            yield name, results[name]
+        if on_stats:
+            on_stats(stats)
 
-    monkeypatch.setattr("uv_lens.app.resolve_latest_versions", fake_resolve_latest_versions)
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
 
     cfg = AppConfig(
         index=IndexSettings(index_url="https://primary.test/pypi"),
@@ -135,3 +141,71 @@ requires = ["buildpkg>=0"]
     unpinned_item = next(i for i in report.items if i.name == "unpinned")
     assert unpinned_item.suggestion == "unpinned==3.0.0"
 
+
+@pytest.mark.asyncio
+async def test_iter_check_yields_items_as_lookups_complete(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    iter_check 应按查询完成顺序逐条产出；check_pyproject 收集后恢复文件中的顺序。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\ndependencies = ["slow>=1", "fast>=1"]\n', encoding="utf-8")
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        """
+        先产出 fast，再产出 slow。
+        """
+        for name in ("fast", "slow"):
+            yield name, PackageLookupResult(
+                normalized_name=name, index_url="https://pypi.test/pypi", latest=Version("2.0"), not_found=False, error=None
+            )
+        if on_stats:
+            on_stats(ResolveStats(total=2, cache_hits=1, fetched=1))
+
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+
+    streamed = [item.name async for item in iter_check(pyproject, config=cfg)]
+    assert streamed == ["fast", "slow"]
+
+    report = await check_pyproject(pyproject, config=cfg)
+    assert [item.name for item in report.items] == ["slow", "fast"]
+    assert (report.cache_hits, report.fetched) == (1, 1)
+
+
+def test_evaluate_item_marks_timed_out_lookups() -> None:
+    """
+    超时且没有旧缓存的包应标记为 timed_out；使用旧缓存的包照常评估并附带说明。
+    """
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+    lookups = {
+        "hung": PackageLookupResult(
+            normalized_name="hung", index_url=None, latest=None, not_found=False, error="deadline exceeded", timed_out=True
+        ),
+        "stale": PackageLookupResult(
+            normalized_name="stale",
+            index_url="https://pypi.test/pypi",
+            latest=Version("2.0"),
+            not_found=False,
+            error=None,
+            timed_out=True,
+        ),
+    }
+
+    hung = evaluate_item(
+        parse_requirement("hung>=1", kind=DependencyKind.PROJECT, group="project"),
+        lookups=lookups,
+        config=cfg,
+        exclude=set(),
+    )
+    stale = evaluate_item(
+        parse_requirement("stale>=1", kind=DependencyKind.PROJECT, group="project"),
+        lookups=lookups,
+        config=cfg,
+        exclude=set(),
+    )
+
+    assert hung is not None and hung.status == CheckStatus.TIMED_OUT
+    assert hung.error == "deadline exceeded"
+    assert stale is not None and stale.status == CheckStatus.UPGRADE_AVAILABLE
+    assert stale.latest == Version("2.0")
+    assert stale.error == "deadline exceeded; using stale cached result"
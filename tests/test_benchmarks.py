@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.suite import all_cases, compare, select_cases, time_case, updated_baseline  # noqa: E402
+
+
+def test_every_benchmark_case_runs_at_smallest_size() -> None:
+    """
+    每个基准用例都应能在最小规模下构造输入并完成计时（避免基准本身随代码演进失效）。
+    """
+    cases = select_cases(all_cases(), max_size=10)
+    assert {case.name for case in cases} == {case.name for case in all_cases()}
+    for case in cases:
+        assert time_case(case, repeat=1, min_time_s=0) > 0
+
+
+def test_compare_flags_regressions_beyond_threshold() -> None:
+    """
+    超过基线允许比例时标记为回退；命令行阈值覆盖基线中的阈值，没有基线的用例不参与判断。
+    """
+    baseline = {"cases": {"a[10]": {"seconds": 1.0, "threshold": 0.25}, "b[10]": {"seconds": 1.0, "threshold": 0.5}}}
+    timings = {"a[10]": 1.3, "b[10]": 1.3, "c[10]": 9.0}
+
+    assert [r.key for r in compare(timings, baseline) if r.regressed] == ["a[10]"]
+    assert [r.key for r in compare(timings, baseline, threshold=0.1) if r.regressed] == ["a[10]", "b[10]"]
+
+    updated = updated_baseline(timings, baseline)
+    assert updated["cases"]["b[10]"] == {"seconds": 1.3, "threshold": 0.5}
+    assert updated["cases"]["c[10]"]["threshold"] == pytest.approx(0.25)
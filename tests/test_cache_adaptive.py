@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CachePolicy, adaptive_ttl_s, index_scope_key
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.resolver import resolve_latest_versions
+
+DAY = 24 * 60 * 60
+
+
+def test_adaptive_ttl_follows_release_cadence() -> None:
+    """
+    发布频繁的包 TTL 较短，长期不发布的包 TTL 较长，且都限制在 min/max 之间。
+    """
+    now = 1000 * DAY
+    fast = tuple(now - i * DAY for i in range(10, 0, -1))
+    slow = (now - 900 * DAY, now - 600 * DAY, now - 300 * DAY)
+
+    fast_ttl = adaptive_ttl_s(fast, now=now, default_ttl_s=DAY, min_ttl_s=3600, max_ttl_s=7 * DAY)
+    slow_ttl = adaptive_ttl_s(slow, now=now, default_ttl_s=DAY, min_ttl_s=3600, max_ttl_s=7 * DAY)
+    assert fast_ttl == DAY // 4
+    assert slow_ttl == 7 * DAY
+    assert adaptive_ttl_s((), now=now, default_ttl_s=DAY, min_ttl_s=3600, max_ttl_s=7 * DAY) == DAY
+
+
+def test_cache_persists_release_times(tmp_path: Path) -> None:
+    """
+    发布时间历史应随缓存记录一起写入与读出。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        db.set(
+            scope=scope,
+            normalized_name="six",
+            latest=Version("1.16.0"),
+            resolved_index_url="https://pypi.org/pypi",
+            not_found=False,
+            error=None,
+            release_times=(100, 200, 300),
+        )
+        entry = db.get(scope=scope, normalized_name="six", ttl_s=0)
+        assert entry is not None
+        assert entry.release_times == (100, 200, 300)
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_resolver_adaptive_policy_counts_saved_fetches(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    自适应策略下，超过全局 TTL 但仍在自身 TTL 内的慢包不应重新查询，并计入 adaptive_saved。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+    now = 1000 * DAY
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        monkeypatch.setattr("uv_lens.cache.time.time", lambda: float(now - 2 * DAY))
+        for name, history in {
+            "six": (now - 900 * DAY, now - 600 * DAY),
+            "boto3": tuple(now - i * DAY for i in range(10, 0, -1)),
+        }.items():
+            db.set(
+                scope=scope,
+                normalized_name=name,
+                latest=Version("1.0"),
+                resolved_index_url=settings.index_url,
+                not_found=False,
+                error=None,
+                release_times=history,
+            )
+        monkeypatch.setattr("uv_lens.cache.time.time", lambda: float(now))
+        monkeypatch.setattr("uv_lens.resolver.time.time", lambda: float(now))
+
+        called: list[str] = []
+
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
+        ) -> PackageLookupResult:
+            """
+            记录需要重新查询的包。
+            """
+            called.append(normalized_name)
+            return PackageLookupResult(
+                normalized_name=normalized_name,
+                index_url=index_url,
+                latest=Version("2.0"),
+                not_found=False,
+                error=None,
+            )
+
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+        _, stats = await resolve_latest_versions(
+            ["boto3", "six"],
+            settings=settings,
+            max_concurrency=4,
+            cache=db,
+            cache_ttl_s=DAY,
+            refresh=False,
+            policy=CachePolicy(ttl_s=DAY, adaptive=True, min_ttl_s=3600, max_ttl_s=7 * DAY),
+        )
+        assert called == ["boto3"]
+        assert stats.cache_hits == 1
+        assert stats.adaptive_saved == 1
+    finally:
+        db.close()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, MemoryCache, index_scope_key
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.resolver import resolve_latest_versions
+
+
+def _set(cache: MemoryCache | CacheDB, scope: str, name: str, version: str) -> None:
+    """
+    写入一条成功查询的缓存记录。
+    """
+    cache.set(
+        scope=scope,
+        normalized_name=name,
+        latest=Version(version),
+        resolved_index_url="https://pypi.org/pypi",
+        not_found=False,
+        error=None,
+    )
+
+
+def test_memory_cache_write_through_and_counters(tmp_path: Path) -> None:
+    """
+    写入应同时落到 SQLite；再次读取命中内存并累计 hits/misses。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    cache = MemoryCache(CacheDB(tmp_path / "cache.sqlite3"))
+    try:
+        assert cache.get(scope=scope, normalized_name="httpx", ttl_s=3600) is None
+        _set(cache, scope, "httpx", "0.28.1")
+        entry = cache.get(scope=scope, normalized_name="httpx", ttl_s=3600)
+        assert entry is not None
+        assert entry.latest == Version("0.28.1")
+        assert cache.hits == 1
+        assert cache.misses == 1
+    finally:
+        cache.close()
+
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        persisted = db.get(scope=scope, normalized_name="httpx", ttl_s=0)
+        assert persisted is not None
+        assert persisted.latest == Version("0.28.1")
+    finally:
+        db.close()
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    """
+    超出容量时应淘汰最久未使用的条目。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    cache = MemoryCache(max_entries=2)
+    _set(cache, scope, "a", "1.0")
+    _set(cache, scope, "b", "1.0")
+    assert cache.get(scope=scope, normalized_name="a", ttl_s=0) is not None
+    _set(cache, scope, "c", "1.0")
+    assert cache.get(scope=scope, normalized_name="b", ttl_s=0) is None
+    assert cache.get(scope=scope, normalized_name="a", ttl_s=0) is not None
+    assert cache.get(scope=scope, normalized_name="c", ttl_s=0) is not None
+
+
+def test_memory_cache_respects_own_ttl(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    内存条目超过自身 TTL 后应回源到 SQLite 重新读取。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    cache = MemoryCache(db, ttl_s=10)
+    try:
+        monkeypatch.setattr("uv_lens.cache.time.monotonic", lambda: 100.0)
+        _set(cache, scope, "demo", "1.0")
+        _set(db, scope, "demo", "2.0")
+        assert cache.get(scope=scope, normalized_name="demo", ttl_s=0).latest == Version("1.0")
+
+        monkeypatch.setattr("uv_lens.cache.time.monotonic", lambda: 200.0)
+        assert cache.get(scope=scope, normalized_name="demo", ttl_s=0).latest == Version("2.0")
+    finally:
+        cache.close()
+
+
+@pytest.mark.asyncio
+async def test_repeated_resolve_is_served_from_memory(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    同一进程内重复解析相同包时，第二次应全部命中内存缓存，不再发起查询。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    called: list[str] = []
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        记录真实查询次数。
+        """
+        called.append(normalized_name)
+        return PackageLookupResult(
+            normalized_name=normalized_name,
+            index_url=index_url,
+            latest=Version("1.0.0"),
+            not_found=False,
+            error=None,
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    cache = MemoryCache()
+
+    for _ in range(2):
+        results, stats = await resolve_latest_versions(
+            ["pkg1", "pkg2"],
+            settings=settings,
+            max_concurrency=4,
+            cache=cache,
+            cache_ttl_s=3600,
+            refresh=False,
+        )
+        assert results["pkg1"].latest == Version("1.0.0")
+
+    assert sorted(called) == ["pkg1", "pkg2"]
+    assert stats.cache_hits == 2
+    assert stats.fetched == 0
+    assert cache.hits == 2
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import _SCHEMA_VERSION, CacheDB, index_scope_key
+
+SCOPE = index_scope_key("https://pypi.org/pypi", ())
+
+# 各历史版本发布时的 package_cache 表结构（只追加，不修改）。
+_HISTORICAL_SCHEMAS = {
+    1: """
+        CREATE TABLE package_cache (
+            scope TEXT NOT NULL,
+            name TEXT NOT NULL,
+            latest TEXT,
+            resolved_index_url TEXT,
+            not_found INTEGER NOT NULL,
+            error TEXT,
+            fetched_at INTEGER NOT NULL,
+            PRIMARY KEY (scope, name)
+        )
+    """,
+    2: """
+        CREATE TABLE package_cache (
+            scope TEXT NOT NULL,
+            name TEXT NOT NULL,
+            latest TEXT,
+            resolved_index_url TEXT,
+            not_found INTEGER NOT NULL,
+            error TEXT,
+            fetched_at INTEGER NOT NULL,
+            release_times TEXT,
+            PRIMARY KEY (scope, name)
+        )
+    """,
+    3: """
+        CREATE TABLE package_cache (
+            scope TEXT NOT NULL,
+            name TEXT NOT NULL,
+            latest TEXT,
+            resolved_index_url TEXT,
+            not_found INTEGER NOT NULL,
+            error TEXT,
+            fetched_at INTEGER NOT NULL,
+            release_times TEXT,
+            stale INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, name)
+        )
+    """,
+    4: """
+        CREATE TABLE package_cache (
+            scope TEXT NOT NULL,
+            name TEXT NOT NULL,
+            latest TEXT,
+            resolved_index_url TEXT,
+            not_found INTEGER NOT NULL,
+            error TEXT,
+            fetched_at INTEGER NOT NULL,
+            release_times TEXT,
+            stale INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, name)
+        )
+    """,
+}
+
+
+def _make_historical_db(path: Path, version: int) -> None:
+    """
+    按历史 schema 创建数据库，并写入一条 httpx 的缓存记录。
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("INSERT INTO meta(key, value) VALUES('schema_version', ?)", (str(version),))
+        conn.execute(_HISTORICAL_SCHEMAS.get(version, _HISTORICAL_SCHEMAS[1]))
+        conn.execute(
+            """
+            INSERT INTO package_cache(scope, name, latest, resolved_index_url, not_found, error, fetched_at)
+            VALUES(?, 'httpx', '0.28.1', 'https://pypi.org/pypi', 0, NULL, 1000)
+            """,
+            (SCOPE,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture(params=sorted(_HISTORICAL_SCHEMAS))
+def historical_db(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    """
+    每个历史 schema 版本各生成一份数据库。
+    """
+    path = tmp_path / f"cache-v{request.param}.sqlite3"
+    _make_historical_db(path, request.param)
+    return path
+
+
+def test_upgrade_keeps_cached_rows(historical_db: Path) -> None:
+    """
+    从任意历史版本升级后，原有缓存记录应保留，新列按默认值回填。
+    """
+    db = CacheDB(historical_db)
+    try:
+        entry = db.get(scope=SCOPE, normalized_name="httpx", ttl_s=0)
+        assert entry is not None
+        assert entry.latest == Version("0.28.1")
+        assert entry.fetched_at == 1000
+        assert entry.release_times == ()
+        assert db.get_meta("schema_version") == str(_SCHEMA_VERSION)
+    finally:
+        db.close()
+
+
+def test_upgraded_db_accepts_new_writes(historical_db: Path) -> None:
+    """
+    升级后的数据库应能正常写入新列并支持失效标记。
+    """
+    db = CacheDB(historical_db)
+    try:
+        db.set(
+            scope=SCOPE,
+            normalized_name="rich",
+            latest=Version("14.0.0"),
+            resolved_index_url="https://pypi.org/pypi",
+            not_found=False,
+            error=None,
+            release_times=(1, 2),
+        )
+        db.invalidate(["httpx"])
+        assert db.get(scope=SCOPE, normalized_name="httpx", ttl_s=0) is None
+        entry = db.get(scope=SCOPE, normalized_name="rich", ttl_s=0)
+        assert entry is not None
+        assert entry.release_times == (1, 2)
+    finally:
+        db.close()
+
+
+def test_reopening_current_schema_is_a_no_op(tmp_path: Path) -> None:
+    """
+    已是最新版本的数据库重复打开不应改动数据。
+    """
+    path = tmp_path / "cache.sqlite3"
+    db = CacheDB(path)
+    db.set(
+        scope=SCOPE,
+        normalized_name="httpx",
+        latest=Version("0.28.1"),
+        resolved_index_url="https://pypi.org/pypi",
+        not_found=False,
+        error=None,
+    )
+    db.close()
+
+    db = CacheDB(path)
+    try:
+        assert db.get(scope=SCOPE, normalized_name="httpx", ttl_s=0) is not None
+    finally:
+        db.close()
+
+
+def test_unknown_future_schema_is_rebuilt(tmp_path: Path) -> None:
+    """
+    由更新版本写入的未知 schema 无法安全解读，应重建为当前结构。
+    """
+    path = tmp_path / "cache.sqlite3"
+    _make_historical_db(path, _SCHEMA_VERSION + 1)
+    db = CacheDB(path)
+    try:
+        assert db.get(scope=SCOPE, normalized_name="httpx", ttl_s=0) is None
+        assert db.get_meta("schema_version") == str(_SCHEMA_VERSION)
+    finally:
+        db.close()
+
+
+def test_chain_scoped_rows_are_split_per_index(tmp_path: Path) -> None:
+    """
+    v5 起缓存按单个索引记录：旧的链式记录中，成功结果归属命中的索引，未找到结果归属链上每个索引，错误结果丢弃。
+    """
+    pypi = "https://pypi.org/pypi"
+    private = "https://private.test/pypi"
+    chain = index_scope_key(pypi, (private,))
+    path = tmp_path / "cache.sqlite3"
+    _make_historical_db(path, 4)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executemany(
+            """
+            INSERT INTO package_cache(scope, name, latest, resolved_index_url, not_found, error, fetched_at)
+            VALUES(?, ?, ?, ?, ?, ?, 2000)
+            """,
+            [
+                (chain, "internal", "1.0", private, 0, None),
+                (chain, "ghost", None, None, 1, None),
+                (chain, "flaky", None, None, 0, "http 503"),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    db = CacheDB(path)
+    try:
+        internal = db.get(scope=index_scope_key(private), normalized_name="internal", ttl_s=0)
+        assert internal is not None and internal.latest == Version("1.0")
+        assert db.get(scope=index_scope_key(pypi), normalized_name="internal", ttl_s=0) is None
+        for scope in (index_scope_key(pypi), index_scope_key(private)):
+            ghost = db.get(scope=scope, normalized_name="ghost", ttl_s=0)
+            assert ghost is not None and ghost.not_found
+            assert db.get(scope=scope, normalized_name="flaky", ttl_s=0) is None
+        assert db.get(scope=chain, normalized_name="internal", ttl_s=0) is None
+        httpx_entry = db.get(scope=SCOPE, normalized_name="httpx", ttl_s=0)
+        assert httpx_entry is not None and httpx_entry.latest == Version("0.28.1")
+    finally:
+        db.close()
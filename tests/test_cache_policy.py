@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CacheEntry, CachePolicy, index_scope_key
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.resolver import resolve_latest_versions
+
+
+def _entry(*, not_found: bool = False, error: str | None = None, error_count: int = 0) -> CacheEntry:
+    """
+    构造一条 fetched_at=0 的缓存记录。
+    """
+    return CacheEntry(
+        latest=None if (not_found or error) else Version("1.0"),
+        resolved_index_url=None,
+        not_found=not_found,
+        error=error,
+        fetched_at=0,
+        error_count=error_count,
+    )
+
+
+def test_policy_uses_separate_ttls_per_outcome() -> None:
+    """
+    成功、未找到与出错记录使用各自的 TTL，且负缓存不超过成功记录的 TTL。
+    """
+    policy = CachePolicy(ttl_s=86400, not_found_ttl_s=6 * 3600, error_ttl_s=300, error_max_ttl_s=3600)
+    assert policy.ttl_for(_entry(), now=0) == 86400
+    assert policy.ttl_for(_entry(not_found=True), now=0) == 6 * 3600
+    assert policy.ttl_for(_entry(error="boom", error_count=1), now=0) == 300
+
+    short = CachePolicy(ttl_s=600, not_found_ttl_s=6 * 3600, error_ttl_s=300, error_max_ttl_s=3600)
+    assert short.ttl_for(_entry(not_found=True), now=0) == 600
+    assert short.ttl_for(_entry(error="boom", error_count=5), now=0) == 600
+
+
+def test_error_ttl_backs_off_exponentially_up_to_cap() -> None:
+    """
+    连续失败次数越多，出错记录的 TTL 越长，但不超过 error_max_ttl_s。
+    """
+    policy = CachePolicy(ttl_s=86400, error_ttl_s=300, error_max_ttl_s=3600)
+    ttls = [policy.ttl_for(_entry(error="boom", error_count=n), now=0) for n in (1, 2, 3, 4, 5, 100)]
+    assert ttls == [300, 600, 1200, 2400, 3600, 3600]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("refresh", [False, True])
+async def test_resolver_increments_error_count_on_repeated_failures(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, refresh: bool
+) -> None:
+    """
+    连续查询失败时累加 error_count（--refresh 时同样累加）；查询成功后清零。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+    outcomes = ["boom", "boom", None]
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        按顺序返回失败、失败、成功。
+        """
+        error = outcomes.pop(0)
+        return PackageLookupResult(
+            normalized_name=normalized_name,
+            index_url=None if error else index_url,
+            latest=None if error else Version("1.0"),
+            not_found=False,
+            error=error,
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        counts: list[int] = []
+        for _ in range(3):
+            await resolve_latest_versions(
+                ["demo"],
+                settings=settings,
+                max_concurrency=1,
+                cache=db,
+                cache_ttl_s=3600,
+                refresh=refresh,
+                policy=CachePolicy(ttl_s=3600, error_ttl_s=1, error_max_ttl_s=1),
+            )
+            entry = db.get(scope=scope, normalized_name="demo", ttl_s=0)
+            assert entry is not None
+            counts.append(entry.error_count)
+            monkeypatch.setattr("uv_lens.resolver.time.time", lambda: float(entry.fetched_at + 10))
+        assert counts == [1, 2, 0]
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_resolver_skips_caching_errors_when_disabled(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    cache_errors=False 时出错结果不写入缓存，未找到结果仍然缓存。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        broken 查询出错，missing 不存在。
+        """
+        failed = normalized_name == "broken"
+        return PackageLookupResult(
+            normalized_name=normalized_name,
+            index_url=None,
+            latest=None,
+            not_found=not failed,
+            error="boom" if failed else None,
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        await resolve_latest_versions(
+            ["broken", "missing"],
+            settings=settings,
+            max_concurrency=2,
+            cache=db,
+            cache_ttl_s=3600,
+            refresh=False,
+            policy=CachePolicy(ttl_s=3600, cache_errors=False),
+        )
+        assert db.get(scope=scope, normalized_name="broken", ttl_s=0) is None
+        missing = db.get(scope=scope, normalized_name="missing", ttl_s=0)
+        assert missing is not None and missing.not_found
+    finally:
+        db.close()
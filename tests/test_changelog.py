@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import xmlrpc.client
+from pathlib import Path
+
+import httpx
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CacheEntry, CachePolicy, index_scope_key
+from uv_lens.changelog import sync_changelog
+
+FEED_URL = "https://pypi.test/pypi"
+
+
+class _LocalFeed:
+    """
+    本地替身变更源：按 PyPI XML-RPC 协议响应 changelog_last_serial / changelog_since_serial。
+    """
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str, int, str, int]] = []
+        self.calls: list[tuple[str, tuple]] = []
+
+    @property
+    def last_serial(self) -> int:
+        return max((e[4] for e in self.events), default=100)
+
+    def publish(self, name: str, version: str) -> None:
+        """
+        追加一条发布事件。
+        """
+        self.events.append((name, version, 0, "new release", self.last_serial + 1))
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        params, method = xmlrpc.client.loads(request.content)
+        self.calls.append((method, params))
+        if method == "changelog_last_serial":
+            result: object = self.last_serial
+        elif method == "changelog_since_serial":
+            result = [list(e) for e in self.events if e[4] > params[0]]
+        else:
+            return httpx.Response(500)
+        body = xmlrpc.client.dumps((result,), methodresponse=True)
+        return httpx.Response(200, content=body.encode("utf-8"), headers={"Content-Type": "text/xml"})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def _seed(db: CacheDB, scope: str, name: str) -> None:
+    """
+    写入一条来自变更源所覆盖索引的成功记录。
+    """
+    db.set(
+        scope=scope,
+        normalized_name=name,
+        latest=Version("1.0"),
+        resolved_index_url=FEED_URL,
+        not_found=False,
+        error=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_changelog_records_baseline_then_invalidates_only_touched(tmp_path: Path) -> None:
+    """
+    首次同步只记录基线；之后一次请求拉取增量，仅把有变动的包标记为过期。
+    """
+    feed = _LocalFeed()
+    scope = index_scope_key(FEED_URL, ())
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        async with feed.client() as client:
+            since = await sync_changelog(db, feed_url=FEED_URL, client=client)
+            assert since is not None
+            assert [c[0] for c in feed.calls] == ["changelog_last_serial"]
+
+            _seed(db, scope, "requests")
+            _seed(db, scope, "six")
+            feed.publish("Requests", "2.32.3")
+
+            assert await sync_changelog(db, feed_url=FEED_URL, client=client) == since
+            assert feed.calls[-1] == ("changelog_since_serial", (100,))
+
+        assert db.get(scope=scope, normalized_name="requests", ttl_s=0) is None
+        assert db.get(scope=scope, normalized_name="six", ttl_s=0) is not None
+        assert db.get_meta(f"changelog_serial:{FEED_URL}") == "101"
+
+        _seed(db, scope, "requests")
+        assert db.get(scope=scope, normalized_name="requests", ttl_s=0) is not None
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_sync_changelog_returns_none_when_feed_unavailable(tmp_path: Path) -> None:
+    """
+    变更源不可用时返回 None，调用方回退到 TTL。
+    """
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        transport = httpx.MockTransport(lambda _req: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            assert await sync_changelog(db, feed_url=FEED_URL, client=client) is None
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_prepare_cache_policy_gives_up_sync_at_deadline(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    变更源同步受检查截止时间约束：超时后放弃同步，回退到 TTL 策略。
+    """
+    import asyncio
+    import time
+
+    from uv_lens.app import prepare_cache_policy
+    from uv_lens.config import AppConfig
+    from uv_lens.index_client import IndexSettings
+
+    async def hanging_sync(*args, **kwargs) -> int:
+        await asyncio.sleep(10)
+        return 1
+
+    monkeypatch.setattr("uv_lens.changelog.sync_changelog", hanging_sync)
+    cfg = AppConfig(index=IndexSettings(index_url=FEED_URL), invalidation="changelog", changelog_url=FEED_URL)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        started = time.monotonic()
+        policy = await prepare_cache_policy(cfg, db, deadline=time.monotonic() + 0.05)
+        assert time.monotonic() - started < 2
+        assert policy.changelog_since is None
+    finally:
+        db.close()
+
+
+def test_changelog_policy_keeps_old_entries_from_covered_index() -> None:
+    """
+    基线之后写入、来自变更源索引的成功条目不按 TTL 过期；其他索引与错误条目仍按 TTL。
+    """
+    policy = CachePolicy(ttl_s=3600, invalidation="changelog", changelog_index_url=FEED_URL + "/", changelog_since=1000)
+    covered = CacheEntry(latest=Version("1.0"), resolved_index_url=FEED_URL, not_found=False, error=None, fetched_at=2000)
+    private = CacheEntry(
+        latest=Version("1.0"), resolved_index_url="https://private.test/pypi", not_found=False, error=None, fetched_at=2000
+    )
+    before_baseline = CacheEntry(
+        latest=Version("1.0"), resolved_index_url=FEED_URL, not_found=False, error=None, fetched_at=500
+    )
+    assert policy.lookup_ttl_s() == 0
+    assert policy.ttl_for(covered, now=10**9) == 0
+    assert policy.ttl_for(private, now=10**9) == 3600
+    assert policy.ttl_for(before_baseline, now=10**9) == 3600
@@ -132,19 +132,24 @@ def test_cli_check_table_writes_to_file(monkeypatch: pytest.MonkeyPatch, tmp_pat
     assert out_path.read_text(encoding="utf-8") == "TABLE\n"
 
 
-@pytest.mark.parametrize("fmt,renderer_attr", [("json", "render_json"), ("md", "render_markdown")])
+@pytest.mark.parametrize(
+    "fmt,renderer_attr",
+    [("json", "write_json"), ("md", "write_markdown"), ("ndjson", "write_ndjson")],
+)
 def test_cli_check_json_and_md_write_text(
     fmt: str, renderer_attr: str, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ) -> None:
     """
-    check 的 json/md 输出应走对应渲染函数，并可写入文件。
+    check 的 json/md/ndjson 输出应走对应的流式写出函数，并可写入文件。
     """
     report = _make_report()
     monkeypatch.setattr("uv_lens.cli.load_config", lambda _: _make_base_config())
     monkeypatch.setattr("uv_lens.app.run_check", lambda *_args, **_kwargs: report)
 
     sentinel = f"{fmt.upper()}-TEXT\n"
-    monkeypatch.setattr(f"uv_lens.formatters.{renderer_attr}", lambda _r: sentinel)
+    monkeypatch.setattr(f"uv_lens.formatters.{renderer_attr}", lambda _r, f: f.write(sentinel))
+    monkeypatch.setattr("uv_lens.app.run_check_streaming", lambda *_a, on_item, **_k: [on_item(i) for i in report.items])
+    monkeypatch.setattr("uv_lens.formatters.ndjson_line", lambda _item: sentinel)
 
     out_path = tmp_path / "out.txt"
     rc = main(["--pyproject", str(tmp_path / "p.toml"), "check", "--format", fmt, "--output", str(out_path)])
@@ -177,7 +182,7 @@ def test_cli_export_uv_uses_exact_pin_when_config_none(monkeypatch: pytest.Monke
     base_cfg = _make_base_config(pin="none")
     observed: dict[str, str] = {}
 
-    def fake_run_check(_path: Path, *, config: AppConfig) -> Report:
+    def fake_run_check(_path: Path, *, config: AppConfig, lock_path: Path | None = None) -> Report:
         """
         捕获 export-uv 对 pin 的覆盖结果。
         """
@@ -4,7 +4,7 @@ from pathlib import Path
 
 import pytest
 
-from uv_lens.config import load_config
+from uv_lens.config import DEFAULT_WORKSPACE_SKIP_DIRS, load_config
 
 
 def test_load_config_finds_default_toml_in_cwd(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
@@ -126,3 +126,13 @@ pin = "bad"
     cfg = load_config(None)
     assert cfg.pin == "none"
 
+
+def test_load_config_workspace_skip_dirs(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    workspace_skip_dirs 未配置时使用默认列表，配置为空列表时不额外跳过任何目录。
+    """
+    monkeypatch.chdir(tmp_path)
+    assert load_config(None).workspace_skip_dirs == DEFAULT_WORKSPACE_SKIP_DIRS
+
+    (tmp_path / ".uv-lens.toml").write_text("[uv_lens]\nworkspace_skip_dirs = []\n", encoding="utf-8")
+    assert load_config(None).workspace_skip_dirs == ()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import stat
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cli import main
+from uv_lens.config import AppConfig
+from uv_lens.daemon import (
+    DAEMON_PROTOCOL,
+    LensDaemon,
+    check_via_daemon,
+    config_from_json,
+    config_to_json,
+    ping_daemon,
+    report_from_wire,
+    report_to_wire,
+    request_daemon,
+    stop_daemon,
+)
+from uv_lens.index_client import IndexAuth, IndexSettings, PackageLookupResult
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.report import Report, ReportItem
+from uv_lens.resolver import ResolveStats
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要 Unix socket")
+
+
+def _config() -> AppConfig:
+    """
+    构造不使用缓存的测试配置。
+    """
+    return AppConfig(
+        index=IndexSettings(
+            index_url="https://pypi.test/pypi",
+            extra_index_urls=("https://extra.test/pypi",),
+            auth=IndexAuth(bearer_token="t"),
+        ),
+        use_cache=False,
+        exclude=("skipme",),
+    )
+
+
+def test_config_round_trip() -> None:
+    """
+    配置经 JSON 编码后应能完整还原（含嵌套的索引与认证配置）。
+    """
+    cfg = _config()
+    assert config_from_json(config_to_json(cfg)) == cfg
+
+
+def test_report_wire_round_trip() -> None:
+    """
+    报告经传输格式编码后应能完整还原（枚举与版本号）。
+    """
+    report = Report(
+        pyproject_path="pyproject.toml",
+        items=[
+            ReportItem(
+                kind=DependencyKind.LOCKED,
+                group="direct",
+                name="requests",
+                raw="requests==2.31.0",
+                latest=Version("2.32.3"),
+                status=CheckStatus.UPGRADE_AVAILABLE,
+                suggestion=None,
+                index_url="https://pypi.test/pypi",
+                error=None,
+                locked=Version("2.31.0"),
+                lag="minor",
+            )
+        ],
+        cache_hits=1,
+        fetched=0,
+    )
+    assert report_from_wire(report_to_wire(report)) == report
+
+
+def test_request_daemon_returns_none_when_not_running(tmp_path: Path) -> None:
+    """
+    socket 不存在时应视为守护进程未运行。
+    """
+    assert request_daemon({"command": "ping"}, socket_path=tmp_path / "missing.sock") is None
+    assert check_via_daemon(tmp_path / "pyproject.toml", config=_config(), socket_path=tmp_path / "missing.sock") is None
+
+
+@pytest.mark.asyncio
+async def test_daemon_serves_checks_and_reuses_client(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    守护进程应按请求中的配置执行检查，多次请求复用同一个 HTTP 客户端，shutdown 后删除 socket。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["httpx>=0.27"]\n', encoding="utf-8")
+    clients: list[object] = []
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        """
+        记录传入的客户端并返回固定版本。
+        """
+        clients.append(kwargs["client"])
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n,
+                index_url="https://pypi.test/pypi",
+                latest=Version("0.28.0"),
+                not_found=False,
+                error=None,
+            )
+            for n in normalized_names
+        }
+        for name in normalized_names:
+            yield name, results[name]
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names)))
+
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+
+    socket_path = tmp_path / "d.sock"
+    daemon = LensDaemon(idle_timeout_s=60)
+    server = asyncio.create_task(daemon.serve(socket_path))
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        await asyncio.sleep(0.01)
+
+    assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+    status = await asyncio.to_thread(ping_daemon, socket_path)
+    assert status is not None and status["requests"] == 0
+
+    for _ in range(2):
+        report = await asyncio.to_thread(check_via_daemon, pyproject, config=_config(), socket_path=socket_path)
+        assert report is not None
+        assert report.items[0].name == "httpx"
+        assert report.items[0].status == CheckStatus.UPGRADE_AVAILABLE
+
+    assert len(clients) == 2 and clients[0] is clients[1]
+    assert daemon.requests == 2
+
+    assert await asyncio.to_thread(stop_daemon, socket_path) is True
+    await asyncio.wait_for(server, timeout=5)
+    assert not socket_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_daemon_exits_after_idle_timeout(tmp_path: Path) -> None:
+    """
+    没有请求时，守护进程应在空闲超时后自行退出。
+    """
+    socket_path = tmp_path / "d.sock"
+    await asyncio.wait_for(LensDaemon(idle_timeout_s=0.1).serve(socket_path), timeout=5)
+    assert not socket_path.exists()
+
+
+def test_cli_check_forwards_to_daemon_unless_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    check 应优先使用守护进程的结果；--no-daemon 时直接在进程内检查。
+    """
+    report = Report(pyproject_path="pyproject.toml", items=[], cache_hits=0, fetched=0)
+    calls: list[str] = []
+
+    def fake_check_via_daemon(*_args, **_kwargs):
+        calls.append("daemon")
+        return report
+
+    def fake_run_check(*_args, **_kwargs):
+        calls.append("local")
+        return report
+
+    monkeypatch.delenv("UV_LENS_NO_DAEMON", raising=False)
+    monkeypatch.setattr("uv_lens.cli.load_config", lambda _: _config())
+    monkeypatch.setattr("uv_lens.daemon.check_via_daemon", fake_check_via_daemon)
+    monkeypatch.setattr("uv_lens.app.run_check", fake_run_check)
+
+    assert main(["check", "--format", "json"]) == 0
+    assert main(["--no-daemon", "check", "--format", "json"]) == 0
+    assert calls == ["daemon", "local"]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        {"ok": False, "error": "unsupported daemon protocol"},
+        {"ok": False, "error": "AppConfig.__init__() got an unexpected keyword argument 'deadline_s'"},
+        {"ok": True, "report": {"items": []}},
+    ],
+)
+def test_check_via_daemon_falls_back_on_incompatible_daemon(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str], tmp_path: Path, response: dict
+) -> None:
+    """
+    旧版本或出错的守护进程不应导致检查失败：返回 None 让调用方在进程内检查，并提示原因。
+    """
+    monkeypatch.setattr("uv_lens.daemon.request_daemon", lambda *_args, **_kwargs: response)
+    assert check_via_daemon(tmp_path / "pyproject.toml", config=_config()) is None
+    assert "改为在当前进程内检查" in capsys.readouterr().err
+
+
+@pytest.mark.asyncio
+async def test_daemon_rejects_requests_from_other_protocol(tmp_path: Path) -> None:
+    """
+    协议标识包含各结构的字段摘要；标识不一致的请求被拒绝。
+    """
+    daemon = LensDaemon(idle_timeout_s=60)
+    socket_path = tmp_path / "d.sock"
+    server = asyncio.create_task(daemon.serve(socket_path))
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        await asyncio.sleep(0.01)
+
+    reader, writer = await asyncio.open_unix_connection(str(socket_path))
+    writer.write(b'{"command": "ping", "protocol": 1}\n')
+    await writer.drain()
+    assert b"unsupported daemon protocol" in await reader.readline()
+    writer.close()
+
+    assert DAEMON_PROTOCOL.startswith("2:")
+    assert await asyncio.to_thread(stop_daemon, socket_path) is True
+    await asyncio.wait_for(server, timeout=5)
+
+
+def test_check_via_daemon_sends_absolute_paths(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    离线索引与缓存库的相对路径应在客户端按当前目录解析，守护进程的工作目录不影响结果。
+    """
+    payloads: list[dict] = []
+
+    def fake_request_daemon(payload: dict, **_kwargs):
+        payloads.append(payload)
+        return None
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", "rel-cache")
+    monkeypatch.setattr("uv_lens.daemon.request_daemon", fake_request_daemon)
+    config = replace(_config(), index=replace(_config().index, offline_index="index.bin"))
+
+    assert check_via_daemon(Path("pyproject.toml"), config=config) is None
+    payload = payloads[0]
+    assert payload["config"]["index"]["offline_index"] == str(tmp_path.resolve() / "index.bin")
+    assert Path(payload["cache_path"]).is_absolute()
+    assert Path(payload["pyproject"]) == tmp_path.resolve() / "pyproject.toml"
+
+
+def test_check_via_daemon_falls_back_when_daemon_hangs(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str], tmp_path: Path
+) -> None:
+    """
+    守护进程接受连接却迟迟不响应时，应在超时后返回 None 回退到进程内检查。
+    """
+    socket_path = tmp_path / "hang.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(1)
+    monkeypatch.setattr("uv_lens.daemon._CHECK_TIMEOUT_S", 0.2)
+    try:
+        assert check_via_daemon(tmp_path / "pyproject.toml", config=_config(), socket_path=socket_path) is None
+    finally:
+        server.close()
+    assert "未响应" in capsys.readouterr().err
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import io
+import json
+from dataclasses import asdict
+
 from packaging.version import Version
 
-from uv_lens.formatters import render_markdown, report_to_json_obj
+from uv_lens.formatters import (
+    render_json,
+    render_markdown,
+    report_to_json_obj,
+    write_json,
+    write_markdown,
+    write_ndjson,
+)
 from uv_lens.models import CheckStatus, DependencyKind
 from uv_lens.report import Report, ReportItem
 
@@ -53,3 +64,45 @@ def test_render_markdown_contains_stats_and_table_row() -> None:
     assert "| 分组 | 包 | 当前 | 最新 | 状态 | 建议 | 错误 |" in md
     assert "| project:project | foo | foo | 1.2.3 | unpinned | foo==1.2.3 | - |" in md
 
+
+def test_report_to_json_obj_matches_asdict_layout() -> None:
+    """
+    直接构造的 JSON 对象应与 asdict 的字段与取值保持一致（输出格式不变；解析后的 requirement 不输出）。
+    """
+    report = _make_report()
+    expected = asdict(report)
+    for item in expected["items"]:
+        del item["requirement"]
+        item["latest"] = str(item["latest"])
+        item["kind"] = str(item["kind"])
+        item["status"] = str(item["status"])
+    assert report_to_json_obj(report) == expected
+
+
+def test_write_json_and_markdown_match_render() -> None:
+    """
+    流式写出的内容应与一次性渲染的结果一致。
+    """
+    report = _make_report()
+    buf = io.StringIO()
+    write_json(report, buf)
+    assert json.loads(buf.getvalue()) == json.loads(render_json(report))
+
+    buf = io.StringIO()
+    write_markdown(report, buf)
+    assert buf.getvalue() == render_markdown(report)
+
+
+def test_write_ndjson_writes_one_compact_line_per_item() -> None:
+    """
+    NDJSON 每条结果一行，可附带所属项目路径。
+    """
+    report = _make_report()
+    buf = io.StringIO()
+    count = write_ndjson(report.items * 3, buf, pyproject_path="a/pyproject.toml")
+    lines = buf.getvalue().splitlines()
+    assert count == 3 and len(lines) == 3
+    row = json.loads(lines[0])
+    assert row["name"] == "foo"
+    assert row["latest"] == "1.2.3"
+    assert row["pyproject_path"] == "a/pyproject.toml"
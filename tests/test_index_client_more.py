@@ -127,3 +127,23 @@ async def test_request_json_retries_on_timeout(monkeypatch: pytest.MonkeyPatch)
     assert data is not None
     assert data["info"]["version"] == "1.2.3"
 
+
+def test_release_times_from_pypi_json_uses_earliest_upload_per_stable_release() -> None:
+    """
+    每个稳定版本取最早的文件上传时间，预发布与无文件的版本应被忽略。
+    """
+    from uv_lens.index_client import release_times_from_pypi_json
+
+    data = {
+        "releases": {
+            "1.0.0": [
+                {"upload_time_iso_8601": "2024-01-02T00:00:00.000000Z"},
+                {"upload_time_iso_8601": "2024-01-01T00:00:00.000000Z"},
+            ],
+            "1.1.0": [{"upload_time_iso_8601": "2024-02-01T00:00:00.000000Z"}],
+            "2.0.0rc1": [{"upload_time_iso_8601": "2024-03-01T00:00:00.000000Z"}],
+            "2.0.0": [],
+        }
+    }
+    times = release_times_from_pypi_json(data, include_prereleases=False)
+    assert times == (1704067200, 1706745600)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.app import check_pyproject
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.lockfile import locked_dependency_items, merge_locked_items, parse_uv_lock
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.pyproject import parse_requirement
+from uv_lens.resolver import ResolveStats
+from uv_lens.versions import version_lag
+
+UV_LOCK = """\
+version = 1
+requires-python = ">=3.12"
+
+[[package]]
+name = "certifi"
+version = "2024.2.2"
+source = { registry = "https://pypi.org/simple" }
+sdist = { url = "https://files.example/certifi.tar.gz", hash = "sha256:0", size = 1 }
+wheels = [
+    { url = "https://files.example/certifi.whl", hash = "sha256:0", size = 1 },
+]
+
+[[package]]
+name = "demo"
+version = "0.1.0"
+source = { editable = "." }
+dependencies = [
+    { name = "requests" },
+]
+
+[package.optional-dependencies]
+fast = [
+    { name = "Ujson" },
+]
+
+[package.dev-dependencies]
+dev = [{ name = "pytest" }]
+
+[package.metadata]
+requires-dist = [
+    { name = "certifi", specifier = ">=2000" },
+    { name = "requests", specifier = ">=2" },
+]
+
+[[package]]
+name = "localtool"
+version = "0.0.1"
+source = { git = "https://git.example/localtool?rev=main#abc" }
+
+[[package]]
+name = "pytest"
+version = "8.0.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "requests"
+version = "2.31.0"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [
+    { name = "certifi" },
+]
+
+[[package]]
+name = "ujson"
+version = "5.9.0"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+
+def test_parse_uv_lock_marks_direct_and_transitive(tmp_path: Path) -> None:
+    """
+    应只返回索引来源的锁定包，并按本地项目声明的依赖区分直接/传递依赖。
+    """
+    lock = tmp_path / "uv.lock"
+    lock.write_text(UV_LOCK, encoding="utf-8")
+
+    packages = {p.name: p for p in parse_uv_lock(lock)}
+
+    assert sorted(packages) == ["certifi", "pytest", "requests", "ujson"]
+    assert packages["requests"].version == Version("2.31.0")
+    assert packages["requests"].direct is True
+    assert packages["ujson"].direct is True
+    assert packages["pytest"].direct is True
+    assert packages["certifi"].direct is False
+    assert packages["certifi"].source == "https://pypi.org/simple"
+
+
+def test_parse_uv_lock_keeps_lowest_of_forked_versions(tmp_path: Path) -> None:
+    """
+    同一包按平台锁定多个版本时，应保留最低版本。
+    """
+    lock = tmp_path / "uv.lock"
+    lock.write_text(
+        """\
+[[package]]
+name = "numpy"
+version = "2.1.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "numpy"
+version = "1.26.4"
+source = { registry = "https://pypi.org/simple" }
+""",
+        encoding="utf-8",
+    )
+
+    (pkg,) = parse_uv_lock(lock)
+    assert pkg.version == Version("1.26.4")
+
+
+def test_locked_dependency_items_use_exact_pins(tmp_path: Path) -> None:
+    """
+    锁定包应转换为 ==锁定版本 的 LOCKED 依赖项。
+    """
+    lock = tmp_path / "uv.lock"
+    lock.write_text(UV_LOCK, encoding="utf-8")
+
+    items = {item.raw: item for item in locked_dependency_items(lock)}
+    assert items["requests==2.31.0"].kind == DependencyKind.LOCKED
+    assert items["requests==2.31.0"].group == "direct"
+    assert items["certifi==2024.2.2"].group == "transitive"
+    assert items["certifi==2024.2.2"].locked == Version("2024.2.2")
+
+
+def test_merge_locked_items_attaches_versions_to_declared_packages(tmp_path: Path) -> None:
+    """
+    pyproject 中已声明的包（名称写法不同、在多个分组中声明也算）不再单独列出锁定项，锁定版本记在各个依赖项上。
+    """
+    lock = tmp_path / "uv.lock"
+    lock.write_text(UV_LOCK, encoding="utf-8")
+    items = [
+        parse_requirement("Requests>=2", kind=DependencyKind.PROJECT, group="project"),
+        parse_requirement("requests[socks]", kind=DependencyKind.DEV_GROUP, group="dev"),
+        parse_requirement("not a requirement!!", kind=DependencyKind.PROJECT, group="project"),
+    ]
+
+    merged = merge_locked_items(items, locked_dependency_items(lock))
+
+    assert [item.locked for item in merged[:3]] == [Version("2.31.0"), Version("2.31.0"), None]
+    assert [item.raw for item in merged[3:]] == ["certifi==2024.2.2", "pytest==8.0.0", "ujson==5.9.0"]
+
+
+@pytest.mark.parametrize(
+    ("locked", "latest", "expected"),
+    [
+        ("1.2.3", "1.2.3", None),
+        ("1.2.3", "2.0.0", "major"),
+        ("1.2.3", "1.3.0", "minor"),
+        ("1.2.3", "1.2.4", "patch"),
+        ("1.2.3rc1", "1.2.3", "pre"),
+        ("1.2.3.dev1", "1.2.3", "pre"),
+        ("1.2.3.4", "1.2.3.5", "patch"),
+        ("1.0", "1.0.post1", "post"),
+        ("1.0+local", "1.0.post1", "post"),
+    ],
+)
+def test_version_lag(locked: str, latest: str, expected: str | None) -> None:
+    """
+    落后程度应按最先不同的版本段判断。
+    """
+    assert version_lag(Version(locked), Version(latest)) == expected
+
+
+@pytest.mark.asyncio
+async def test_check_pyproject_with_lock_resolves_once_and_reports_lag(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    传入 uv.lock 时，pyproject 与锁定包应合并去重后一次解析，并报告锁定版本的落后程度；
+    pyproject 中已声明的包只保留 pyproject 条目，锁定版本记在该条目上。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["requests>=2"]\n', encoding="utf-8")
+    lock = tmp_path / "uv.lock"
+    lock.write_text(UV_LOCK, encoding="utf-8")
+
+    latest = {"certifi": "2024.2.2", "pytest": "8.3.0", "requests": "2.32.3", "ujson": "5.9.0"}
+    calls: list[list[str]] = []
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        """
+        记录请求的包名，返回固定的最新版本。
+        """
+        calls.append(list(normalized_names))
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n,
+                index_url="https://pypi.test/pypi",
+                latest=Version(latest[n]),
+                not_found=False,
+                error=None,
+            )
+            for n in normalized_names
+        }
+        for name in normalized_names:
+            yield name, results[name]
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names)))
+
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+    report = await check_pyproject(pyproject, config=cfg, lock_path=lock)
+
+    assert calls == [["certifi", "pytest", "requests", "ujson"]]
+
+    locked = {item.name: item for item in report.items if item.kind == DependencyKind.LOCKED}
+    assert sorted(locked) == ["certifi", "pytest", "ujson"]
+    assert locked["certifi"].status == CheckStatus.UP_TO_DATE
+    assert locked["certifi"].lag is None
+    assert locked["pytest"].locked == Version("8.0.0")
+    assert locked["pytest"].lag == "minor"
+
+    (project,) = [item for item in report.items if item.kind == DependencyKind.PROJECT]
+    assert project.name == "requests"
+    assert project.status == CheckStatus.UPGRADE_AVAILABLE
+    assert project.locked == Version("2.31.0")
+    assert project.lag == "minor"
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from packaging.version import Version
+
+from uv_lens.cli import main
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult, _request_json
+from uv_lens.metrics import RunMetrics, collect_metrics, current_metrics, timed_phase, write_metrics
+from uv_lens.resolver import ResolveStats
+
+
+@pytest.mark.asyncio
+async def test_request_json_records_per_index_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    开启收集时，每次请求（含重试）都应按索引记录状态码、字节数与耗时。
+    """
+
+    async def fake_sleep(_s: float) -> None:
+        return None
+
+    monkeypatch.setattr("uv_lens.index_client.asyncio.sleep", fake_sleep)
+    calls = {"n": 0}
+
+    def handler(_req: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, text='{"info": {"version": "1.0"}}')
+
+    metrics = RunMetrics()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with collect_metrics(metrics):
+            await _request_json(client, "https://x.test/pypi/demo/json", retries=1, index_url="https://x.test/pypi/")
+    assert current_metrics() is None
+
+    stats = metrics.indexes["https://x.test/pypi"]
+    assert stats.requests == 2
+    assert stats.retries == 1
+    assert stats.errors == 1
+    assert stats.status_codes == {"error": 1, "200": 1}
+    assert stats.bytes == len('{"info": {"version": "1.0"}}')
+    assert stats.latency.total == 2
+
+
+def test_prometheus_textfile_format(tmp_path: Path) -> None:
+    """
+    Prometheus 输出应包含阶段耗时、按索引的计数与累积直方图，并原子写入 .prom 文件。
+    """
+    metrics = RunMetrics(started_at=1700000000.0)
+    metrics.add_phase("network", 1.5)
+    metrics.count("fetched", 3)
+    metrics.record_request("https://pypi.org/pypi", status=200, latency_s=0.2, size=100)
+    metrics.record_request("https://pypi.org/pypi", status=503, latency_s=3.0)
+    metrics.finish(exit_code=0)
+
+    path = tmp_path / "uv_lens.prom"
+    write_metrics(metrics, path)
+    text = path.read_text(encoding="utf-8")
+
+    assert 'uv_lens_phase_duration_seconds{phase="network"} 1.5' in text
+    assert 'uv_lens_lookups{outcome="fetched"} 3' in text
+    assert 'uv_lens_index_requests_total{index="https://pypi.org/pypi"} 2' in text
+    assert 'uv_lens_index_responses_total{index="https://pypi.org/pypi",code="503"} 1' in text
+    assert 'uv_lens_index_request_duration_seconds_bucket{index="https://pypi.org/pypi",le="0.25"} 1' in text
+    assert 'uv_lens_index_request_duration_seconds_bucket{index="https://pypi.org/pypi",le="+Inf"} 2' in text
+    assert "# TYPE uv_lens_index_request_duration_seconds histogram" in text
+    assert [p.name for p in tmp_path.iterdir()] == ["uv_lens.prom"]
+
+
+def test_timed_phase_is_noop_without_collector() -> None:
+    """
+    未开启收集时 timed_phase 不记录任何内容。
+    """
+    with timed_phase("parse"):
+        pass
+    assert current_metrics() is None
+
+
+def test_cli_metrics_out_writes_json(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    --metrics-out 应在进程内执行检查，并写出包含各阶段耗时与查询计数的 JSON。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["httpx>=0.27"]\n', encoding="utf-8")
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        for name in normalized_names:
+            yield name, PackageLookupResult(
+                normalized_name=name, index_url="https://pypi.test/pypi", latest=Version("0.28.0"), not_found=False, error=None
+            )
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names)))
+
+    def fail_daemon(*_args, **_kwargs):
+        raise AssertionError("指定 --metrics-out 时不应转发给守护进程")
+
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+    monkeypatch.setattr("uv_lens.cli.load_config", lambda _: cfg)
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+    monkeypatch.setattr("uv_lens.daemon.check_via_daemon", fail_daemon)
+    monkeypatch.delenv("UV_LENS_NO_DAEMON", raising=False)
+
+    out = tmp_path / "metrics.json"
+    code = main(
+        [
+            "--pyproject",
+            str(pyproject),
+            "--metrics-out",
+            str(out),
+            "check",
+            "--format",
+            "json",
+            "--output",
+            str(tmp_path / "report.json"),
+        ]
+    )
+
+    assert code == 0
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert data["exit_code"] == 0
+    assert {"parse", "evaluation", "render"} <= set(data["phases"])
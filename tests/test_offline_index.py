@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cli import main
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.offline_index import OfflineIndex, OfflineIndexError, build_offline_index, iter_dump_records
+from uv_lens.resolver import resolve_latest_versions
+
+
+def test_build_and_lookup_offline_index(tmp_path: Path) -> None:
+    """
+    生成的索引按规范化包名二分查找，版本按 Version 升序，同名记录合并。
+    """
+    path = tmp_path / "index.bin"
+    count = build_offline_index(
+        [
+            ("Requests", ["2.10.0", "2.9.1", "not-a-version"]),
+            ("zope.interface", ["6.0"]),
+            ("requests", ["2.32.3"]),
+        ]
+        + [(f"pkg-{i:04d}", ["1.0"]) for i in range(500)],
+        path,
+    )
+    assert count == 502
+
+    index = OfflineIndex(path)
+    try:
+        assert len(index) == 502
+        assert index.versions("requests") == ("2.9.1", "2.10.0", "2.32.3")
+        assert index.versions("Zope_Interface") == ("6.0",)
+        assert index.versions("pkg-0499") == ("1.0",)
+        assert index.versions("missing") is None
+    finally:
+        index.close()
+
+
+def test_offline_index_latest_prefers_stable_and_caches(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    latest 默认取最新稳定版本（只有预发布时取预发布），结果按包名缓存；索引中没有的包抛出 KeyError。
+    """
+    path = tmp_path / "index.bin"
+    build_offline_index([("six", ["1.16.0", "2.0.0b1", "2.0.0.dev1"]), ("beta-only", ["1.0a1", "1.0a2"])], path)
+
+    index = OfflineIndex(path)
+    try:
+        assert index.latest("Six", include_prereleases=False) == Version("1.16.0")
+        assert index.latest("six", include_prereleases=True) == Version("2.0.0b1")
+        assert index.latest("beta-only", include_prereleases=False) == Version("1.0a2")
+        with pytest.raises(KeyError):
+            index.latest("missing", include_prereleases=False)
+
+        monkeypatch.setattr(index, "_find", lambda name: pytest.fail(f"{name} 应命中缓存"))
+        assert index.latest("six", include_prereleases=False) == Version("1.16.0")
+    finally:
+        index.close()
+
+
+def test_offline_index_rejects_foreign_file(tmp_path: Path) -> None:
+    """
+    非离线索引文件应报错。
+    """
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"definitely not an index")
+    with pytest.raises(OfflineIndexError):
+        OfflineIndex(path)
+
+
+def test_iter_dump_records_reads_jsonl_and_directory(tmp_path: Path) -> None:
+    """
+    镜像导出既可以是 JSONL，也可以是 PyPI JSON API 响应组成的目录。
+    """
+    jsonl = tmp_path / "dump.jsonl"
+    jsonl.write_text(
+        json.dumps({"name": "six", "versions": ["1.16.0"]}) + "\n\nbroken line\n",
+        encoding="utf-8",
+    )
+    assert list(iter_dump_records(jsonl)) == [("six", ["1.16.0"])]
+
+    directory = tmp_path / "mirror"
+    (directory / "httpx").mkdir(parents=True)
+    (directory / "httpx" / "json.json").write_text(
+        json.dumps({"info": {"name": "httpx", "version": "0.28.1"}, "releases": {"0.27.0": []}}),
+        encoding="utf-8",
+    )
+    assert list(iter_dump_records(directory)) == [("httpx", ["0.27.0", "0.28.1"])]
+
+
+@pytest.mark.asyncio
+async def test_resolver_prefers_offline_index(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    离线索引中已有的包不联网；没有的包仍走索引查询。
+    """
+    path = tmp_path / "index.bin"
+    build_offline_index([("six", ["1.16.0", "2.0.0b1"])], path)
+    settings = IndexSettings(index_url="https://mirror.test/pypi", offline_index=str(path))
+    called: list[str] = []
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        记录联网查询。
+        """
+        called.append(normalized_name)
+        return PackageLookupResult(
+            normalized_name=normalized_name, index_url=None, latest=None, not_found=True, error=None
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    results, stats = await resolve_latest_versions(
+        ["six", "internal"],
+        settings=settings,
+        max_concurrency=2,
+        cache=None,
+        cache_ttl_s=3600,
+        refresh=False,
+    )
+    assert called == ["internal"]
+    assert stats.offline_hits == 1
+    assert results["six"].latest == Version("1.16.0")
+    assert results["internal"].not_found
+
+
+def test_cli_index_build(tmp_path: Path) -> None:
+    """
+    uv-lens index build 由 JSONL 导出生成离线索引。
+    """
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps({"name": "rich", "versions": ["14.0.0"]}) + "\n", encoding="utf-8")
+    output = tmp_path / "out" / "index.bin"
+    assert main(["index", "build", str(dump), str(output)]) == 0
+    index = OfflineIndex(output)
+    try:
+        assert index.versions("rich") == ("14.0.0",)
+    finally:
+        index.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("problem", ["missing", "truncated"])
+async def test_unusable_offline_index_falls_back_online(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str], problem: str
+) -> None:
+    """
+    离线索引缺失或损坏时不中断检查：提示一次后全部改为在线查询。
+    """
+    import uv_lens.offline_index as offline_index
+
+    monkeypatch.setattr(offline_index, "_disabled_paths", set())
+    offline_index.open_offline_index.cache_clear()
+    path = tmp_path / "index.bin"
+    if problem == "truncated":
+        build_offline_index([(f"pkg-{i}", ["1.0"]) for i in range(50)], path)
+        path.write_bytes(path.read_bytes()[:600])
+    settings = IndexSettings(index_url="https://mirror.test/pypi", offline_index=str(path))
+    called: list[str] = []
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        记录联网查询。
+        """
+        called.append(normalized_name)
+        return PackageLookupResult(
+            normalized_name=normalized_name, index_url=index_url, latest=Version("1.0"), not_found=False, error=None
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    results, stats = await resolve_latest_versions(
+        ["pkg-10", "pkg-49"],
+        settings=settings,
+        max_concurrency=2,
+        cache=None,
+        cache_ttl_s=3600,
+        refresh=False,
+    )
+    offline_index.open_offline_index.cache_clear()
+
+    assert sorted(called) == ["pkg-10", "pkg-49"]
+    assert stats.offline_hits == 0
+    assert results["pkg-49"].latest == Version("1.0")
+    assert capsys.readouterr().err.count("离线索引") == 1
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens import parse_cache
+from uv_lens.app import check_pyproject
+from uv_lens.cache import CacheDB
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.parse_cache import clear_memo, load_dependency_items_cached
+from uv_lens.resolver import ResolveStats
+
+
+@pytest.fixture(autouse=True)
+def _fresh_memo() -> None:
+    """
+    每个用例从空的进程内缓存开始。
+    """
+    clear_memo()
+
+
+def _count_extract_calls(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """
+    统计真正执行 TOML/Requirement 解析的次数。
+    """
+    calls: list[int] = []
+    original = parse_cache.extract_dependencies
+
+    def counting(data):
+        calls.append(1)
+        return original(data)
+
+    monkeypatch.setattr("uv_lens.parse_cache.extract_dependencies", counting)
+    return calls
+
+
+def test_parse_result_is_reused_until_content_changes(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    内容不变时复用进程内结果；内容变化后重新解析。
+    """
+    calls = _count_extract_calls(monkeypatch)
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\ndependencies = ["httpx>=0.27"]\n', encoding="utf-8")
+
+    digest1, items1 = load_dependency_items_cached(pyproject)
+    digest2, items2 = load_dependency_items_cached(pyproject)
+    assert digest1 == digest2
+    assert items1 == items2
+    assert len(calls) == 1
+
+    pyproject.write_text('[project]\ndependencies = ["httpx>=0.28"]\n', encoding="utf-8")
+    digest3, items3 = load_dependency_items_cached(pyproject)
+    assert digest3 != digest1
+    assert str(items3[0].requirement) == "httpx>=0.28"
+    assert len(calls) == 2
+
+
+def test_parse_result_persists_in_cache_db(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    新进程（清空进程内缓存）可从 CacheDB 读取序列化的解析结果，不再解析。
+    """
+    calls = _count_extract_calls(monkeypatch)
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\ndependencies = ["rich[jupyter]>=13; python_version >= \'3.9\'"]\n', encoding="utf-8")
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        _, first = load_dependency_items_cached(pyproject, store=db)
+        clear_memo()
+        _, second = load_dependency_items_cached(pyproject, store=db)
+    finally:
+        db.close()
+    assert len(calls) == 1
+    assert second == first
+    assert second[0].requirement is not None
+    assert second[0].requirement.extras == {"jupyter"}
+
+
+def test_parse_cache_stores_plain_requirement_strings(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    CacheDB 中只保存 JSON 形式的 (来源, 分组, 原始字符串)；无法识别的记录被忽略并重新解析文件。
+    """
+    calls = _count_extract_calls(monkeypatch)
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\ndependencies = ["httpx>=0.27", "not valid !!!"]\n', encoding="utf-8")
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        digest, first = load_dependency_items_cached(pyproject, store=db)
+        assert json.loads(db.get_parsed(digest)) == [
+            ["project", "project", "httpx>=0.27"],
+            ["project", "project", "not valid !!!"],
+        ]
+
+        clear_memo()
+        db.set_parsed(digest, b"\x80\x04garbage")
+        _, second = load_dependency_items_cached(pyproject, store=db)
+    finally:
+        db.close()
+    assert len(calls) == 2
+    assert second == first
+    assert second[1].requirement is None and second[1].error
+
+
+@pytest.mark.asyncio
+async def test_unchanged_report_is_not_reevaluated(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    文件与查询结果都未变化时直接复用上次的版本评估；查询结果变化时重新评估。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\ndependencies = ["httpx==0.27.0"]\n', encoding="utf-8")
+    latest = {"httpx": Version("0.28.1")}
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        """
+        返回当前设定的最新版本。
+        """
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n, index_url="https://pypi.test/pypi", latest=latest[n], not_found=False, error=None
+            )
+            for n in normalized_names
+        }
+        for name in normalized_names:
+            yield name, results[name]
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=len(normalized_names), fetched=0))
+
+    evaluations: list[int] = []
+    from uv_lens import versions
+
+    original_evaluate = versions.evaluate_requirement_against_latest
+
+    def counting_evaluate(*args, **kwargs):
+        evaluations.append(1)
+        return original_evaluate(*args, **kwargs)
+
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+    monkeypatch.setattr(versions, "_evaluation_cache", type(versions._evaluation_cache)())
+    monkeypatch.setattr(versions, "evaluate_requirement_against_latest", counting_evaluate)
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False, pin="exact")
+
+    first = await check_pyproject(pyproject, config=cfg)
+    second = await check_pyproject(pyproject, config=cfg)
+    assert len(evaluations) == 1
+    assert second.items == first.items
+    assert second.cache_hits == 1
+
+    latest["httpx"] = Version("0.29.0")
+    third = await check_pyproject(pyproject, config=cfg)
+    assert len(evaluations) == 2
+    assert third.items[0].latest == Version("0.29.0")
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pstats
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cli import main
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.metrics import RunMetrics
+from uv_lens.profiling import format_phase_table
+from uv_lens.resolver import ResolveStats
+
+
+def test_phase_table_reports_wait_time() -> None:
+    """
+    阶段摘要应按固定顺序列出墙钟、CPU 与等待时间。
+    """
+    metrics = RunMetrics()
+    metrics.add_phase("render", 0.01, 0.01)
+    metrics.add_phase("network", 1.0, 0.1)
+    table = format_phase_table(metrics).splitlines()
+
+    assert table[1].split() == ["network", "1000.0", "100.0", "900.0"]
+    assert table[2].split()[0] == "render"
+
+
+def test_cli_profile_writes_profile_and_summary(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """
+    --profile 不应吞掉后面的子命令名；--profile=PATH 写出可被 pstats 读取的文件，并在 stderr 输出热点函数与阶段耗时。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["httpx>=0.27"]\n', encoding="utf-8")
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        for name in normalized_names:
+            yield name, PackageLookupResult(
+                normalized_name=name, index_url="https://pypi.test/pypi", latest=Version("0.28.0"), not_found=False, error=None
+            )
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names)))
+
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+    monkeypatch.setattr("uv_lens.cli.load_config", lambda _: cfg)
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+    monkeypatch.chdir(tmp_path)
+
+    args = ["--pyproject", str(pyproject), "check", "--format", "json", "--output", str(tmp_path / "r.json")]
+    assert main(["--profile", *args]) == 0
+    assert (tmp_path / "uv-lens.prof").exists()
+
+    target = tmp_path / "out" / "check.prof"
+    assert main([f"--profile={target}", *args]) == 0
+    stderr = capsys.readouterr().err
+
+    assert pstats.Stats(str(target)).total_calls > 0
+    assert "ncalls" in stderr
+    phases = {line.split()[0] for line in stderr.splitlines() if line.strip()}
+    assert {"config", "parse", "evaluation", "render", "total"} <= phases
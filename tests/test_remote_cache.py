@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CacheEntry, index_scope_key
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.remote_cache import CacheServer, RemoteCache, create_cache_server
+from uv_lens.resolver import resolve_latest_versions
+
+
+@pytest.fixture
+def cache_server(tmp_path: Path) -> Iterator[CacheServer]:
+    """
+    在后台线程启动本地共享缓存服务（系统分配端口）。
+    """
+    server = create_cache_server(tmp_path / "server.sqlite3", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.db.close()
+
+
+def _url(server: CacheServer) -> str:
+    """
+    返回服务的基础 URL。
+    """
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+@pytest.mark.asyncio
+async def test_remote_cache_put_then_get_from_other_runner(cache_server: CacheServer, tmp_path: Path) -> None:
+    """
+    一个 runner 写入并 flush 后，另一个全新 runner 应能一次批量预取到，并回填本地缓存。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    writer = RemoteCache(_url(cache_server), fallback=CacheDB(tmp_path / "a.sqlite3"))
+    for name in ("httpx", "rich"):
+        writer.set(
+            scope=scope,
+            normalized_name=name,
+            latest=Version("1.0.0"),
+            resolved_index_url="https://pypi.org/pypi",
+            not_found=False,
+            error=None,
+        )
+    await writer.flush()
+    writer.close()
+
+    reader = RemoteCache(_url(cache_server), fallback=CacheDB(tmp_path / "b.sqlite3"))
+    try:
+        await reader.prefetch({scope: ["httpx", "rich", "missing"]})
+        entries = reader.get_many(scope=scope, normalized_names=["httpx", "rich", "missing"], ttl_s=3600)
+        assert sorted(entries) == ["httpx", "rich"]
+        assert entries["httpx"].latest == Version("1.0.0")
+        assert reader.available is True
+    finally:
+        reader.close()
+
+    local = CacheDB(tmp_path / "b.sqlite3")
+    try:
+        assert local.get(scope=scope, normalized_name="rich", ttl_s=0) is not None
+    finally:
+        local.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_cache_falls_back_to_local_when_server_unreachable(tmp_path: Path) -> None:
+    """
+    服务不可达时应标记不可用，并继续使用本地 SQLite 读写。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    local = CacheDB(tmp_path / "local.sqlite3")
+    local.set(
+        scope=scope,
+        normalized_name="demo",
+        latest=Version("2.0.0"),
+        resolved_index_url="https://pypi.org/pypi",
+        not_found=False,
+        error=None,
+    )
+    cache = RemoteCache("http://127.0.0.1:9", fallback=local, timeout_s=0.5)
+    try:
+        await cache.prefetch({scope: ["demo"]})
+        entry = cache.get(scope=scope, normalized_name="demo", ttl_s=0)
+        assert entry is not None
+        assert entry.latest == Version("2.0.0")
+        assert cache.available is False
+    finally:
+        cache.close()
+
+
+def test_put_entries_keeps_newest(tmp_path: Path) -> None:
+    """
+    批量写入冲突时应保留 fetched_at 较新的记录。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        newer = CacheEntry(latest=Version("2.0"), resolved_index_url=None, not_found=False, error=None, fetched_at=200)
+        older = CacheEntry(latest=Version("1.0"), resolved_index_url=None, not_found=False, error=None, fetched_at=100)
+        db.put_entries(scope=scope, entries={"demo": newer})
+        db.put_entries(scope=scope, entries={"demo": older})
+        entry = db.get(scope=scope, normalized_name="demo", ttl_s=0)
+        assert entry is not None
+        assert entry.latest == Version("2.0")
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_resolver_uses_one_remote_read_and_one_write(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    多个索引加上待查询包的历史记录，一次运行也只向服务端发起一次批量读取与一次批量写入。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi", extra_index_urls=("https://extra.test/pypi",))
+    requests: list[tuple[str, dict]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append((request.url.path, body))
+        return httpx.Response(200, json={"scopes": {}} if request.url.path == "/v1/get" else {"stored": 0})
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        替换真实网络查询：主索引上找不到，额外索引返回固定版本。
+        """
+        found = index_url == "https://extra.test/pypi"
+        return PackageLookupResult(
+            normalized_name=normalized_name,
+            index_url=index_url if found else None,
+            latest=Version("1.0.0") if found else None,
+            not_found=not found,
+            error=None,
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        cache = RemoteCache("http://cache.test", fallback=CacheDB(tmp_path / "local.sqlite3"), client=client)
+        try:
+            results, stats = await resolve_latest_versions(
+                ["a", "b"], settings=settings, max_concurrency=4, cache=cache, cache_ttl_s=3600, refresh=False
+            )
+        finally:
+            cache.close()
+
+    assert stats.fetched == 2
+    assert results["a"].latest == Version("1.0.0")
+    assert [path for path, _ in requests] == ["/v1/get", "/v1/put"]
+    assert requests[0][1]["scopes"] == {
+        index_scope_key(settings.index_url): ["a", "b"],
+        index_scope_key("https://extra.test/pypi"): ["a", "b"],
+    }
+    assert sum(len(entries) for entries in requests[1][1]["scopes"].values()) == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_server_requires_token(tmp_path: Path) -> None:
+    """
+    设置令牌后，未携带或携带错误令牌的请求返回 401，客户端改用本地缓存；令牌正确时正常读写。
+    """
+    server = create_cache_server(tmp_path / "server.sqlite3", port=0, token="s3cret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    try:
+        for token in (None, "wrong"):
+            anonymous = RemoteCache(_url(server), token=token)
+            await anonymous.prefetch({scope: ["demo"]})
+            assert anonymous.available is False
+
+        writer = RemoteCache(_url(server), token="s3cret")
+        writer.set(
+            scope=scope,
+            normalized_name="demo",
+            latest=Version("1.0"),
+            resolved_index_url="https://pypi.org/pypi",
+            not_found=False,
+            error=None,
+        )
+        await writer.flush()
+        reader = RemoteCache(_url(server), token="s3cret")
+        await reader.prefetch({scope: ["demo"]})
+        assert reader.available is True
+        entry = reader.get(scope=scope, normalized_name="demo", ttl_s=0)
+        assert entry is not None and entry.latest == Version("1.0")
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.db.close()
+
+
+def test_cache_server_refuses_public_bind_without_token(tmp_path: Path) -> None:
+    """
+    监听非本机地址且未设置令牌时拒绝启动。
+    """
+    with pytest.raises(ValueError):
+        create_cache_server(tmp_path / "server.sqlite3", host="0.0.0.0", port=0)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_before_prefetch_does_not_revive_entries(cache_server: CacheServer, tmp_path: Path) -> None:
+    """
+    本地标记失效后再预取，服务端的旧记录不应回填为有效；失效标记同时推送到服务端，其他 runner 也读不到。
+    """
+    scope = index_scope_key("https://pypi.org/pypi", ())
+    writer = RemoteCache(_url(cache_server), fallback=CacheDB(tmp_path / "a.sqlite3"))
+    writer.set(
+        scope=scope,
+        normalized_name="x",
+        latest=Version("1.0"),
+        resolved_index_url="https://pypi.org/pypi",
+        not_found=False,
+        error=None,
+    )
+    await writer.flush()
+    writer.close()
+
+    reader = RemoteCache(_url(cache_server), fallback=CacheDB(tmp_path / "b.sqlite3"))
+    try:
+        await reader.prefetch({scope: ["x"]})
+        assert reader.get(scope=scope, normalized_name="x", ttl_s=3600) is not None
+        reader.invalidate(["x"])
+        await reader.prefetch({scope: ["x"]})
+        assert reader.get_many(scope=scope, normalized_names=["x"], ttl_s=3600) == {}
+    finally:
+        reader.close()
+
+    other = RemoteCache(_url(cache_server), fallback=CacheDB(tmp_path / "c.sqlite3"))
+    try:
+        await other.prefetch({scope: ["x"]})
+        assert other.get(scope=scope, normalized_name="x", ttl_s=0) is None
+    finally:
+        other.close()
+
+
+@pytest.mark.asyncio
+async def test_resolver_pushes_invalidations_without_lookups(tmp_path: Path) -> None:
+    """
+    本次运行没有需要查询的包时，resolver 结束时仍推送暂存的失效标记。
+    """
+    paths: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"invalidated": 1})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        cache = RemoteCache("http://cache.test", fallback=CacheDB(tmp_path / "local.sqlite3"), client=client)
+        try:
+            cache.invalidate(["x"])
+            await resolve_latest_versions(
+                [],
+                settings=IndexSettings(index_url="https://pypi.test/pypi"),
+                max_concurrency=1,
+                cache=cache,
+                cache_ttl_s=3600,
+                refresh=False,
+            )
+        finally:
+            cache.close()
+
+    assert paths == ["/v1/invalidate"]
+
+
+def test_cache_server_rejects_malformed_requests(cache_server: CacheServer) -> None:
+    """
+    无法解析的 Content-Length 与 ttl_s 返回 400 JSON 错误，而不是在处理函数中抛出异常。
+    """
+    import http.client
+
+    host, port = cache_server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        conn.putrequest("POST", "/v1/get")
+        conn.putheader("Content-Length", "abc")
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == 400
+        assert json.loads(resp.read()) == {"error": "invalid payload"}
+    finally:
+        conn.close()
+
+    resp = httpx.post(f"{_url(cache_server)}/v1/get", json={"scopes": {}, "ttl_s": "abc"})
+    assert resp.status_code == 400
+    assert resp.json() == {"error": "invalid payload"}
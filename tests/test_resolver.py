@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from pathlib import Path
 
 import pytest
@@ -7,7 +9,7 @@ from packaging.version import Version
 
 from uv_lens.cache import CacheDB, index_scope_key
 from uv_lens.index_client import IndexSettings, PackageLookupResult
-from uv_lens.resolver import resolve_latest_versions
+from uv_lens.resolver import DEADLINE_EXCEEDED, ResolveStats, iter_latest_versions, resolve_latest_versions
 
 
 @pytest.mark.asyncio
@@ -18,7 +20,7 @@ async def test_resolve_latest_uses_cache_when_available(
     refresh=False 且缓存命中时，应直接使用缓存并减少网络查询次数。
     """
     settings = IndexSettings(index_url="https://primary.test/pypi", extra_index_urls=("https://extra.test/pypi",))
-    scope = index_scope_key(settings.index_url, settings.extra_index_urls)
+    scope = index_scope_key(settings.index_url)
     db = CacheDB(tmp_path / "cache.sqlite3")
     try:
         db.set(
@@ -32,8 +34,8 @@ async def test_resolve_latest_uses_cache_when_available(
 
         called: list[str] = []
 
-        async def fake_fetch_latest_from_indexes(
-            normalized_name: str, *, settings: IndexSettings, client
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
         ) -> PackageLookupResult:
             """
             替换真实网络查询，返回固定版本并记录调用次数。
@@ -41,13 +43,13 @@ async def test_resolve_latest_uses_cache_when_available(
             called.append(normalized_name)
             return PackageLookupResult(
                 normalized_name=normalized_name,
-                index_url=settings.index_url,
+                index_url=index_url,
                 latest=Version("2.0.0"),
                 not_found=False,
                 error=None,
             )
 
-        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_indexes", fake_fetch_latest_from_indexes)
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
 
         results, stats = await resolve_latest_versions(
             ["pkg1", "pkg2"],
@@ -78,7 +80,7 @@ async def test_resolve_latest_refresh_bypasses_cache(monkeypatch: pytest.MonkeyP
     refresh=True 时应忽略缓存并重新查询所有包。
     """
     settings = IndexSettings(index_url="https://primary.test/pypi")
-    scope = index_scope_key(settings.index_url, settings.extra_index_urls)
+    scope = index_scope_key(settings.index_url)
     db = CacheDB(tmp_path / "cache.sqlite3")
     try:
         db.set(
@@ -92,8 +94,8 @@ async def test_resolve_latest_refresh_bypasses_cache(monkeypatch: pytest.MonkeyP
 
         called: list[str] = []
 
-        async def fake_fetch_latest_from_indexes(
-            normalized_name: str, *, settings: IndexSettings, client
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
         ) -> PackageLookupResult:
             """
             用于验证 refresh 时无论是否有缓存都会发起查询。
@@ -101,13 +103,13 @@ async def test_resolve_latest_refresh_bypasses_cache(monkeypatch: pytest.MonkeyP
             called.append(normalized_name)
             return PackageLookupResult(
                 normalized_name=normalized_name,
-                index_url=settings.index_url,
+                index_url=index_url,
                 latest=Version("9.9.9"),
                 not_found=False,
                 error=None,
             )
 
-        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_indexes", fake_fetch_latest_from_indexes)
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
 
         results, stats = await resolve_latest_versions(
             ["pkg1", "pkg2"],
@@ -126,3 +128,334 @@ async def test_resolve_latest_refresh_bypasses_cache(monkeypatch: pytest.MonkeyP
     finally:
         db.close()
 
+
+@pytest.mark.asyncio
+async def test_index_configs_share_per_index_entries(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    只用 PyPI 的项目写入的记录，应被“PyPI + 私有索引”的项目直接复用；私有包在 PyPI 上的未找到结果也按索引缓存。
+    """
+    pypi = "https://pypi.test/pypi"
+    private = "https://private.test/pypi"
+    calls: list[tuple[str, str]] = []
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        requests 只在 PyPI 上，internal 只在私有索引上。
+        """
+        calls.append((index_url, normalized_name))
+        found = (index_url, normalized_name) in {(pypi, "requests"), (private, "internal")}
+        return PackageLookupResult(
+            normalized_name=normalized_name,
+            index_url=index_url if found else None,
+            latest=Version("1.0") if found else None,
+            not_found=not found,
+            error=None,
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        await resolve_latest_versions(
+            ["requests"],
+            settings=IndexSettings(index_url=pypi),
+            max_concurrency=4,
+            cache=db,
+            cache_ttl_s=3600,
+            refresh=False,
+        )
+        assert calls == [(pypi, "requests")]
+
+        calls.clear()
+        chained = IndexSettings(index_url=pypi, extra_index_urls=(private,))
+        results, stats = await resolve_latest_versions(
+            ["requests", "internal"],
+            settings=chained,
+            max_concurrency=4,
+            cache=db,
+            cache_ttl_s=3600,
+            refresh=False,
+        )
+        assert sorted(calls) == [(private, "internal"), (pypi, "internal")]
+        assert stats.cache_hits == 1
+        assert results["requests"].index_url == pypi
+        assert results["internal"].index_url == private
+
+        calls.clear()
+        results, stats = await resolve_latest_versions(
+            ["requests", "internal"],
+            settings=chained,
+            max_concurrency=4,
+            cache=db,
+            cache_ttl_s=3600,
+            refresh=False,
+        )
+        assert calls == []
+        assert stats.cache_hits == 2
+        assert results["internal"].latest == Version("1.0")
+        missing = db.get(scope=index_scope_key(pypi), normalized_name="internal", ttl_s=0)
+        assert missing is not None and missing.not_found
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_latest_versions_yields_cache_hits_first_then_in_completion_order(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    iter_latest_versions 应先产出缓存命中，再按查询完成的先后产出结果，最后回调统计信息。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        db.set(
+            scope=index_scope_key(settings.index_url),
+            normalized_name="cached",
+            latest=Version("1.0.0"),
+            resolved_index_url=settings.index_url,
+            not_found=False,
+            error=None,
+        )
+        delays = {"slow": 0.05, "fast": 0.0}
+
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
+        ) -> PackageLookupResult:
+            """
+            按包名延迟返回，模拟响应快慢不同的查询。
+            """
+            await asyncio.sleep(delays[normalized_name])
+            return PackageLookupResult(
+                normalized_name=normalized_name,
+                index_url=index_url,
+                latest=Version("2.0.0"),
+                not_found=False,
+                error=None,
+            )
+
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+        stats: list[ResolveStats] = []
+        order = [
+            name
+            async for name, _ in iter_latest_versions(
+                ["slow", "cached", "fast"],
+                settings=settings,
+                max_concurrency=10,
+                cache=db,
+                cache_ttl_s=3600,
+                refresh=False,
+                on_stats=stats.append,
+            )
+        ]
+
+        assert order == ["cached", "fast", "slow"]
+        assert stats[0].cache_hits == 1
+        assert stats[0].fetched_names == frozenset({"slow", "fast"})
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_latest_versions_cancels_pending_lookups_on_early_exit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    调用方提前停止迭代时，尚未完成的查询应被取消。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    cancelled: list[str] = []
+
+    async def fake_fetch_latest_from_index(
+        normalized_name: str, index_url: str, *, settings: IndexSettings, client
+    ) -> PackageLookupResult:
+        """
+        pkg0 立即返回，其余包长时间挂起。
+        """
+        try:
+            if normalized_name != "pkg0":
+                await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(normalized_name)
+            raise
+        return PackageLookupResult(
+            normalized_name=normalized_name, index_url=index_url, latest=Version("1.0"), not_found=False, error=None
+        )
+
+    monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+    stream = iter_latest_versions(
+        ["pkg0", "pkg1", "pkg2"],
+        settings=settings,
+        max_concurrency=10,
+        cache=None,
+        cache_ttl_s=0,
+        refresh=False,
+    )
+    async for name, _ in stream:
+        assert name == "pkg0"
+        break
+    await asyncio.wait_for(stream.aclose(), timeout=1)
+    assert sorted(cancelled) == ["pkg1", "pkg2"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_lookups_and_falls_back_to_stale_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    到达截止时间后应取消未完成的查询：有旧缓存的包改用旧值，没有的标记为超时，且都不写回缓存。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        db.set(
+            scope=scope,
+            normalized_name="stale",
+            latest=Version("1.0.0"),
+            resolved_index_url=settings.index_url,
+            not_found=False,
+            error=None,
+        )
+
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
+        ) -> PackageLookupResult:
+            """
+            fast 立即返回，其余包长时间挂起。
+            """
+            if normalized_name != "fast":
+                await asyncio.sleep(10)
+            return PackageLookupResult(
+                normalized_name=normalized_name, index_url=index_url, latest=Version("2.0.0"), not_found=False, error=None
+            )
+
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+        results, stats = await asyncio.wait_for(
+            resolve_latest_versions(
+                ["hung", "stale", "fast"],
+                settings=settings,
+                max_concurrency=10,
+                cache=db,
+                cache_ttl_s=3600,
+                refresh=True,
+                deadline=time.monotonic() + 0.05,
+            ),
+            timeout=2,
+        )
+
+        assert results["fast"].latest == Version("2.0.0")
+        assert not results["fast"].timed_out
+        assert results["stale"].timed_out and results["stale"].latest == Version("1.0.0")
+        assert results["stale"].error is None
+        assert results["hung"].timed_out and results["hung"].latest is None
+        assert results["hung"].error == DEADLINE_EXCEEDED
+        assert stats.timed_out == 2
+        assert db.get(scope=scope, normalized_name="hung", ttl_s=0) is None
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_deadline_falls_back_to_invalidated_entries(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    被变更源标记失效的记录不算命中，但到达截止时间时仍可作为旧值兜底。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        db.set(
+            scope=scope,
+            normalized_name="flagged",
+            latest=Version("1.0.0"),
+            resolved_index_url=settings.index_url,
+            not_found=False,
+            error=None,
+        )
+        db.invalidate(["flagged"])
+
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
+        ) -> PackageLookupResult:
+            """
+            查询长时间挂起。
+            """
+            await asyncio.sleep(10)
+            raise AssertionError("unreachable")
+
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+        results, stats = await resolve_latest_versions(
+            ["flagged"],
+            settings=settings,
+            max_concurrency=1,
+            cache=db,
+            cache_ttl_s=3600,
+            refresh=False,
+            deadline=time.monotonic() + 0.05,
+        )
+
+        assert stats.cache_hits == 0
+        assert results["flagged"].timed_out and results["flagged"].latest == Version("1.0.0")
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_lookups_start_slowest_first_and_record_latency(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    需要联网的包应按缓存中记录的耗时从长到短发起（priority 优先），并回写平滑后的单包与索引耗时。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    scope = index_scope_key(settings.index_url)
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        for name, latency_ms in {"alpha": 10, "beta": 800, "gamma": 50}.items():
+            db.set(
+                scope=scope,
+                normalized_name=name,
+                latest=Version("1.0.0"),
+                resolved_index_url=settings.index_url,
+                not_found=False,
+                error=None,
+                latency_ms=latency_ms,
+            )
+        started: list[str] = []
+
+        async def fake_fetch_latest_from_index(
+            normalized_name: str, index_url: str, *, settings: IndexSettings, client
+        ) -> PackageLookupResult:
+            """
+            记录发起顺序。
+            """
+            started.append(normalized_name)
+            return PackageLookupResult(
+                normalized_name=normalized_name, index_url=index_url, latest=Version("2.0.0"), not_found=False, error=None
+            )
+
+        monkeypatch.setattr("uv_lens.resolver.fetch_latest_from_index", fake_fetch_latest_from_index)
+
+        async def run(priority: dict[str, int] | None) -> list[str]:
+            started.clear()
+            await resolve_latest_versions(
+                ["alpha", "beta", "delta", "gamma"],
+                settings=settings,
+                max_concurrency=1,
+                cache=db,
+                cache_ttl_s=3600,
+                refresh=True,
+                priority=priority,
+            )
+            return list(started)
+
+        assert await run(None) == ["beta", "gamma", "alpha", "delta"]
+        assert (await run({"alpha": 0, "beta": 1, "gamma": 1, "delta": 1}))[0] == "alpha"
+
+        beta = db.get(scope=scope, normalized_name="beta", ttl_s=0)
+        assert beta is not None and 0 < beta.latency_ms < 800
+        assert db.get_meta("index_latency_ms:" + scope) is not None
+    finally:
+        db.close()
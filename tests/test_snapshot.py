@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, CacheEntry, index_scope_key
+from uv_lens.cli import main
+from uv_lens.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+PYPI = index_scope_key("https://pypi.org/pypi")
+PRIVATE = index_scope_key("https://private.test/pypi")
+
+
+def _entry(version: str, fetched_at: int) -> CacheEntry:
+    """
+    构造一条成功的缓存记录。
+    """
+    return CacheEntry(
+        latest=Version(version), resolved_index_url=None, not_found=False, error=None, fetched_at=fetched_at
+    )
+
+
+def test_export_then_import_merges_newest_wins(tmp_path: Path) -> None:
+    """
+    导出指定 scope 的记录；导入时冲突记录保留 fetched_at 较新的一方。
+    """
+    source = CacheDB(tmp_path / "source.sqlite3")
+    target = CacheDB(tmp_path / "target.sqlite3")
+    snapshot = tmp_path / "cache.json.gz"
+    try:
+        source.merge_scopes(
+            {
+                PYPI: {"httpx": _entry("0.28.1", 200), "rich": _entry("14.0.0", 100)},
+                PRIVATE: {"internal": _entry("1.0", 100)},
+            }
+        )
+        assert export_snapshot(source, snapshot, index_urls=["https://pypi.org/pypi/"]) == 2
+
+        target.merge_scopes({PYPI: {"httpx": _entry("0.27.0", 100), "rich": _entry("15.0.0", 300)}})
+        assert import_snapshot(target, snapshot) == 2
+
+        httpx_entry = target.get(scope=PYPI, normalized_name="httpx", ttl_s=0)
+        rich_entry = target.get(scope=PYPI, normalized_name="rich", ttl_s=0)
+        assert httpx_entry is not None and httpx_entry.latest == Version("0.28.1")
+        assert rich_entry is not None and rich_entry.latest == Version("15.0.0")
+        assert target.get(scope=PRIVATE, normalized_name="internal", ttl_s=0) is None
+    finally:
+        source.close()
+        target.close()
+
+
+def test_import_rejects_unknown_snapshot(tmp_path: Path) -> None:
+    """
+    格式或版本不符的文件应报错，而不是静默导入。
+    """
+    path = tmp_path / "bad.json.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(json.dumps({"format": "uv-lens-cache-snapshot", "version": 99, "scopes": {}}).encode("utf-8"))
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        with pytest.raises(SnapshotError):
+            import_snapshot(db, path)
+        with pytest.raises(SnapshotError):
+            import_snapshot(db, tmp_path / "missing.json.gz")
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        {"latest": "1.0", "fetched_at": "abc"},
+        {"latest": "1.0", "fetched_at": 100, "resolved_index_url": ["https://pypi.org/pypi"]},
+        "not-an-entry",
+    ],
+)
+def test_import_rejects_corrupt_entries(tmp_path: Path, entry: object) -> None:
+    """
+    字段类型不符的记录应报“快照内容损坏”，且不写入任何记录。
+    """
+    path = tmp_path / "corrupt.json.gz"
+    payload = {"format": "uv-lens-cache-snapshot", "version": 1, "scopes": {PYPI: {"httpx": entry}}}
+    with gzip.open(path, "wb") as f:
+        f.write(json.dumps(payload).encode("utf-8"))
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    try:
+        with pytest.raises(SnapshotError, match="快照内容损坏"):
+            import_snapshot(db, path)
+        assert db.get(scope=PYPI, normalized_name="httpx", ttl_s=0) is None
+    finally:
+        db.close()
+
+
+def test_cli_cache_export_and_import(tmp_path: Path) -> None:
+    """
+    uv-lens cache export / import 可按包名筛选并恢复到新的缓存库。
+    """
+    source = CacheDB(tmp_path / "source.sqlite3")
+    source.merge_scopes({PYPI: {"httpx": _entry("0.28.1", 200), "rich": _entry("14.0.0", 100)}})
+    source.close()
+    snapshot = tmp_path / "out" / "cache.json.gz"
+
+    assert main(["cache", "export", str(snapshot), "--package", "HTTPX", "--db", str(tmp_path / "source.sqlite3")]) == 0
+    assert main(["cache", "import", str(snapshot), "--db", str(tmp_path / "target.sqlite3")]) == 0
+    assert main(["cache", "import", str(tmp_path / "missing.json.gz"), "--db", str(tmp_path / "target.sqlite3")]) == 1
+
+    target = CacheDB(tmp_path / "target.sqlite3")
+    try:
+        assert target.get(scope=PYPI, normalized_name="httpx", ttl_s=0) is not None
+        assert target.get(scope=PYPI, normalized_name="rich", ttl_s=0) is None
+    finally:
+        target.close()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import uv_lens
+
+# 导入 uv_lens.cli（--version、读取配置与解析参数所需的全部模块）的累计耗时上限（微秒）。
+# 墙钟耗时受机器负载影响，只在设置 UV_LENS_IMPORT_BUDGET=1 时检查；默认只检查导入了哪些模块。
+CLI_IMPORT_BUDGET_US = 50_000
+
+# 启动路径上不应加载的重量级模块：联网、进度条与 TUI 只在真正需要时导入。
+_CLI_FORBIDDEN = ("httpx", "rich", "packaging", "textual", "tomlkit", "yaml", "asyncio")
+_APP_FORBIDDEN = ("httpx", "rich", "textual", "tomlkit")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """
+    在新进程中以 -X importtime 导入 module，返回 {模块名: 累计耗时（微秒）}。
+    """
+    env = dict(os.environ, PYTHONPATH=str(Path(uv_lens.__file__).resolve().parents[1]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        if cumulative.isdigit():
+            times[name] = int(cumulative)
+    return times
+
+
+def _loaded(times: dict[str, int], forbidden: tuple[str, ...]) -> list[str]:
+    """
+    times 中属于 forbidden 包（含子模块）的模块。
+    """
+    return sorted(name for name in times if name.split(".")[0] in forbidden)
+
+
+def test_cli_import_skips_heavy_modules() -> None:
+    """
+    导入 CLI 入口不应加载 httpx、rich、packaging 等模块。
+    """
+    assert _loaded(_import_times("uv_lens.cli"), _CLI_FORBIDDEN) == []
+
+
+@pytest.mark.skipif(not os.environ.get("UV_LENS_IMPORT_BUDGET"), reason="设置 UV_LENS_IMPORT_BUDGET=1 时检查导入耗时")
+def test_cli_import_within_budget() -> None:
+    """
+    导入 CLI 入口的累计耗时在预算之内（取三次中的最小值以减少噪声）。
+    """
+    runs = [_import_times("uv_lens.cli") for _ in range(3)]
+    assert min(run["uv_lens.cli"] for run in runs) < CLI_IMPORT_BUDGET_US
+
+
+def test_app_import_defers_network_and_progress_modules() -> None:
+    """
+    检查逻辑本身不应在导入时加载 httpx 与 rich：全部命中缓存的检查用不到它们。
+    """
+    assert _loaded(_import_times("uv_lens.app"), _APP_FORBIDDEN) == []
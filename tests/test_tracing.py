@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+from packaging.version import Version
+
+from uv_lens.cache import CacheDB, index_scope_key
+from uv_lens.cli import main
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.resolver import ResolveStats, resolve_latest_versions
+from uv_lens.tracing import Tracer, current_tracer, span, tracing
+
+
+def test_span_is_shared_noop_when_disabled() -> None:
+    """
+    未开启追踪时 span() 应返回同一个空操作对象，不分配新的区间。
+    """
+    assert current_tracer() is None
+    first = span("lookup", package="a")
+    with first as s:
+        s.set(status=200)
+    assert span("other") is first
+
+
+@pytest.mark.asyncio
+async def test_lookup_spans_cover_index_http_and_cache(tmp_path: Path) -> None:
+    """
+    开启追踪时，每个包的查询、每个索引、每次 HTTP 请求与缓存读写都应记录为带属性的区间。
+    """
+    settings = IndexSettings(index_url="https://primary.test/pypi")
+    body = json.dumps({"releases": {"1.0": [], "2.0": []}, "info": {"version": "2.0"}})
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "missing" in request.url.path:
+            return httpx.Response(404)
+        return httpx.Response(200, text=body)
+
+    db = CacheDB(tmp_path / "cache.sqlite3")
+    db.set(
+        scope=index_scope_key(settings.index_url),
+        normalized_name="cached",
+        latest=Version("1.0"),
+        resolved_index_url=settings.index_url,
+        not_found=False,
+        error=None,
+    )
+    tracer = Tracer()
+    try:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with tracing(tracer):
+                await resolve_latest_versions(
+                    ["cached", "demo", "missing"],
+                    settings=settings,
+                    max_concurrency=4,
+                    cache=db,
+                    cache_ttl_s=3600,
+                    refresh=False,
+                    client=client,
+                )
+    finally:
+        db.close()
+
+    spans = [e for e in tracer.events if e["ph"] == "X"]
+    lookups = {e["args"]["package"]: e["args"] for e in spans if e["name"] == "lookup"}
+    assert lookups["cached"]["cache_hit"] is True
+    assert lookups["demo"]["cache_hit"] is False and lookups["demo"]["latest"] == "2.0"
+
+    requests = {e["args"]["url"].split("/")[-2]: e["args"] for e in spans if e["name"] == "GET"}
+    assert requests["demo"]["status"] == 200 and requests["demo"]["bytes"] == len(body)
+    assert requests["missing"]["status"] == 404
+
+    names = {e["name"] for e in spans}
+    assert {"index", "cache.get_many", "cache.set", "cache.flush"} <= names
+    assert all(e["dur"] >= 0 and isinstance(e["tid"], int) for e in spans)
+
+
+def test_cli_trace_writes_chrome_trace(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    --trace 应写出可被 trace viewer 打开的 JSON，包含命令与 check_pyproject 区间。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["httpx>=0.27"]\n', encoding="utf-8")
+
+    async def fake_iter_latest_versions(normalized_names: list[str], *, on_stats=None, **kwargs):
+        for name in normalized_names:
+            yield name, PackageLookupResult(
+                normalized_name=name, index_url="https://pypi.test/pypi", latest=Version("0.28.0"), not_found=False, error=None
+            )
+        if on_stats:
+            on_stats(ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names)))
+
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+    monkeypatch.setattr("uv_lens.cli.load_config", lambda _: cfg)
+    monkeypatch.setattr("uv_lens.app.iter_latest_versions", fake_iter_latest_versions)
+
+    trace = tmp_path / "trace.json"
+    code = main(
+        [
+            "--no-daemon",
+            "--pyproject",
+            str(pyproject),
+            "--trace",
+            str(trace),
+            "check",
+            "--format",
+            "json",
+            "--output",
+            str(tmp_path / "report.json"),
+        ]
+    )
+
+    assert code == 0
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    names = {e["name"] for e in events if e["ph"] == "X"}
+    assert {"uv-lens check", "check_pyproject", "parse"} <= names
+    assert current_tracer() is None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import dataclasses
 from pathlib import Path
 
+import pytest
+from packaging.requirements import Requirement
 from packaging.version import Version
 
 from uv_lens.models import CheckStatus, DependencyKind
@@ -147,3 +150,24 @@ requires = ["buildpkg>=0"]
     assert "urlpkg @ https://example.invalid/urlpkg-1.0.0.tar.gz" in updated
     assert "not valid !!!" in updated
 
+
+def test_apply_updates_reuses_parsed_requirements(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    报告携带已解析的 requirement 时不应重新解析原始字符串；报告中没有的条目仍会解析。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text('[project]\nname = "demo"\ndependencies = ["foo==1.0.0", "bar>=1"]\n', encoding="utf-8")
+    report = _make_report_for_updates()
+    report.items[0] = dataclasses.replace(report.items[0], requirement=Requirement("foo==1.0.0"))
+    parsed: list[str] = []
+
+    def counting_requirement(raw: str) -> Requirement:
+        parsed.append(raw)
+        return Requirement(raw)
+
+    monkeypatch.setattr("uv_lens.updater.Requirement", counting_requirement)
+    changes = apply_updates_to_pyproject(pyproject, report=report, pin="exact", write=False)
+
+    assert [(c.name, c.before, c.after) for c in changes] == [("foo", "foo==1.0.0", "foo==1.0.1")]
+    assert "foo==1.0.0" not in parsed
+    assert "bar>=1" in parsed
@@ -4,7 +4,11 @@ from packaging.requirements import Requirement
 from packaging.version import Version
 
 from uv_lens.models import CheckStatus
-from uv_lens.versions import evaluate_requirement_against_latest, suggest_updated_requirement
+from uv_lens.versions import (
+    evaluate_requirement_against_latest,
+    evaluate_requirement_cached,
+    suggest_updated_requirement,
+)
 
 
 def test_evaluate_exact_pin_up_to_date() -> None:
@@ -42,3 +46,50 @@ def test_suggest_compatible_upper_bound() -> None:
     req = Requirement("foo")
     suggested = suggest_updated_requirement(req, latest=Version("2.3.4"), pin="compatible")
     assert suggested == "foo>=2.3.4,<3"
+
+
+def test_evaluate_cached_reuses_results_per_raw_string(monkeypatch) -> None:
+    """
+    相同 (raw, latest, pin) 只评估一次；写法不同的同一依赖分别评估，建议保留各自的包名写法；出错的查询不缓存。
+    """
+    import uv_lens.versions as versions
+
+    calls: list[str] = []
+    original = versions.evaluate_requirement_against_latest
+
+    def counting(req, **kwargs):
+        calls.append(str(req))
+        return original(req, **kwargs)
+
+    monkeypatch.setattr(versions, "_evaluation_cache", type(versions._evaluation_cache)())
+    monkeypatch.setattr(versions, "evaluate_requirement_against_latest", counting)
+    latest = Version("1.0.1")
+
+    first = evaluate_requirement_cached("Foo==1.0.0", Requirement("Foo==1.0.0"), latest=latest, pin="exact")
+    again = evaluate_requirement_cached("Foo==1.0.0", Requirement("Foo==1.0.0"), latest=latest, pin="exact")
+    other = evaluate_requirement_cached("foo==1.0.0", Requirement("foo==1.0.0"), latest=latest, pin="exact")
+    assert again is first
+    assert (first.suggestion, other.suggestion) == ("Foo==1.0.1", "foo==1.0.1")
+    assert len(calls) == 2
+
+    for _ in range(2):
+        ev = evaluate_requirement_cached(
+            "Foo==1.0.0", Requirement("Foo==1.0.0"), latest=latest, network_error="timeout", pin="exact"
+        )
+        assert ev.status == CheckStatus.NETWORK_ERROR
+    assert len(calls) == 4
+
+
+def test_evaluate_cached_keeps_latest_spelling(monkeypatch) -> None:
+    """
+    Version("1.0") 与 Version("1.0.0") 相等，但缓存按版本字符串区分，建议中保留各自的写法。
+    """
+    import uv_lens.versions as versions
+
+    monkeypatch.setattr(versions, "_evaluation_cache", type(versions._evaluation_cache)())
+    req = Requirement("foo==0.9")
+
+    short = evaluate_requirement_cached("foo==0.9", req, latest=Version("1.0"), pin="exact")
+    long = evaluate_requirement_cached("foo==0.9", req, latest=Version("1.0.0"), pin="exact")
+    assert (short.suggestion, long.suggestion) == ("foo==1.0", "foo==1.0.0")
+    assert str(long.latest) == "1.0.0"
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens import watch as watch_module
+from uv_lens.config import AppConfig
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.models import CheckStatus, DependencyKind
+from uv_lens.pyproject import parse_requirement
+from uv_lens.report import Report
+from uv_lens.resolver import ResolveStats
+from uv_lens.watch import IncrementalChecker, ItemsDiff, diff_items, watch
+
+LATEST = {"httpx": "0.28.1", "rich": "13.9.0", "packaging": "24.2"}
+
+
+def _write(path: Path, deps: list[str]) -> None:
+    """
+    写入只包含项目依赖的 pyproject.toml。
+    """
+    body = ", ".join(f'"{d}"' for d in deps)
+    path.write_text(f'[project]\nname = "demo"\ndependencies = [{body}]\n', encoding="utf-8")
+
+
+@pytest.fixture
+def resolve_calls(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """
+    替换 resolver：记录每次请求的包名并返回固定的最新版本。
+    """
+    calls: list[list[str]] = []
+
+    async def fake_resolve_latest_versions(normalized_names: list[str], **kwargs):
+        calls.append(list(normalized_names))
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n,
+                index_url="https://pypi.test/pypi",
+                latest=Version(LATEST[n]),
+                not_found=False,
+                error=None,
+            )
+            for n in normalized_names
+        }
+        return results, ResolveStats(total=len(normalized_names), cache_hits=0, fetched=len(normalized_names))
+
+    monkeypatch.setattr("uv_lens.watch.resolve_latest_versions", fake_resolve_latest_versions)
+    return calls
+
+
+def _config() -> AppConfig:
+    """
+    不使用缓存的测试配置。
+    """
+    return AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+
+
+def test_diff_items_treats_edit_as_remove_plus_add() -> None:
+    """
+    修改一行依赖应表现为移除旧项 + 新增新项，其余保持未变化。
+    """
+    old = [
+        parse_requirement("httpx>=0.27", kind=DependencyKind.PROJECT, group="project"),
+        parse_requirement("rich", kind=DependencyKind.PROJECT, group="project"),
+    ]
+    new = [
+        parse_requirement("httpx>=0.28", kind=DependencyKind.PROJECT, group="project"),
+        parse_requirement("rich", kind=DependencyKind.PROJECT, group="project"),
+    ]
+    diff = diff_items(old, new)
+    assert [i.raw for i in diff.added] == ["httpx>=0.28"]
+    assert [i.raw for i in diff.removed] == ["httpx>=0.27"]
+    assert diff.unchanged == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_checker_only_reevaluates_changed_items(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, resolve_calls: list[list[str]]
+) -> None:
+    """
+    修改已有包的约束不应再次查询；新增包只查询该包；未变化的依赖不重新评估。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    _write(pyproject, ["httpx>=0.27", "rich"])
+
+    evaluated: list[str] = []
+    original = watch_module.evaluate_item
+
+    def counting_evaluate_item(item, **kwargs):
+        evaluated.append(item.raw)
+        return original(item, **kwargs)
+
+    monkeypatch.setattr("uv_lens.watch.evaluate_item", counting_evaluate_item)
+
+    checker = IncrementalChecker(pyproject, config=_config())
+    report, _ = await checker.check()
+    assert resolve_calls == [["httpx", "rich"]]
+    assert [i.status for i in report.items] == [CheckStatus.UPGRADE_AVAILABLE, CheckStatus.UNPINNED]
+
+    evaluated.clear()
+    _write(pyproject, ["httpx>=0.29", "rich"])
+    report, diff = await checker.check()
+    assert resolve_calls == [["httpx", "rich"]]
+    assert evaluated == ["httpx>=0.29"]
+    assert diff.unchanged == 1
+    assert report.items[0].status == CheckStatus.CONSTRAINT_BLOCKS_LATEST
+    assert report.items[1].raw == "rich"
+
+    evaluated.clear()
+    _write(pyproject, ["httpx>=0.29", "rich", "packaging>=24"])
+    report, _ = await checker.check()
+    assert resolve_calls[-1] == ["packaging"]
+    assert evaluated == ["packaging>=24"]
+    assert [i.name for i in report.items] == ["httpx", "rich", "packaging"]
+
+
+@pytest.mark.asyncio
+async def test_watch_reports_on_each_change(tmp_path: Path, resolve_calls: list[list[str]]) -> None:
+    """
+    watch 启动时检查一次，文件变化后再次回调，设置 stop 后退出。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    _write(pyproject, ["httpx"])
+    stop = asyncio.Event()
+    seen: list[tuple[list[str], int]] = []
+
+    def on_report(report: Report, diff: ItemsDiff) -> None:
+        seen.append(([i.raw for i in report.items], len(diff.added)))
+        if len(seen) == 1:
+            _write(pyproject, ["httpx", "rich>=13"])
+        else:
+            stop.set()
+
+    checker = IncrementalChecker(pyproject, config=_config())
+    await asyncio.wait_for(watch(checker, on_report, interval_s=0.01, stop=stop), timeout=5)
+    assert seen == [(["httpx"], 1), (["httpx", "rich>=13"], 1)]
+
+
+@pytest.mark.asyncio
+async def test_incremental_checker_refreshes_expired_lookups(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, resolve_calls: list[list[str]]
+) -> None:
+    """
+    查询结果超过 memory_cache_ttl_s 后重新解析，只重新评估最新版本有变化的依赖；移出文件的包名被丢弃。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    _write(pyproject, ["httpx>=0.27", "rich"])
+    evaluated: list[str] = []
+    original = watch_module.evaluate_item
+
+    def counting_evaluate_item(item, **kwargs):
+        evaluated.append(item.raw)
+        return original(item, **kwargs)
+
+    monkeypatch.setattr("uv_lens.watch.evaluate_item", counting_evaluate_item)
+    checker = IncrementalChecker(pyproject, config=replace(_config(), memory_cache_ttl_s=0.05))
+    await checker.check()
+    await checker.check()
+    assert resolve_calls == [["httpx", "rich"]]
+    assert not checker.refresh_due()
+
+    await asyncio.sleep(0.06)
+    monkeypatch.setitem(LATEST, "httpx", "0.29.0")
+    assert checker.refresh_due()
+    evaluated.clear()
+    report, diff = await checker.check()
+    assert resolve_calls[-1] == ["httpx", "rich"]
+    assert not diff.changed
+    assert evaluated == ["httpx>=0.27"]
+    assert report.items[0].latest == Version("0.29.0")
+
+    _write(pyproject, ["httpx>=0.27"])
+    await checker.check()
+    assert sorted(checker._lookups) == ["httpx"]
+
+
+@pytest.mark.asyncio
+async def test_watch_reports_new_releases_without_file_changes(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, resolve_calls: list[list[str]]
+) -> None:
+    """
+    文件未变化时，查询结果到期且出现新版本也会回调。
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    _write(pyproject, ["httpx"])
+    stop = asyncio.Event()
+    seen: list[str | None] = []
+
+    def on_report(report: Report, diff: ItemsDiff) -> None:
+        seen.append(str(report.items[0].latest))
+        if len(seen) == 1:
+            monkeypatch.setitem(LATEST, "httpx", "0.29.0")
+        else:
+            stop.set()
+
+    checker = IncrementalChecker(pyproject, config=replace(_config(), memory_cache_ttl_s=0.05))
+    await asyncio.wait_for(watch(checker, on_report, interval_s=0.01, stop=stop), timeout=5)
+    assert seen == ["0.28.1", "0.29.0"]
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from packaging.version import Version
+
+from uv_lens.app import check_workspace
+from uv_lens.cache import MemoryCache, index_scope_key
+from uv_lens.config import AppConfig
+from uv_lens.formatters import render_workspace_json, render_workspace_markdown
+from uv_lens.index_client import IndexSettings, PackageLookupResult
+from uv_lens.models import CheckStatus
+from uv_lens.resolver import ResolveStats
+from uv_lens.workspace import discover_workspace_projects, iter_workspace_projects
+
+
+def _write_project(path: Path, dependencies: list[str]) -> Path:
+    """
+    写入一个只含 [project] 依赖的 pyproject.toml。
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    deps = ", ".join(f'"{d}"' for d in dependencies)
+    pyproject = path / "pyproject.toml"
+    pyproject.write_text(f'[project]\nname = "{path.name}"\ndependencies = [{deps}]\n', encoding="utf-8")
+    return pyproject
+
+
+def test_discover_uses_uv_workspace_members_and_exclude(tmp_path: Path) -> None:
+    """
+    声明了 [tool.uv.workspace] 时按 members / exclude 发现成员项目。
+    """
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "root"\n\n[tool.uv.workspace]\nmembers = ["packages/*"]\nexclude = ["packages/legacy"]\n',
+        encoding="utf-8",
+    )
+    _write_project(tmp_path / "packages" / "api", ["httpx"])
+    _write_project(tmp_path / "packages" / "legacy", ["six"])
+    _write_project(tmp_path / "tools" / "script", ["rich"])
+    (tmp_path / "packages" / "docs").mkdir()
+
+    projects = discover_workspace_projects(tmp_path)
+    assert projects == [tmp_path / "pyproject.toml", tmp_path / "packages" / "api" / "pyproject.toml"]
+
+
+def test_discover_scans_tree_and_skips_virtualenvs(tmp_path: Path) -> None:
+    """
+    未声明 workspace 时扫描目录，跳过 .venv、node_modules 等目录。
+    """
+    _write_project(tmp_path / "a", ["httpx"])
+    _write_project(tmp_path / "b" / "nested", ["rich"])
+    _write_project(tmp_path / ".venv" / "lib", ["pip"])
+    _write_project(tmp_path / "node_modules" / "x", ["left-pad"])
+
+    assert discover_workspace_projects(tmp_path) == [
+        tmp_path / "a" / "pyproject.toml",
+        tmp_path / "b" / "nested" / "pyproject.toml",
+    ]
+
+
+def test_discover_scans_generic_directory_names(tmp_path: Path) -> None:
+    """
+    build、dist 等常见目录名下的项目照常发现，vendor 等依赖副本目录默认跳过，skip_dirs 可替换跳过列表。
+    """
+    for name in ("build", "dist", "vendor", "third_party"):
+        _write_project(tmp_path / name, ["httpx"])
+
+    assert discover_workspace_projects(tmp_path) == [
+        tmp_path / name / "pyproject.toml" for name in ("build", "dist")
+    ]
+    assert discover_workspace_projects(tmp_path, skip_dirs=()) == [
+        tmp_path / name / "pyproject.toml" for name in ("build", "dist", "third_party", "vendor")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_workspace_projects_does_not_wait_for_pool_on_early_exit(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    提前停止迭代时不在事件循环中等待进程池退出，并取消尚未开始的任务。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    shutdowns: list[dict[str, bool]] = []
+
+    class RecordingPool(ThreadPoolExecutor):
+        def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+            shutdowns.append({"wait": wait, "cancel_futures": cancel_futures})
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr("uv_lens.workspace.ProcessPoolExecutor", RecordingPool)
+    for i in range(4):
+        _write_project(tmp_path / f"repo{i}", ["httpx"])
+
+    batches = iter_workspace_projects(tmp_path, jobs=2, projects=None)
+    first = await anext(batches)
+    await batches.aclose()
+
+    assert first
+    assert shutdowns == [{"wait": False, "cancel_futures": True}]
+
+
+@pytest.mark.asyncio
+async def test_check_workspace_resolves_each_package_once(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    所有项目的包名去重后只解析一次，并生成各项目报告与汇总。
+    """
+    api = _write_project(tmp_path / "api", ["httpx==0.27.0", "rich"])
+    web = _write_project(tmp_path / "web", ["httpx>=0.28", "missing"])
+    calls: list[list[str]] = []
+
+    async def fake_resolve_latest_versions(normalized_names: list[str], **kwargs):
+        """
+        记录解析调用，httpx 视为本次查询、其余命中缓存。
+        """
+        calls.append(normalized_names)
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n,
+                index_url=None if n == "missing" else "https://pypi.test/pypi",
+                latest=None if n == "missing" else Version("0.28.1"),
+                not_found=n == "missing",
+                error=None,
+            )
+            for n in normalized_names
+        }
+        stats = ResolveStats(total=3, cache_hits=2, fetched=1, fetched_names=frozenset({"httpx"}))
+        return results, stats
+
+    monkeypatch.setattr("uv_lens.app.resolve_latest_versions", fake_resolve_latest_versions)
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False, pin="exact")
+
+    report = await check_workspace(tmp_path, config=cfg)
+    assert calls == [["httpx", "missing", "rich"]]
+    assert [r.pyproject_path for r in report.reports] == [str(api), str(web)]
+    assert report.unique_packages == 3
+    assert (report.reports[0].cache_hits, report.reports[0].fetched) == (1, 1)
+    assert report.status_counts()[CheckStatus.NOT_FOUND] == 1
+    assert report.status_counts()[CheckStatus.UPGRADE_AVAILABLE] == 1
+
+    assert '"unique_packages": 3' in render_workspace_json(report)
+    markdown = render_workspace_markdown(report)
+    assert f"## `{web}`" in markdown
+    assert "不同包：3" in markdown
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("jobs", [1, 2])
+async def test_check_workspace_streams_parallel_batches(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, jobs: int
+) -> None:
+    """
+    并行发现与解析时按批交给 resolver，每个包只解析一次；无法解析的项目单独列出，node_modules 与虚拟环境被跳过。
+    """
+    for i in range(20):
+        _write_project(tmp_path / f"repo{i:02d}", ["httpx", f"pkg{i % 3}"])
+    _write_project(tmp_path / "repo00" / "node_modules" / "copied", ["vendored-only"])
+    venv = tmp_path / "repo01" / "env"
+    venv.mkdir()
+    (venv / "pyvenv.cfg").write_text("home = /usr/bin\n", encoding="utf-8")
+    _write_project(venv / "lib" / "pkg", ["venv-only"])
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    (broken / "pyproject.toml").write_text("[project\n", encoding="utf-8")
+
+    resolved: list[str] = []
+
+    async def fake_resolve_latest_versions(normalized_names: list[str], **kwargs):
+        """
+        记录每批解析的包名，并确认共享的 client 与 semaphore 被传入。
+        """
+        assert kwargs["client"] is not None
+        assert kwargs["semaphore"] is not None
+        resolved.extend(normalized_names)
+        results = {
+            n: PackageLookupResult(
+                normalized_name=n, index_url="https://pypi.test/pypi", latest=Version("1.0"), not_found=False, error=None
+            )
+            for n in normalized_names
+        }
+        stats = ResolveStats(
+            total=len(normalized_names),
+            cache_hits=0,
+            fetched=len(normalized_names),
+            fetched_names=frozenset(normalized_names),
+        )
+        return results, stats
+
+    monkeypatch.setattr("uv_lens.app.resolve_latest_versions", fake_resolve_latest_versions)
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"), use_cache=False)
+
+    report = await check_workspace(tmp_path, config=cfg, jobs=jobs)
+    assert sorted(resolved) == ["httpx", "pkg0", "pkg1", "pkg2"]
+    assert report.unique_packages == 4
+    assert report.fetched == 4
+    assert [r.pyproject_path for r in report.reports] == [
+        str(tmp_path / f"repo{i:02d}" / "pyproject.toml") for i in range(20)
+    ]
+    assert [path for path, _ in report.failed] == [str(broken / "pyproject.toml")]
+
+
+@pytest.mark.asyncio
+async def test_check_workspace_fully_cached_does_not_create_client(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """
+    所有包都命中缓存时不应创建 HTTP 客户端。
+    """
+    _write_project(tmp_path / "api", ["httpx>=0.27"])
+    _write_project(tmp_path / "web", ["rich"])
+    cache = MemoryCache()
+    for name, latest in (("httpx", "0.28.1"), ("rich", "13.9.4")):
+        cache.set(
+            scope=index_scope_key("https://pypi.test/pypi"),
+            normalized_name=name,
+            latest=Version(latest),
+            resolved_index_url="https://pypi.test/pypi",
+            not_found=False,
+            error=None,
+        )
+
+    def fail_create_client(*_args, **_kwargs):
+        raise AssertionError("不应创建 HTTP 客户端")
+
+    monkeypatch.setattr("uv_lens.index_client.create_async_client", fail_create_client)
+    cfg = AppConfig(index=IndexSettings(index_url="https://pypi.test/pypi"))
+
+    report = await check_workspace(tmp_path, config=cfg, cache=cache)
+    assert (report.cache_hits, report.fetched) == (2, 0)
+    assert report.status_counts()[CheckStatus.UPGRADE_AVAILABLE] == 1
+    assert report.status_counts()[CheckStatus.UNPINNED] == 1